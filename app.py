@@ -23,27 +23,49 @@ def load_env_file():
                             key = key.strip()
                             value = value.strip().strip('"\'')
                             os.environ.setdefault(key, value)
-                print(f"✓ Chargement de .env depuis : {dotenv_path}")
-                return
+                return dotenv_path
             except Exception as e:
                 print(f"⚠ Erreur lors de la lecture de .env : {e}")
                 pass
+    return None
 
-load_env_file()
+dotenv_path = load_env_file()
 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory
+from flask import Flask, appcontext_pushed, render_template, request, redirect, url_for, flash, jsonify, send_file, abort, Response, stream_with_context, g, has_request_context, current_app, session
 from flask_sqlalchemy import SQLAlchemy
+from markupsafe import Markup
+from jinja2 import FileSystemBytecodeCache
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user, UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
-from sqlalchemy import text
+from flask_login.config import COOKIE_NAME as REMEMBER_COOKIE_DEFAULT_NAME
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
+from werkzeug.http import is_resource_modified
+from datetime import datetime, date, time as dt_time, timedelta, timezone
+from sqlalchemy import text, and_, or_, false, select, update, insert, delete, func, event, inspect as sa_inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+import atexit
+import base64
+import csv
+import gzip
+import hashlib
+import hmac
+import io
+import json
+import mimetypes
+import re
+import secrets
+import threading
+import time
 import uuid
-import random
 import string
+from collections import Counter, OrderedDict
+from functools import wraps
 
 # ============================
 #   EXTENSIONS FLASK
 # ============================
+
 db = SQLAlchemy()
 login_manager = LoginManager()
 
@@ -101,16 +123,29 @@ class Order(db.Model):
     destination_country = db.Column(db.String(100), nullable=False)
     current_location = db.Column(db.String(200), default='En préparation')
     
-    # Planification
-    pickup_date = db.Column(db.String(20), nullable=True)
-    pickup_time = db.Column(db.String(10), nullable=True)
-    delivery_date = db.Column(db.String(20), nullable=True)
-    delivery_time = db.Column(db.String(10), nullable=True)
+    # Planification (colonnes typées : voir migrate_schedule_columns.py pour les bases existantes)
+    pickup_date = db.Column(db.Date, nullable=True)
+    pickup_time = db.Column(db.Time, nullable=True)
+    delivery_date = db.Column(db.Date, nullable=True)
+    delivery_time = db.Column(db.Time, nullable=True)
     
     # Métadonnées
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Historique de suivi (supprimé avec la commande)
+    events = db.relationship('TrackingEvent', backref='order', cascade='all, delete-orphan')
+    
+    # Index composites pour la pagination par curseur (created_at, id) et les filtres de la liste admin
+    __table_args__ = (
+        db.Index('ix_orders_created_at_id', 'created_at', 'id'),
+        db.Index('ix_orders_destination_country_created_at', 'destination_country', 'created_at', 'id'),
+        db.Index('ix_orders_current_location_created_at', 'current_location', 'created_at', 'id'),
+        # Requêtes de planification (livraisons du jour, retards, enlèvements à venir)
+        db.Index('ix_orders_delivery_date_time', 'delivery_date', 'delivery_time', 'id'),
+        db.Index('ix_orders_pickup_date_time', 'pickup_date', 'pickup_time', 'id'),
+    )
+    
     def __repr__(self):
         return f'<Order {self.tracking_number} - {self.shipment_name}>'
     
@@ -133,220 +168,2689 @@ class Order(db.Model):
             'destination_city': self.destination_city,
             'destination_country': self.destination_country,
             'current_location': self.current_location,
-            'pickup_date': self.pickup_date or '',
-            'pickup_time': self.pickup_time or '',
-            'delivery_date': self.delivery_date or '',
-            'delivery_time': self.delivery_time or '',
+            'pickup_date': self.pickup_date.isoformat() if self.pickup_date else '',
+            'pickup_time': self.pickup_time.strftime('%H:%M') if self.pickup_time else '',
+            'delivery_date': self.delivery_date.isoformat() if self.delivery_date else '',
+            'delivery_time': self.delivery_time.strftime('%H:%M') if self.delivery_time else '',
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+
+class TrackingEvent(db.Model):
+    """Historique (append-only) des scans et changements de statut d'une commande"""
+    __tablename__ = 'tracking_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id', ondelete='CASCADE'), nullable=False)
+    status = db.Column(db.String(200), nullable=False)
+    location = db.Column(db.String(200), nullable=True)
+    note = db.Column(db.Text, nullable=True)
+    occurred_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Dernier statut et chronologie d'une commande : un seul parcours d'index
+    __table_args__ = (
+        db.Index('ix_tracking_events_order_id_occurred_at', 'order_id', 'occurred_at'),
+    )
+    
+    def __repr__(self):
+        return f'<TrackingEvent {self.order_id} - {self.status}>'
+    
+    def to_dict(self):
+        """Convertir l'événement en dictionnaire"""
+        return {
+            'id': self.id,
+            'order_id': self.order_id,
+            'status': self.status,
+            'location': self.location or '',
+            'note': self.note or '',
+            'occurred_at': self.occurred_at.isoformat() if self.occurred_at else None
+        }
+
+
+class OrderStat(db.Model):
+    """Agrégats du tableau de bord (nombre de commandes par dimension), maintenus incrémentalement"""
+    __tablename__ = 'order_stats'
+    
+    dimension = db.Column(db.String(20), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<OrderStat {self.dimension}:{self.key}={self.count}>'
+
+
+class SequenceCounter(db.Model):
+    """
+    Compteurs nommés partagés entre workers (réservation de blocs de numéros de suivi), et clé
+    de la permutation des numéros de suivi quand TRACKING_NUMBER_KEY n'est pas configurée
+    """
+    __tablename__ = 'sequence_counters'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<SequenceCounter {self.name}={self.value}>'
+
+# ============================
+#   CONFIGURATION DE L'APPLICATION
+# ============================
+
+# Au démarrage (import de app.py, donc à chaque cold start sur Vercel), seule la configuration
+# est lue : le moteur SQLAlchemy est créé au premier contexte d'application (init_sqlalchemy) et
+# le backend du cache de suivi à la première utilisation. Les diagnostics (✓ ...) et la vérification
+# des dossiers ne sont faits que si STARTUP_DIAGNOSTICS=1, valeur par défaut hors Vercel ; les
+# autres avertissements (⚠ ...) sont toujours affichés.
+
+# Déterminer le répertoire de base (où se trouve app.py)
+# Flask cherchera dans app/templates et app/static
+base_dir = os.path.dirname(os.path.abspath(__file__))
+template_dir = os.path.join(base_dir, 'app', 'templates')
+static_dir = os.path.join(base_dir, 'app', 'static')
+
+STARTUP_DIAGNOSTICS = os.environ.get(
+    'STARTUP_DIAGNOSTICS', '0' if os.environ.get('VERCEL') == '1' else '1'
+).lower() in ('1', 'true', 'yes')
+
+
+def startup_log(message):
+    """Message de diagnostic du démarrage (affiché seulement si STARTUP_DIAGNOSTICS)"""
+    if STARTUP_DIAGNOSTICS:
+        print(message)
+
+
+def log_startup_diagnostics():
+    if not STARTUP_DIAGNOSTICS:
+        return  # Aucun accès disque au démarrage à froid (Vercel)
+    if dotenv_path:
+        startup_log(f"✓ Chargement de .env depuis : {dotenv_path}")
+    # Vérifier que les dossiers existent (pour le débogage)
+    for label, path in (('templates', template_dir), ('static', static_dir)):
+        if not os.path.exists(path):
+            print(f"⚠️  ATTENTION: Le dossier {label} n'existe pas : {path}")
+        else:
+            startup_log(f"✓ Dossier {label} trouvé : {path}")
+
+
+def database_settings(is_vercel):
+    """URL de connexion et options du moteur SQLAlchemy selon l'environnement"""
+    # Utilise Neon PostgreSQL hébergé sur Vercel
+    # La chaîne de connexion doit être définie dans DATABASE_URL (variables d'environnement)
+    database_url = os.environ.get('DATABASE_URL')
+    # Si vous voulez forcer l'utilisation de la base distante (Neon) en local,
+    # exportez USE_REMOTE_DB=1 dans votre environnement. Dans ce cas,
+    # DATABASE_URL est obligatoire et l'application s'arrêtera si elle est absente.
+    use_remote_db = os.environ.get('USE_REMOTE_DB') == '1'
+
+    if not database_url:
+        if use_remote_db:
+            # L'utilisateur a demandé explicitement d'utiliser la DB distante mais
+            # DATABASE_URL n'est pas défini : échouer rapidement pour éviter des comportements inattendus.
+            print("⚠️  USE_REMOTE_DB=1 défini mais DATABASE_URL est manquant. Arrêt.")
+            raise RuntimeError('DATABASE_URL is required when USE_REMOTE_DB=1')
+
+        # Valeur par défaut pour le développement local uniquement (fallback SQLite)
+        instance_dir = os.path.join(base_dir, 'instance')
+        try:
+            os.makedirs(instance_dir, exist_ok=True)
+        except Exception as e:
+            print(f"⚠️  Erreur lors de la création du dossier instance : {str(e)}")
+        database_url = f'sqlite:///{os.path.join(instance_dir, "dev.db")}'
+        print("⚠️  DATABASE_URL non configuré → Utilisation de SQLite (dev local uniquement)")
+        startup_log(f"✓ Chemin SQLite : {database_url}")
+    else:
+        # Nettoyer l'URL et assurer que SSL est configuré
+        database_url = database_url.strip()
+        # Si l'URL Neon/PostgreSQL n'a pas de sslmode, l'ajouter
+        if 'postgresql' in database_url and '?sslmode=' not in database_url:
+            separator = '&' if '?' in database_url else '?'
+            database_url = f"{database_url}{separator}sslmode=require"
+        startup_log("✓ PostgreSQL (Neon) configuré avec SSL")
+
+    # Adapter les options du moteur selon le type de base de données
+    database_url_lower = database_url.lower()
+
+    if 'postgresql' in database_url_lower or 'postgres' in database_url_lower:
+        # Configuration pour PostgreSQL (Neon)
+        startup_log("✓ PostgreSQL (Neon) détecté")
+        engine_options = {
+            'pool_pre_ping': True,        # Vérifier les connexions avant utilisation
+            'pool_recycle': 300,          # Recycler les connexions après 5 minutes
+            'connect_args': {
+                'connect_timeout': 10,    # Timeout de connexion
+                'sslmode': 'require'      # SSL obligatoire pour Neon
+            }
+        }
+
+        # Sur Vercel (serverless), utiliser NullPool pour éviter les problèmes de persistence du pool
+        if is_vercel:
+            from sqlalchemy.pool import NullPool
+            engine_options['poolclass'] = NullPool
+            engine_options.pop('pool_pre_ping', None)  # NullPool n'utilise pas pool_pre_ping
+            startup_log("✓ Vercel détecté → Utilisation de NullPool (serverless)")
+
+    elif 'sqlite' in database_url_lower:
+        # Configuration pour SQLite (dev local)
+        startup_log("✓ SQLite détecté (développement local)")
+        engine_options = {
+            'connect_args': {
+                'check_same_thread': False  # Permettre l'utilisation dans plusieurs threads
+            }
+        }
+    else:
+        # Fallback pour autres BDs
+        print(f"⚠ Type de BD non reconnu : {database_url_lower}")
+        engine_options = {
+            'pool_pre_ping': True,
+            'pool_recycle': 300
+        }
+
+    startup_log(f"✓ Options du moteur SQLAlchemy configurées : {engine_options}")
+    return database_url, engine_options
+
+
+# Bytecode des templates précompilé au déploiement par build_static.py (étape "templates"),
+# en lecture seule à l'exécution ; le cache d'exécution est écrit dans instance/ (ou /tmp sur Vercel)
+TEMPLATE_BYTECODE_DIR = os.path.join(base_dir, 'app', 'template_bytecode')
+
+
+class TemplateBytecodeCache(FileSystemBytecodeCache):
+    """
+    Cache disque du bytecode Jinja : un template n'est compilé qu'une fois, puis rechargé
+    (marshal) à chaque démarrage à froid. Le bytecode est cherché dans `directory`
+    (inscriptible, ex. /tmp sur Vercel) puis dans `prebuilt_directory` (livré avec le
+    déploiement, en lecture seule). Jinja vérifie l'empreinte du source et la version de
+    Python : un bytecode périmé est simplement recompilé.
+    """
+
+    def __init__(self, directory, prebuilt_directory=None):
+        super().__init__(directory)
+        self.prebuilt_directory = prebuilt_directory
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            print(f"⚠ Cache de bytecode des templates non inscriptible ({directory}) : {str(e)}")
+
+    def get_cache_key(self, name, filename=None):
+        # Le nom seul (pas le chemin absolu) : le bytecode construit en local reste valide sur /var/task
+        return hashlib.sha1(name.encode('utf-8')).hexdigest()
+
+    def load_bytecode(self, bucket):
+        super().load_bytecode(bucket)
+        if bucket.code is None and self.prebuilt_directory and self.prebuilt_directory != self.directory:
+            try:
+                f = open(os.path.join(self.prebuilt_directory, self.pattern % bucket.key), 'rb')
+            except OSError:
+                return
+            with f:
+                bucket.load_bytecode(f)
+
+    def dump_bytecode(self, bucket):
+        try:
+            super().dump_bytecode(bucket)
+        except OSError as e:
+            # Le template reste compilé en mémoire, seul le prochain démarrage le recompilera
+            print(f"⚠ Bytecode du template non enregistré ({self.directory}) : {str(e)}")
+
+
+sqlalchemy_init_lock = threading.Lock()
+
+
+def init_sqlalchemy(flask_app, **extra):
+    """
+    Initialise Flask-SQLAlchemy (db.init_app, qui crée le moteur et importe le pilote) au premier
+    contexte d'application poussé : première requête HTTP ou premier `with app.app_context()`
+    d'un script. L'import de app.py ne paie donc pas ce coût.
+    """
+    if 'sqlalchemy' in flask_app.extensions:
+        return
+    with sqlalchemy_init_lock:
+        if 'sqlalchemy' in flask_app.extensions:
+            return
+        # Gérer les erreurs d'initialisation de SQLAlchemy pour ne pas bloquer l'application
+        # (init_app enregistre l'extension avant toute erreur : une seule tentative)
+        try:
+            db.init_app(flask_app)
+            startup_log("✓ SQLAlchemy initialisé")
+        except Exception as e:
+            print(f"⚠ Erreur lors de l'initialisation de SQLAlchemy : {str(e)}")
+            print(f"⚠ Les fonctionnalités de base de données peuvent ne pas fonctionner correctement")
+            # Ne pas bloquer l'application, mais les routes qui utilisent la DB échoueront
+
+
+def configure_app():
+    """
+    Crée l'instance Flask, lit toute la configuration (variables d'environnement) et enregistre
+    les extensions. Ce n'est pas une fabrique : l'application est une instance unique du module
+    (`app`), sur laquelle les routes, caches et hooks sont déclarés plus bas, et que Vercel,
+    gunicorn et les scripts importent. Aucune connexion n'est ouverte et le moteur SQLAlchemy
+    n'est pas créé ici : db.init_app est différé au premier contexte d'application (init_sqlalchemy).
+    """
+    log_startup_diagnostics()
+    is_vercel = os.environ.get('VERCEL') == '1'
+
+    # Configuration Flask pour les templates et fichiers statiques
+    # Sur Vercel, on doit servir les fichiers statiques via Flask car ils ne sont pas dans public/
+    flask_app = Flask(__name__,
+                      template_folder=template_dir,
+                      static_folder=static_dir,
+                      static_url_path='/static')
+
+    database_url, engine_options = database_settings(is_vercel)
+    flask_app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    flask_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    flask_app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+    # SECRET_KEY pour les sessions Flask
+    secret_key = os.environ.get('SECRET_KEY')
+    if not secret_key:
+        # Valeur par défaut (non sécurisée pour la production)
+        secret_key = 'OPENSECRETKEY'
+        print("⚠️  ATTENTION: SECRET_KEY non configuré. Utilisation d'une clé par défaut (non sécurisée)")
+        print("⚠️  Pour la production, configurez SECRET_KEY avec une clé aléatoire sécurisée")
+
+    flask_app.config['SECRET_KEY'] = secret_key
+
+    # Taille de page de la liste des commandes (pagination par curseur)
+    flask_app.config['ORDERS_PAGE_SIZE'] = int(os.environ.get('ORDERS_PAGE_SIZE', 50))
+    flask_app.config['ORDERS_PAGE_SIZE_MAX'] = int(os.environ.get('ORDERS_PAGE_SIZE_MAX', 200))
+
+    # Allocation des numéros de suivi (voir TrackingNumberAllocator)
+    # La clé de permutation doit rester stable une fois des numéros émis ; sans clé dédiée, une clé
+    # aléatoire est générée une fois et conservée en base (jamais SECRET_KEY)
+    flask_app.config['TRACKING_NUMBER_KEY'] = os.environ.get('TRACKING_NUMBER_KEY') or None
+    flask_app.config['TRACKING_NUMBER_BLOCK_SIZE'] = int(os.environ.get('TRACKING_NUMBER_BLOCK_SIZE', 50))
+
+    # Cache des consultations de suivi (voir TrackingCache)
+    flask_app.config['TRACKING_CACHE_BACKEND'] = os.environ.get('TRACKING_CACHE_BACKEND', 'memory')
+    flask_app.config['TRACKING_CACHE_URL'] = os.environ.get('TRACKING_CACHE_URL')
+    flask_app.config['TRACKING_CACHE_TTL'] = int(os.environ.get('TRACKING_CACHE_TTL', 60))
+    flask_app.config['TRACKING_CACHE_MAX_ENTRIES'] = int(os.environ.get('TRACKING_CACHE_MAX_ENTRIES', 10000))
+    # Durée de vie de l'identité des administrateurs connectés (voir SessionUserCache, 0 = désactivé)
+    flask_app.config['USER_CACHE_TTL'] = int(os.environ.get('USER_CACHE_TTL', 30))
+    # Nombre maximal de numéros par appel de l'API de suivi groupé (administrateur / anonyme),
+    # et numéros interrogés par minute et par adresse sans connexion (0 = pas de limite)
+    flask_app.config['TRACKING_BATCH_MAX'] = int(os.environ.get('TRACKING_BATCH_MAX', 100))
+    flask_app.config['TRACKING_BATCH_ANONYMOUS_MAX'] = int(os.environ.get('TRACKING_BATCH_ANONYMOUS_MAX', 20))
+    flask_app.config['TRACKING_API_RATE_LIMIT'] = int(os.environ.get('TRACKING_API_RATE_LIMIT', 300))
+    # Nombre maximal d'événements affichés dans la chronologie publique
+    flask_app.config['TRACKING_TIMELINE_LIMIT'] = int(os.environ.get('TRACKING_TIMELINE_LIMIT', 50))
+    # Pages publiques pré-rendues par freeze_pages.py (servies telles quelles aux visiteurs anonymes)
+    flask_app.config['FROZEN_PAGES_DIR'] = os.environ.get('FROZEN_PAGES_DIR') or os.path.join(base_dir, 'public')
+    # Cache disque du bytecode Jinja (voir TemplateBytecodeCache) ; seul /tmp est inscriptible sur Vercel
+    # (le dossier précompilé TEMPLATE_BYTECODE_DIR n'est jamais écrit à l'exécution)
+    bytecode_cache_dir = os.environ.get('JINJA_BYTECODE_CACHE_DIR') or (
+        '/tmp/template_bytecode' if is_vercel else os.path.join(base_dir, 'instance', 'template_bytecode')
+    )
+    if os.path.abspath(bytecode_cache_dir) == TEMPLATE_BYTECODE_DIR:
+        print("⚠ JINJA_BYTECODE_CACHE_DIR ne peut pas être le dossier précompilé → instance/template_bytecode")
+        bytecode_cache_dir = os.path.join(base_dir, 'instance', 'template_bytecode')
+    flask_app.config['JINJA_BYTECODE_CACHE_DIR'] = bytecode_cache_dir
+    if bytecode_cache_dir.lower() not in ('0', 'off'):
+        flask_app.jinja_options = dict(flask_app.jinja_options, bytecode_cache=TemplateBytecodeCache(
+            flask_app.config['JINJA_BYTECODE_CACHE_DIR'], prebuilt_directory=TEMPLATE_BYTECODE_DIR
+        ))
+
+    # Import en masse : taille des lots d'insertion et nombre maximal d'erreurs détaillées dans le rapport
+    flask_app.config['IMPORT_BATCH_SIZE'] = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+    flask_app.config['IMPORT_MAX_REPORTED_ERRORS'] = int(os.environ.get('IMPORT_MAX_REPORTED_ERRORS', 1000))
+    # Export en flux : lignes chargées par aller-retour SQL
+    flask_app.config['EXPORT_YIELD_PER'] = int(os.environ.get('EXPORT_YIELD_PER', 1000))
+
+    # Métriques ; dossier partagé entre workers (gunicorn) : chaque processus y dépose son instantané
+    flask_app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+    flask_app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR')
+    flask_app.config['METRICS_FLUSH_INTERVAL'] = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+    # Jeton exigé par /metrics s'il est défini (en-tête "Authorization: Bearer <jeton>")
+    flask_app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+
+    # Requêtes SQL plus lentes que ce seuil journalisées avec leurs paramètres (0 = désactivé)
+    flask_app.config['SQL_SLOW_QUERY_MS'] = float(os.environ.get('SQL_SLOW_QUERY_MS', 200))
+    # Une même forme de requête exécutée plus de N fois dans une requête HTTP signale un N+1 (0 = désactivé)
+    flask_app.config['SQL_REPEATED_QUERY_THRESHOLD'] = int(os.environ.get('SQL_REPEATED_QUERY_THRESHOLD', 10))
+    # Résumé par requête (en-têtes X-SQL-Queries / Server-Timing + ligne de log) ; toujours actif en debug
+    flask_app.config['SQL_QUERY_SUMMARY'] = os.environ.get('SQL_QUERY_SUMMARY', '0').lower() in ('1', 'true', 'yes')
+
+    # Cache des réponses publiques (voir ResponseCache)
+    flask_app.config['RESPONSE_CACHE_ENABLED'] = os.environ.get('RESPONSE_CACHE_ENABLED', '1').lower() not in ('0', 'false', 'no')
+    flask_app.config['RESPONSE_CACHE_MAX_BYTES'] = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    # Durée de vie par endpoint (secondes, 0 = pas de cache), surchargeable par
+    # RESPONSE_CACHE_TTLS="home=600,tracking=0"
+    response_cache_ttls = {'home': 300, 'tracking': 300, 'public_page': 3600}
+    for item in os.environ.get('RESPONSE_CACHE_TTLS', '').split(','):
+        endpoint_name, _, ttl_value = item.partition('=')
+        if ttl_value.strip().isdigit():
+            response_cache_ttls[endpoint_name.strip()] = int(ttl_value)
+    flask_app.config['RESPONSE_CACHE_TTLS'] = response_cache_ttls
+
+    # Initialiser les extensions (SQLAlchemy au premier contexte d'application, voir init_sqlalchemy)
+    appcontext_pushed.connect(init_sqlalchemy, flask_app, weak=False)
+    login_manager.init_app(flask_app)
+    login_manager.login_view = 'login'
+    login_manager.login_message = 'Veuillez vous connecter pour accéder à cette page.'
+    login_manager.login_message_category = 'warning'
+    return flask_app
+
+
+app = configure_app()
+
+# Ajouter un filtre Jinja2 pour convertir les chemins relatifs en chemins statiques
+@app.template_filter('static_path')
+def static_path_filter(path):
+    """
+    Convertit un chemin relatif en chemin statique Flask. Le filtre n'empreinte rien lui-même :
+    url_for('static', ...) passe par fingerprint_static_url, qui résout la copie empreintée.
+    """
+    if path.startswith('assets/'):
+        return url_for('static', filename=path)
+    elif path.startswith('/assets/'):
+        return url_for('static', filename=path[1:])  # Enlever le / initial
+    elif path.startswith('static/'):
+        return url_for('static', filename=path[7:])  # Enlever 'static/'
+    elif path.startswith('/static/'):
+        return url_for('static', filename=path[8:])  # Enlever '/static/'
+    else:
+        return url_for('static', filename=path)
+
+# User loader pour Flask-Login
+@login_manager.user_loader
+def load_user(user_id):
+    """Charger un utilisateur par son ID"""
+    try:
+        return user_cache.load(int(user_id))
+    except Exception as e:
+        # Si la base de données n'est pas disponible, retourner None
+        # Cela permet au rendu des templates de continuer même sans DB
+        print(f"⚠ Erreur lors du chargement de l'utilisateur {user_id}: {str(e)}")
+        return None
+
+# ============================
+#   CACHE DE SUIVI
+# ============================
+
+class MemoryCacheBackend:
+    """Backend de cache en mémoire du processus : LRU borné avec expiration (TTL)"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def get_many(self, keys):
+        return {key: value for key in keys if (value := self.get(key)) is not None}
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def incr(self, key, amount, ttl):
+        """Ajoute amount au compteur key (créé pour ttl secondes s'il n'existe pas) et retourne sa valeur"""
+        with self._lock:
+            entry = self._data.get(key)
+            now = time.monotonic()
+            if entry is None or entry[0] < now:
+                entry = (now + ttl, 0)
+            self._data[key] = entry = (entry[0], entry[1] + amount)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return entry[1]
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCacheBackend:
+    """
+    Backend de cache partagé (Redis) pour servir plusieurs workers gunicorn.
+    L'éviction LRU et la taille maximale sont gérées par Redis (maxmemory-policy allkeys-lru).
+    """
+
+    def __init__(self, url, prefix='meridian:'):
+        import redis  # Dépendance optionnelle, uniquement si ce backend est choisi
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+        raws = self._client.mget([self.prefix + key for key in keys])
+        return {key: json.loads(raw) for key, raw in zip(keys, raws) if raw is not None}
+
+    def set(self, key, value, ttl):
+        self._client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def incr(self, key, amount, ttl):
+        value = self._client.incrby(self.prefix + key, amount)
+        if value == amount:
+            # Premier incrément de la fenêtre : fixer son expiration
+            self._client.expire(self.prefix + key, ttl)
+        return value
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + '*'):
+            self._client.delete(key)
+
+
+class TrackingCache:
+    """
+    Cache en lecture (read-through) des commandes consultées par le public.
+    Les entrées sont des dictionnaires Order.to_dict(), indexées par numéro de suivi
+    et par id, et invalidées à chaque création, modification ou suppression.
+    """
+
+    def __init__(self, backend=None, ttl=60, backend_factory=None):
+        self._backend = backend
+        self._backend_factory = backend_factory
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        # Créé au premier accès (import de redis, connexion) plutôt qu'au démarrage
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._backend_factory()
+        return self._backend
+
+    @staticmethod
+    def _tracking_key(tracking_number):
+        return f"tn:{tracking_number}"
+
+    @staticmethod
+    def _id_key(order_id):
+        return f"id:{order_id}"
+
+    @staticmethod
+    def _timeline_key(order_id):
+        return f"ev:{order_id}"
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _lookup(self, key, loader):
+        try:
+            cached = self.backend.get(key)
+        except Exception as e:
+            print(f"⚠ Erreur de lecture du cache de suivi : {str(e)}")
+            cached = None
+        if cached is not None:
+            self._count(hit=True)
+            return cached
+
+        self._count(hit=False)
+        order = loader()
+        if order is None:
+            return None
+        data = order.to_dict()
+        self.store(data)
+        return data
+
+    def get_by_tracking_number(self, tracking_number):
+        """Retourne la commande (dict) pour ce numéro de suivi, ou None"""
+        return self._lookup(
+            self._tracking_key(tracking_number),
+            lambda: Order.query.filter_by(tracking_number=tracking_number).first()
+        )
+
+    def get_by_id(self, order_id):
+        """Retourne la commande (dict) pour cet id, ou None"""
+        return self._lookup(self._id_key(order_id), lambda: db.session.get(Order, order_id))
+
+    def get_many_by_tracking_number(self, tracking_numbers):
+        """
+        Résout plusieurs numéros de suivi : d'abord le cache, puis une seule requête IN
+        pour les numéros absents. Retourne {numéro: commande (dict)} pour les numéros trouvés.
+        """
+        keys = {self._tracking_key(tn): tn for tn in tracking_numbers}
+        try:
+            cached = self.backend.get_many(list(keys))
+        except Exception as e:
+            print(f"⚠ Erreur de lecture du cache de suivi : {str(e)}")
+            cached = {}
+        found = {keys[key]: data for key, data in cached.items()}
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        missing = [tn for tn in tracking_numbers if tn not in found]
+        if missing:
+            for order in Order.query.filter(Order.tracking_number.in_(missing)):
+                data = order.to_dict()
+                self.store(data)
+                found[data['tracking_number']] = data
+        return found
+
+    def get_timeline(self, order_id, limit):
+        """Chronologie de la commande (du plus récent au plus ancien), le premier élément est le statut courant"""
+        key = self._timeline_key(order_id)
+        try:
+            cached = self.backend.get(key)
+        except Exception as e:
+            print(f"⚠ Erreur de lecture du cache de suivi : {str(e)}")
+            cached = None
+        if cached is not None:
+            self._count(hit=True)
+            return cached
+
+        self._count(hit=False)
+        timeline = load_timeline(order_id, limit)
+        try:
+            self.backend.set(key, timeline, self.ttl)
+        except Exception as e:
+            print(f"⚠ Erreur d'écriture du cache de suivi : {str(e)}")
+        return timeline
+
+    def invalidate_timeline(self, order_id):
+        try:
+            self.backend.delete(self._timeline_key(order_id))
+        except Exception as e:
+            print(f"⚠ Erreur d'invalidation du cache de suivi : {str(e)}")
+
+    def store(self, data):
+        try:
+            self.backend.set(self._tracking_key(data['tracking_number']), data, self.ttl)
+            self.backend.set(self._id_key(data['id']), data, self.ttl)
+        except Exception as e:
+            print(f"⚠ Erreur d'écriture du cache de suivi : {str(e)}")
+
+    def invalidate(self, order_id=None, *tracking_numbers):
+        """Invalide les entrées d'une commande (id et tous ses numéros de suivi, ancien et nouveau)"""
+        keys = [self._tracking_key(tn) for tn in tracking_numbers if tn]
+        if order_id is not None:
+            keys.extend([self._id_key(order_id), self._timeline_key(order_id)])
+        try:
+            self.backend.delete(*keys)
+        except Exception as e:
+            print(f"⚠ Erreur d'invalidation du cache de suivi : {str(e)}")
+
+    def clear(self):
+        try:
+            self.backend.clear()
+        except Exception as e:
+            print(f"⚠ Erreur lors du vidage du cache de suivi : {str(e)}")
+
+    def stats(self):
+        total = self.hits + self.misses
+        stats = {
+            "backend": type(self.backend).__name__,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None
+        }
+        if isinstance(self.backend, MemoryCacheBackend):
+            stats["entries"] = len(self.backend)
+            stats["max_entries"] = self.backend.max_entries
+        return stats
+
+
+def load_timeline(order_id, limit):
+    """Lit la chronologie d'une commande en une requête sur l'index (order_id, occurred_at)"""
+    events = (TrackingEvent.query
+              .filter(TrackingEvent.order_id == order_id)
+              .order_by(TrackingEvent.occurred_at.desc(), TrackingEvent.id.desc())
+              .limit(limit)
+              .all())
+    return [event.to_dict() for event in events]
+
+
+def load_latest_events(order_ids):
+    """Dernier événement de suivi de chaque commande, en une requête (fonction de fenêtre)"""
+    if not order_ids:
+        return {}
+    ranked = (
+        select(
+            TrackingEvent.order_id,
+            TrackingEvent.status,
+            TrackingEvent.occurred_at,
+            func.row_number().over(
+                partition_by=TrackingEvent.order_id,
+                order_by=(TrackingEvent.occurred_at.desc(), TrackingEvent.id.desc())
+            ).label('rank')
+        )
+        .where(TrackingEvent.order_id.in_(order_ids))
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(ranked.c.order_id, ranked.c.status, ranked.c.occurred_at).where(ranked.c.rank == 1)
+    )
+    return {row.order_id: row for row in rows}
+
+
+def to_naive_utc(value):
+    """
+    Ramène une date avec fuseau (ex. '2025-02-02T10:00:00+02:00' ou '...Z') en UTC naïf,
+    format de toutes les dates occurred_at stockées. Une date naïve est supposée déjà en UTC.
+    """
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def record_tracking_event(order_id, status, location=None, note=None, occurred_at=None):
+    """
+    Ajoute un événement de suivi. Seule la table tracking_events est écrite :
+    la ligne de la commande n'est ni relue ni réécrite.
+    """
+    values = {
+        'order_id': order_id,
+        'status': status,
+        'location': location or None,
+        'note': note or None,
+        'occurred_at': to_naive_utc(occurred_at) or datetime.utcnow()
+    }
+    # Statut courant avant l'événement, pour déplacer le compteur du tableau de bord
+    previous = db.session.execute(
+        select(TrackingEvent.status, TrackingEvent.occurred_at)
+        .where(TrackingEvent.order_id == order_id)
+        .order_by(TrackingEvent.occurred_at.desc(), TrackingEvent.id.desc())
+        .limit(1)
+    ).first()
+    db.session.execute(insert(TrackingEvent), [values])
+    if previous is None or values['occurred_at'] >= previous.occurred_at:
+        if previous is not None:
+            previous_status = previous.status
+        else:
+            previous_status = db.session.execute(
+                select(Order.current_location).where(Order.id == order_id)
+            ).scalar()
+        if previous_status != status:
+            apply_stats_deltas(Counter({('status', previous_status or ''): -1, ('status', status): 1}),
+                               db.session.connection())
+    db.session.commit()
+    tracking_cache.invalidate_timeline(order_id)
+    return values
+
+
+def create_tracking_cache_backend(config, prefix='meridian:'):
+    """Instancie le backend de cache configuré (memory par défaut, redis si demandé)"""
+    if config['TRACKING_CACHE_BACKEND'] == 'redis' and config['TRACKING_CACHE_URL']:
+        try:
+            return RedisCacheBackend(config['TRACKING_CACHE_URL'], prefix=prefix)
+        except Exception as e:
+            print(f"⚠ Backend Redis indisponible ({str(e)}) → cache en mémoire")
+    return MemoryCacheBackend(max_entries=config['TRACKING_CACHE_MAX_ENTRIES'])
+
+
+tracking_cache = TrackingCache(
+    ttl=app.config['TRACKING_CACHE_TTL'],
+    backend_factory=lambda: create_tracking_cache_backend(app.config)
+)
+
+
+class SessionUserCache:
+    """
+    Identité des administrateurs connectés (sans le hash du mot de passe), conservée quelques
+    secondes pour que load_user n'ouvre pas une connexion à chaque requête authentifiée.
+    Invalidée à la déconnexion, au changement de mot de passe et à la suppression du compte ;
+    avec le backend mémoire, la durée de vie courte borne le délai de prise en compte entre workers.
+    """
+
+    def __init__(self, ttl=30, backend_factory=None):
+        self.ttl = ttl
+        self._backend = None
+        self._backend_factory = backend_factory
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._backend_factory()
+        return self._backend
+
+    @staticmethod
+    def _key(user_id):
+        return f"user:{user_id}"
+
+    @staticmethod
+    def _to_dict(user):
+        return {
+            'id': user.id,
+            'email': user.email,
+            'is_admin': user.is_admin,
+            'created_at': user.created_at.isoformat() if user.created_at else None,
+            'last_login': user.last_login.isoformat() if user.last_login else None,
+        }
+
+    @staticmethod
+    def _to_user(data):
+        # Objet non attaché à la session : lecture seule (current_user), jamais ajouté ni modifié
+        return User(
+            id=data['id'],
+            email=data['email'],
+            is_admin=data['is_admin'],
+            created_at=datetime.fromisoformat(data['created_at']) if data['created_at'] else None,
+            last_login=datetime.fromisoformat(data['last_login']) if data['last_login'] else None,
+        )
+
+    def load(self, user_id):
+        """Utilisateur de la session : depuis le cache, sinon depuis la base (puis mis en cache)"""
+        if not self.ttl:
+            return db.session.get(User, user_id)
+        key = self._key(user_id)
+        try:
+            cached = self.backend.get(key)
+        except Exception as e:
+            print(f"⚠ Erreur de lecture du cache des utilisateurs : {str(e)}")
+            cached = None
+        if cached is not None:
+            return self._to_user(cached)
+
+        user = db.session.get(User, user_id)
+        if user is not None:
+            try:
+                self.backend.set(key, self._to_dict(user), self.ttl)
+            except Exception as e:
+                print(f"⚠ Erreur d'écriture du cache des utilisateurs : {str(e)}")
+        return user
+
+    def invalidate(self, *user_ids):
+        try:
+            self.backend.delete(*[self._key(user_id) for user_id in user_ids])
+        except Exception as e:
+            print(f"⚠ Erreur d'invalidation du cache des utilisateurs : {str(e)}")
+
+    def clear(self):
+        try:
+            self.backend.clear()
+        except Exception as e:
+            print(f"⚠ Erreur lors du vidage du cache des utilisateurs : {str(e)}")
+
+
+user_cache = SessionUserCache(
+    ttl=app.config['USER_CACHE_TTL'],
+    backend_factory=lambda: create_tracking_cache_backend(app.config, prefix='meridian:users:')
+)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def mark_user_changed(mapper, connection, target):
+    """Mot de passe, rôle ou compte modifiés/supprimés : invalider après la validation"""
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_user_ids', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_changed_users(session):
+    user_ids = session.info.pop('changed_user_ids', None)
+    if user_ids:
+        user_cache.invalidate(*user_ids)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def forget_changed_users(session, previous_transaction):
+    session.info.pop('changed_user_ids', None)
+
+# ============================
+#   FONCTIONS UTILITAIRES
+# ============================
+
+# Champs obligatoires d'une commande (hors numéro de suivi, attribué automatiquement)
+ORDER_REQUIRED_FIELDS = (
+    'sender_name', 'sender_phone', 'sender_email', 'sender_address',
+    'receiver_name', 'receiver_phone', 'receiver_email', 'receiver_address',
+    'shipment_name',
+    'origin_city', 'origin_country', 'destination_city', 'destination_country'
+)
+ORDER_OPTIONAL_FIELDS = ('pickup_date', 'pickup_time', 'delivery_date', 'delivery_time', 'current_location')
+
+# Formats acceptés pour les dates et heures de planification (formulaires, imports, anciennes données)
+SCHEDULE_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y', '%d.%m.%Y')
+SCHEDULE_TIME_FORMATS = ('%H:%M', '%H:%M:%S', '%Hh%M', '%H.%M')
+SCHEDULE_FIELDS = {
+    'pickup_date': 'date', 'pickup_time': 'time',
+    'delivery_date': 'date', 'delivery_time': 'time'
+}
+
+
+def parse_schedule_date(value):
+    """Convertit une valeur en date (None si vide ou illisible)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    value = str(value or '').strip()
+    for fmt in SCHEDULE_DATE_FORMATS:
+        try:
+            return datetime.strptime(value[:10], fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_schedule_time(value):
+    """Convertit une valeur en heure (None si vide ou illisible)"""
+    if isinstance(value, dt_time):
+        return value
+    value = str(value or '').strip().lower()
+    for fmt in SCHEDULE_TIME_FORMATS:
+        try:
+            return datetime.strptime(value[:8], fmt).time()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_schedule_fields(source):
+    """
+    Lit les champs de planification (dates/heures) d'un formulaire ou d'une ligne d'import.
+    Retourne (valeurs, erreur) ; un champ vide donne None, un champ illisible une erreur.
+    """
+    values = {}
+    for field, kind in SCHEDULE_FIELDS.items():
+        raw = source.get(field)
+        if raw is None or str(raw).strip() == '':
+            values[field] = None
+            continue
+        parsed = parse_schedule_date(raw) if kind == 'date' else parse_schedule_time(raw)
+        if parsed is None:
+            return None, f"Valeur invalide pour {field} : {raw}"
+        values[field] = parsed
+    return values, None
+
+# Espace des numéros de suivi XXXXXYY : 10^5 combinaisons de chiffres × 26^2 de lettres
+TRACKING_NUMBER_SPACE = 10 ** 5 * 26 ** 2
+
+
+class TrackingNumberAllocator:
+    """
+    Attribue des numéros de suivi uniques en O(1), sans requête d'existence.
+
+    Chaque worker réserve atomiquement un bloc de positions dans le compteur partagé
+    `sequence_counters`, puis transforme chaque position en numéro par une permutation
+    secrète (réseau de Feistel à clé + cycle-walking) de l'espace des 67,6 M codes.
+    Deux positions distinctes donnent toujours deux codes distincts, et des positions
+    consécutives donnent des codes sans lien apparent entre eux.
+
+    Sans clé fournie, la clé est tirée au hasard à la première attribution et conservée dans
+    `sequence_counters` (ligne `key_name`) : tous les workers et redémarrages utilisent la même.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, key=None, block_size=50, sequence_name='tracking_number',
+                 key_name='tracking_number_key', space=TRACKING_NUMBER_SPACE):
+        self.key = key.encode('utf-8') if isinstance(key, str) else key
+        self.block_size = block_size
+        self.sequence_name = sequence_name
+        self.key_name = key_name
+        self.space = space
+        # Demi-domaine du Feistel : half * half >= space
+        self.half = 1
+        while self.half * self.half < space:
+            self.half += 1
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def _stored_key(self):
+        """Clé conservée en base, créée (63 bits aléatoires) si elle n'existe pas encore"""
+        table = SequenceCounter.__table__
+        for _ in range(3):
+            with db.engine.begin() as conn:
+                value = conn.execute(select(table.c.value).where(table.c.name == self.key_name)).scalar()
+            if value is not None:
+                return value
+            try:
+                value = secrets.randbits(63)
+                with db.engine.begin() as conn:
+                    conn.execute(insert(table).values(name=self.key_name, value=value))
+                return value
+            except IntegrityError:
+                # Un autre worker l'a créée en même temps : relire la sienne
+                continue
+        raise RuntimeError("Impossible de lire la clé des numéros de suivi")
+
+    def _secret(self):
+        if self.key is None:
+            with self._lock:
+                if self.key is None:
+                    self.key = str(self._stored_key()).encode('ascii')
+        return self.key
+
+    def _round(self, round_index, value):
+        digest = hmac.new(self._secret(), f"{round_index}:{value}".encode('ascii'), hashlib.sha256).digest()
+        return int.from_bytes(digest[:8], 'big') % self.half
+
+    def _feistel(self, value):
+        left, right = divmod(value, self.half)
+        for round_index in range(self.ROUNDS):
+            left, right = right, (left + self._round(round_index, right)) % self.half
+        return left * self.half + right
+
+    def permute(self, position):
+        """Position dans la séquence → index unique dans [0, space)"""
+        value = self._feistel(position)
+        # Cycle-walking : ré-appliquer la permutation tant qu'on sort de l'espace
+        while value >= self.space:
+            value = self._feistel(value)
+        return value
+
+    @staticmethod
+    def format(index):
+        """Index dans [0, space) → numéro au format XXXXXYY"""
+        digits, letters = divmod(index, 26 ** 2)
+        first, second = divmod(letters, 26)
+        return f"{digits:05d}{string.ascii_uppercase[first]}{string.ascii_uppercase[second]}"
+
+    def _reserve_block(self, size):
+        """Réserve atomiquement [start, start + size) dans le compteur partagé"""
+        table = SequenceCounter.__table__
+        for _ in range(3):
+            try:
+                # Transaction séparée : la réservation est acquise même si l'insertion échoue ensuite
+                with db.engine.begin() as conn:
+                    updated = conn.execute(
+                        update(table)
+                        .where(table.c.name == self.sequence_name)
+                        .values(value=table.c.value + size)
+                    )
+                    if updated.rowcount == 0:
+                        conn.execute(insert(table).values(name=self.sequence_name, value=size))
+                        end = size
+                    else:
+                        end = conn.execute(
+                            select(table.c.value).where(table.c.name == self.sequence_name)
+                        ).scalar_one()
+            except IntegrityError:
+                # Un autre worker a créé le compteur en même temps : recommencer avec UPDATE
+                continue
+            # Bloc à cheval sur la fin de l'espace : rendre la partie encore libre
+            if end - size >= self.space:
+                raise RuntimeError("Espace des numéros de suivi épuisé")
+            return end - size, min(end, self.space)
+        raise RuntimeError("Impossible de réserver un bloc de numéros de suivi")
+
+    def position(self):
+        """Prochaine position de la séquence pour ce worker"""
+        with self._lock:
+            if self._next >= self._end:
+                self._next, self._end = self._reserve_block(self.block_size)
+            position = self._next
+            self._next += 1
+            return position
+
+    def allocate(self, count):
+        """Attribue `count` numéros d'un coup (une seule réservation pour les gros volumes)"""
+        with self._lock:
+            positions = []
+            available = self._end - self._next
+            if available >= count:
+                positions.extend(range(self._next, self._next + count))
+                self._next += count
+            else:
+                missing = count - available
+                start, end = self._reserve_block(max(missing, self.block_size))
+                if end - start < missing:
+                    # Dernier bloc de l'espace, trop court : le garder pour les demandes plus petites
+                    self._next, self._end = start, end
+                    raise RuntimeError("Espace des numéros de suivi épuisé")
+                positions.extend(range(self._next, self._end))
+                positions.extend(range(start, start + missing))
+                self._next, self._end = start + missing, end
+        return [self.format(self.permute(position)) for position in positions]
+
+    def next(self):
+        return self.format(self.permute(self.position()))
+
+
+tracking_allocator = TrackingNumberAllocator(
+    app.config['TRACKING_NUMBER_KEY'],
+    block_size=app.config['TRACKING_NUMBER_BLOCK_SIZE']
+)
+
+
+def generate_tracking_number():
+    """
+    Génère un numéro de colis unique au format XXXXXYY (5 chiffres + 2 lettres majuscules)
+    Exemple: 26382TU
+    Cette fonction doit être appelée depuis une route Flask pour avoir le contexte d'application.
+    """
+    return tracking_allocator.next()
+
+
+def commit_new_order(order, max_attempts=3):
+    """
+    Ajoute et valide une nouvelle commande. Les numéros de l'allocateur ne se chevauchent
+    jamais entre eux, mais peuvent rencontrer un numéro saisi à la main dans edit_order ou
+    issu de l'ancien générateur aléatoire : dans ce cas rare, un nouveau numéro est attribué.
+    """
+    for attempt in range(max_attempts):
+        db.session.add(order)
+        try:
+            db.session.commit()
+            return order
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == max_attempts - 1:
+                raise
+            order.tracking_number = generate_tracking_number()
+
+
+def ensure_indexes():
+    """
+    Crée les index déclarés sur les modèles s'ils n'existent pas encore.
+    db.create_all() ne crée les index que pour les nouvelles tables : cette fonction
+    permet d'ajouter les nouveaux index sur une base déjà déployée.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+    ensure_search_index()
+
+
+def encode_cursor(created_at, order_id):
+    """Encode la position (created_at, id) d'une commande en curseur opaque pour l'URL"""
+    raw = f"{created_at.isoformat()}|{order_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Décode un curseur de pagination. Retourne (created_at, id) ou None si invalide"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        created_at, order_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+
+def parse_date_arg(value, end_of_day=False):
+    """Convertit une date 'YYYY-MM-DD' en datetime (borne exclusive du lendemain si end_of_day)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return None
+    return parsed + timedelta(days=1) if end_of_day else parsed
+
+
+def parse_order_filters(args):
+    """Extrait les filtres de la liste des commandes depuis les paramètres de requête"""
+    return {
+        'destination_country': (args.get('destination_country') or '').strip(),
+        'status': (args.get('status') or '').strip(),
+        'date_from': (args.get('date_from') or '').strip(),
+        'date_to': (args.get('date_to') or '').strip(),
+    }
+
+
+def order_args_error(args):
+    """Message d'erreur si un filtre de date ou un curseur de la liste est illisible, sinon None"""
+    for name in ('date_from', 'date_to'):
+        value = (args.get(name) or '').strip()
+        if value and parse_date_arg(value) is None:
+            return f"Date invalide pour {name} : {value} (format attendu AAAA-MM-JJ)"
+    for name in ('after', 'before'):
+        if args.get(name) and decode_cursor(args[name]) is None:
+            return f"Curseur de pagination invalide : {name}"
+    return None
+
+
+def apply_order_filters(query, filters):
+    """
+    Applique les filtres (pays de destination, statut/current_location, plage de dates)
+    à une requête Order. Chaque filtre d'égalité est couvert par un index composite
+    se terminant par (created_at, id), ce qui garde l'ordre de pagination indexé.
+    """
+    if filters.get('destination_country'):
+        query = query.filter(Order.destination_country == filters['destination_country'])
+    if filters.get('status'):
+        query = query.filter(Order.current_location == filters['status'])
+    date_from = parse_date_arg(filters.get('date_from'))
+    if date_from:
+        query = query.filter(Order.created_at >= date_from)
+    date_to = parse_date_arg(filters.get('date_to'), end_of_day=True)
+    if date_to:
+        query = query.filter(Order.created_at < date_to)
+    return query
+
+
+def paginate_orders(query, page_size, after=None, before=None):
+    """
+    Pagination par curseur (keyset) sur (created_at, id), du plus récent au plus ancien.
+    Contrairement à OFFSET, le coût d'une page ne dépend pas de sa position dans la table.
+    Retourne (commandes, curseur_suivant, curseur_précédent).
+    """
+    after_key = decode_cursor(after) if after else None
+    before_key = decode_cursor(before) if before else None
+
+    if before_key:
+        # Page précédente : parcourir dans l'ordre croissant puis inverser
+        created_at, order_id = before_key
+        query = query.filter(or_(
+            Order.created_at > created_at,
+            and_(Order.created_at == created_at, Order.id > order_id)
+        )).order_by(Order.created_at.asc(), Order.id.asc())
+        rows = query.limit(page_size + 1).all()
+        has_more = len(rows) > page_size
+        orders = list(reversed(rows[:page_size]))
+        has_next, has_prev = True, has_more
+    else:
+        if after_key:
+            created_at, order_id = after_key
+            query = query.filter(or_(
+                Order.created_at < created_at,
+                and_(Order.created_at == created_at, Order.id < order_id)
+            ))
+        query = query.order_by(Order.created_at.desc(), Order.id.desc())
+        rows = query.limit(page_size + 1).all()
+        has_next = len(rows) > page_size
+        orders = rows[:page_size]
+        has_prev = after_key is not None
+
+    if not orders:
+        return orders, None, None
+    next_cursor = encode_cursor(orders[-1].created_at, orders[-1].id) if has_next else None
+    prev_cursor = encode_cursor(orders[0].created_at, orders[0].id) if has_prev else None
+    return orders, next_cursor, prev_cursor
+
+
+def encode_key_cursor(values):
+    """Encode une position (valeurs des colonnes de tri) en curseur opaque ; dates et heures en ISO 8601"""
+    raw = json.dumps([value.isoformat() if isinstance(value, (date, dt_time)) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_key_cursor(cursor, converters):
+    """
+    Décode un curseur de encode_key_cursor : chaque valeur non nulle passe par son convertisseur
+    (ex. date.fromisoformat, int). Retourne le tuple des valeurs ou None si le curseur est invalide.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        if not isinstance(values, list) or len(values) != len(converters):
+            return None
+        return tuple(None if value is None else convert(value) for value, convert in zip(values, converters))
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+
+def keyset_order(columns, reverse=False):
+    """Tri croissant sur columns, NULL en dernier (ordre des index PostgreSQL) ; reverse : l'inverse exact"""
+    if reverse:
+        return [column.desc().nulls_first() if column.nullable else column.desc() for column in columns]
+    return [column.asc().nulls_last() if column.nullable else column.asc() for column in columns]
+
+
+def keyset_condition(columns, values, after=True):
+    """
+    Lignes strictement après (ou avant) la position `values` dans l'ordre de keyset_order(columns),
+    colonne par colonne, NULL compris : (a, b) > (x, y) ⇔ a > x ou (a = x et b > y).
+    """
+    column, value = columns[0], values[0]
+    rest = keyset_condition(columns[1:], values[1:], after) if len(columns) > 1 else None
+    if value is None:
+        # Les NULL sont classés en dernier : après eux, rien ; avant eux, toute valeur non nulle
+        strict, equal = (false() if after else column.isnot(None)), column.is_(None)
+    elif after:
+        strict = or_(column > value, column.is_(None)) if column.nullable else column > value
+        equal = column == value
+    else:
+        strict, equal = column < value, column == value
+    return or_(strict, and_(equal, rest)) if rest is not None else strict
+
+
+def paginate_keyset(query, columns, page_size, after=None, before=None):
+    """
+    Pagination par curseur (keyset) dans l'ordre croissant de columns (la dernière doit être
+    unique, ex. id) : le coût d'une page ne dépend pas de sa position, contrairement à OFFSET.
+    after/before sont des positions décodées. Retourne (lignes, position_suivante, position_précédente).
+    """
+    if before is not None:
+        # Page précédente : parcourir dans l'ordre inverse puis rétablir l'ordre
+        rows = (query.filter(keyset_condition(columns, before, after=False))
+                .order_by(*keyset_order(columns, reverse=True)).limit(page_size + 1).all())
+        has_prev = len(rows) > page_size
+        rows = list(reversed(rows[:page_size]))
+        has_next = True
+    else:
+        if after is not None:
+            query = query.filter(keyset_condition(columns, after))
+        rows = query.order_by(*keyset_order(columns)).limit(page_size + 1).all()
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_prev = after is not None
+    if not rows:
+        return rows, None, None
+
+    def position(row):
+        return tuple(getattr(row, column.key) for column in columns)
+    return rows, position(rows[-1]) if has_next else None, position(rows[0]) if has_prev else None
+
+# ============================
+#   PLANIFICATION
+# ============================
+
+# Statuts considérés comme livrés (current_location ou événement de suivi)
+DELIVERED_STATUSES = ('Livré', 'Livrée', 'Delivered')
+
+SCHEDULE_VIEWS = {
+    'due-today': "Livraisons du jour",
+    'overdue': "Livraisons en retard",
+    'upcoming-pickups': "Enlèvements à venir",
+}
+
+
+def schedule_columns(view):
+    """Colonnes de tri (et du curseur) d'une vue de planification, celles de son index"""
+    if view == 'upcoming-pickups':
+        return (Order.pickup_date, Order.pickup_time, Order.id)
+    return (Order.delivery_date, Order.delivery_time, Order.id)
+
+
+# Types des valeurs d'un curseur de planification (date, heure, id)
+SCHEDULE_CURSOR_TYPES = (date.fromisoformat, dt_time.fromisoformat, int)
+
+
+def schedule_query(view, today, days=7):
+    """
+    Requête (non triée) d'une vue de planification. Chaque vue est un parcours de plage sur
+    l'index (delivery_date, delivery_time, id) ou (pickup_date, pickup_time, id), paginé par
+    curseur sur ces colonnes (voir schedule_columns et paginate_keyset).
+    """
+    if view == 'due-today':
+        return Order.query.filter(Order.delivery_date == today)
+    if view == 'overdue':
+        delivered_event = (
+            select(TrackingEvent.id)
+            .where(TrackingEvent.order_id == Order.id, TrackingEvent.status.in_(DELIVERED_STATUSES))
+            .exists()
+        )
+        return (Order.query
+                .filter(Order.delivery_date < today,
+                        or_(Order.current_location.is_(None), Order.current_location.notin_(DELIVERED_STATUSES)),
+                        ~delivered_event))
+    if view == 'upcoming-pickups':
+        return Order.query.filter(Order.pickup_date >= today, Order.pickup_date <= today + timedelta(days=days))
+    raise ValueError(f"Vue de planification inconnue : {view}")
+
+# ============================
+#   STATISTIQUES (TABLEAU DE BORD)
+# ============================
+
+def order_stat_keys(values):
+    """Clés (dimension, valeur) comptées pour une commande : pays, ligne, statut et jour de création"""
+    created_at = values.get('created_at') or datetime.utcnow()
+    destination = values.get('destination_country') or ''
+    return [
+        ('country', destination),
+        ('lane', f"{values.get('origin_country') or ''} → {destination}"),
+        ('status', values.get('status') or values.get('current_location') or ''),
+        ('day', created_at.date().isoformat()),
+    ]
+
+
+def count_order_stats(rows, sign=1):
+    """Variations des agrégats pour une liste de commandes (dictionnaires de valeurs)"""
+    deltas = Counter()
+    for values in rows:
+        for key in order_stat_keys(values):
+            deltas[key] += sign
+    return deltas
+
+
+def apply_stats_deltas(deltas, connection):
+    """
+    Applique des variations aux agrégats dans la transaction courante (upsert par clé),
+    pour que les compteurs restent cohérents avec l'écriture de la commande.
+    """
+    rows = [
+        {'dimension': dimension, 'key': key[:255], 'count': delta}
+        for (dimension, key), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    table = OrderStat.__table__
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        statement = upsert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=['dimension', 'key'],
+            set_={'count': table.c.count + statement.excluded.count}
+        )
+        connection.execute(statement, rows)
+        return
+    for row in rows:
+        updated = connection.execute(
+            update(table)
+            .where(table.c.dimension == row['dimension'], table.c.key == row['key'])
+            .values(count=table.c.count + row['count'])
+        )
+        if updated.rowcount == 0:
+            connection.execute(insert(table).values(**row))
+
+
+def _latest_event_status(session, order_id):
+    return session.execute(
+        select(TrackingEvent.status)
+        .where(TrackingEvent.order_id == order_id)
+        .order_by(TrackingEvent.occurred_at.desc(), TrackingEvent.id.desc())
+        .limit(1)
+    ).scalar()
+
+
+def _order_stat_values(order, committed=False):
+    """Valeurs utiles aux agrégats, actuelles ou telles qu'en base avant modification"""
+    state = sa_inspect(order)
+    values = {}
+    for field in ('destination_country', 'origin_country', 'current_location', 'created_at'):
+        if committed and field in state.committed_state:
+            values[field] = state.committed_state[field]
+        else:
+            values[field] = getattr(order, field)
+    return values
+
+
+@event.listens_for(Session, 'before_flush')
+def track_order_stats(session, flush_context, instances):
+    """Calcule les variations des agrégats pour les commandes créées, modifiées ou supprimées"""
+    deltas = Counter()
+    with session.no_autoflush:
+        pending_events = {}
+        for obj in session.new:
+            if isinstance(obj, TrackingEvent):
+                pending_events[obj.order_id] = obj.status
+
+        for obj in session.new:
+            if isinstance(obj, Order):
+                if obj.created_at is None:
+                    obj.created_at = datetime.utcnow()
+                deltas.update(count_order_stats([_order_stat_values(obj)]))
+
+        for obj in session.deleted:
+            if isinstance(obj, Order):
+                values = _order_stat_values(obj, committed=True)
+                values['status'] = _latest_event_status(session, obj.id)
+                deltas.update(count_order_stats([values], sign=-1))
+
+        for obj in session.dirty:
+            if not isinstance(obj, Order) or not session.is_modified(obj):
+                continue
+            old = _order_stat_values(obj, committed=True)
+            new = _order_stat_values(obj)
+            old['status'] = new['status'] = None
+            if old['current_location'] != new['current_location']:
+                # Le statut affiché est celui du dernier événement, à défaut current_location
+                persisted = _latest_event_status(session, obj.id)
+                old['status'] = persisted or old['current_location']
+                new['status'] = pending_events.get(obj.id) or persisted or new['current_location']
+            for old_key, new_key in zip(order_stat_keys(old), order_stat_keys(new)):
+                if old_key != new_key:
+                    deltas[old_key] -= 1
+                    deltas[new_key] += 1
+    session.info['order_stats_deltas'] = deltas
+
+
+@event.listens_for(Session, 'after_flush')
+def flush_order_stats(session, flush_context):
+    """Écrit les variations calculées avant le flush, dans la même transaction"""
+    deltas = session.info.pop('order_stats_deltas', None)
+    if deltas:
+        apply_stats_deltas(deltas, session.connection())
+
+
+def rebuild_order_stats():
+    """Recalcule entièrement les agrégats depuis les tables (réparation). Retourne le nombre de groupes"""
+    latest = (
+        select(
+            TrackingEvent.order_id,
+            TrackingEvent.status,
+            func.row_number().over(
+                partition_by=TrackingEvent.order_id,
+                order_by=(TrackingEvent.occurred_at.desc(), TrackingEvent.id.desc())
+            ).label('rank')
+        )
+        .subquery()
+    )
+    status = func.coalesce(latest.c.status, Order.current_location, '')
+    day = func.date(Order.created_at)
+    queries = {
+        'country': select(Order.destination_country, func.count()).group_by(Order.destination_country),
+        'lane': select(Order.origin_country, Order.destination_country, func.count())
+                .group_by(Order.origin_country, Order.destination_country),
+        'status': select(status, func.count())
+                  .select_from(Order)
+                  .outerjoin(latest, and_(latest.c.order_id == Order.id, latest.c.rank == 1))
+                  .group_by(status),
+        'day': select(day, func.count()).where(Order.created_at.isnot(None)).group_by(day),
+    }
+    with db.engine.begin() as conn:
+        conn.execute(delete(OrderStat.__table__))
+        deltas = Counter()
+        for dimension, query in queries.items():
+            for row in conn.execute(query):
+                if dimension == 'lane':
+                    key = f"{row[0] or ''} → {row[1] or ''}"
+                elif dimension == 'day':
+                    key = str(row[0])[:10]
+                else:
+                    key = row[0] or ''
+                deltas[(dimension, key)] += row[-1]
+        apply_stats_deltas(deltas, conn)
+    return len(deltas)
+
+
+def load_dashboard_stats(limit=20, days=30):
+    """Lit les agrégats : coût proportionnel au nombre de groupes, pas au nombre de commandes"""
+    table = OrderStat.__table__
+
+    def top(dimension):
+        rows = db.session.execute(
+            select(table.c.key, table.c.count)
+            .where(table.c.dimension == dimension, table.c.count > 0)
+            .order_by(table.c.count.desc(), table.c.key)
+            .limit(limit)
+        )
+        return [{"key": row.key, "count": row.count} for row in rows]
+
+    since = (datetime.utcnow().date() - timedelta(days=days - 1)).isoformat()
+    daily = db.session.execute(
+        select(table.c.key, table.c.count)
+        .where(table.c.dimension == 'day', table.c.key >= since, table.c.count > 0)
+        .order_by(table.c.key)
+    )
+    total = db.session.execute(
+        select(func.coalesce(func.sum(table.c.count), 0)).where(table.c.dimension == 'country')
+    ).scalar()
+    return {
+        "total_orders": int(total),
+        "by_destination_country": top('country'),
+        "by_lane": top('lane'),
+        "by_status": top('status'),
+        "by_day": [{"key": row.key, "count": row.count} for row in daily],
+    }
+
+# ============================
+#   RECHERCHE PLEIN TEXTE
+# ============================
+
+# Colonnes indexées pour la recherche admin
+SEARCH_COLUMNS = (
+    'tracking_number', 'sender_name', 'sender_email', 'sender_phone',
+    'receiver_name', 'receiver_email', 'receiver_phone',
+    'shipment_name', 'origin_city', 'destination_city'
+)
+
+_search_index_ready = False
+
+
+def search_dialect():
+    """Moteur de recherche disponible : 'sqlite' (FTS5), 'postgresql' (tsvector/GIN) ou None"""
+    name = db.engine.dialect.name
+    return name if name in ('sqlite', 'postgresql') else None
+
+
+def ensure_search_index():
+    """
+    Crée l'index plein texte s'il n'existe pas encore (appelé par ensure_indexes, donc par
+    init_db.py et /init-db ; jamais pendant une requête de recherche) :
+    - SQLite : table FTS5 à contenu externe (orders_fts) synchronisée par triggers
+    - PostgreSQL : colonne générée search_vector (tsvector) avec index GIN
+    La synchronisation est assurée par la base elle-même, pour toutes les écritures
+    (add_order, edit_order, delete_order, import, migration).
+    """
+    global _search_index_ready
+    dialect = search_dialect()
+    if dialect == 'sqlite':
+        columns = ', '.join(SEARCH_COLUMNS)
+        new_columns = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+        old_columns = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS orders_fts USING fts5("
+                f"{columns}, content='orders', content_rowid='id')"
+            ))
+            has_triggers = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'orders_fts_insert'"
+            )).first()
+            if not has_triggers:
+                conn.execute(text(
+                    f"CREATE TRIGGER orders_fts_insert AFTER INSERT ON orders BEGIN "
+                    f"INSERT INTO orders_fts(rowid, {columns}) VALUES (new.id, {new_columns}); END"
+                ))
+                conn.execute(text(
+                    f"CREATE TRIGGER orders_fts_delete AFTER DELETE ON orders BEGIN "
+                    f"INSERT INTO orders_fts(orders_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns}); END"
+                ))
+                conn.execute(text(
+                    f"CREATE TRIGGER orders_fts_update AFTER UPDATE ON orders BEGIN "
+                    f"INSERT INTO orders_fts(orders_fts, rowid, {columns}) VALUES ('delete', old.id, {old_columns}); "
+                    f"INSERT INTO orders_fts(rowid, {columns}) VALUES (new.id, {new_columns}); END"
+                ))
+                # Index absent ou désynchronisé (tables recréées) : reconstruire depuis orders
+                conn.execute(text("INSERT INTO orders_fts(orders_fts) VALUES ('rebuild')"))
+    elif dialect == 'postgresql':
+        # Les e-mails sont découpés (@ et . → espaces) pour être trouvés par nom ou domaine
+        document = " || ' ' || ".join(
+            f"translate(coalesce({column}, ''), '@.', '  ')" if column.endswith('_email')
+            else f"coalesce({column}, '')"
+            for column in SEARCH_COLUMNS
+        )
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE orders ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, {document})) STORED"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_orders_search_vector ON orders USING GIN (search_vector)"
+            ))
+    _search_index_ready = dialect is not None
+
+
+def search_index_ready():
+    """Index plein texte présent ? (vérifié en base jusqu'à ce qu'il le soit, puis mémorisé)"""
+    global _search_index_ready
+    if not _search_index_ready:
+        dialect = search_dialect()
+        if dialect == 'sqlite':
+            sql = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'orders_fts'"
+        elif dialect == 'postgresql':
+            sql = ("SELECT 1 FROM information_schema.columns "
+                   "WHERE table_name = 'orders' AND column_name = 'search_vector'")
+        else:
+            return False
+        _search_index_ready = db.session.execute(text(sql)).first() is not None
+    return _search_index_ready
+
+
+# Types des valeurs d'un curseur de recherche (score, id)
+SEARCH_CURSOR_TYPES = (float, int)
+
+
+def search_terms(query):
+    """Découpe la saisie en termes alphanumériques (les opérateurs des moteurs sont ignorés)"""
+    return re.findall(r'\w+', query.lower())[:10]
+
+
+def search_orders(query, per_page=50, after=None, before=None):
+    """
+    Recherche classée par pertinence, chaque terme étant recherché en préfixe. Le score vaut
+    bm25 sous SQLite et -ts_rank sous PostgreSQL (plus petit = plus pertinent) ; les pages
+    sont parcourues par curseur sur (score, id), positions décodées after/before.
+    Retourne (commandes, position_suivante, position_précédente).
+    """
+    terms = search_terms(query)
+    dialect = search_dialect()
+    if not terms or dialect is None:
+        return [], None, None
+
+    params = {'limit': per_page + 1}
+    if dialect == 'sqlite':
+        params['match'] = ' '.join(f'"{term}"*' for term in terms)
+        matches = ("SELECT rowid AS id, bm25(orders_fts) AS score "
+                   "FROM orders_fts WHERE orders_fts MATCH :match")
+    else:
+        params['tsquery'] = ' & '.join(f'{term}:*' for term in terms)
+        matches = ("SELECT id, -ts_rank(search_vector, to_tsquery('simple', :tsquery)) AS score "
+                   "FROM orders WHERE search_vector @@ to_tsquery('simple', :tsquery)")
+    # Ordre : score croissant puis id décroissant (les plus récentes d'abord à pertinence égale)
+    condition, order = '', 'score ASC, id DESC'
+    if before is not None:
+        params['score'], params['id'] = before
+        condition = 'WHERE score < :score OR (score = :score AND id > :id)'
+        order = 'score DESC, id ASC'
+    elif after is not None:
+        params['score'], params['id'] = after
+        condition = 'WHERE score > :score OR (score = :score AND id < :id)'
+    rows = db.session.execute(
+        text(f"SELECT id, score FROM ({matches}) AS matches {condition} ORDER BY {order} LIMIT :limit"),
+        params
+    ).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before is not None:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, after is not None
+    if not rows:
+        return [], None, None
+
+    # Recharger les commandes puis rétablir l'ordre de pertinence
+    orders = {order.id: order for order in Order.query.filter(Order.id.in_([row.id for row in rows]))}
+    return ([orders[row.id] for row in rows if row.id in orders],
+            (rows[-1].score, rows[-1].id) if has_next else None,
+            (rows[0].score, rows[0].id) if has_prev else None)
+
+# ============================
+#   IMPORT EN MASSE
+# ============================
+
+def iter_import_rows(stream, fmt):
+    """
+    Lit un fichier CSV ou JSONL ligne par ligne (flux texte) sans le charger en mémoire.
+    Produit des tuples (numéro_de_ligne, données, erreur).
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+    elif fmt in ('jsonl', 'ndjson'):
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"JSON invalide : {str(e)}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Chaque ligne doit être un objet JSON"
+                continue
+            yield line_number, row, None
+    else:
+        raise ValueError(f"Format d'import non supporté : {fmt}")
+
+
+def validate_import_row(row):
+    """
+    Valide une ligne d'import avec les mêmes champs obligatoires que add_order.
+    Retourne (valeurs, erreur) ; le numéro de suivi est attribué plus tard, en masse.
+    """
+    schedule, error = parse_schedule_fields(row)
+    if error:
+        return None, error
+    values = {field: value for field, value in schedule.items() if value is not None}
+    missing = []
+    for field in ORDER_REQUIRED_FIELDS + ORDER_OPTIONAL_FIELDS:
+        if field in SCHEDULE_FIELDS:
+            continue
+        value = row.get(field)
+        value = str(value).strip() if value is not None else ''
+        if not value:
+            if field in ORDER_REQUIRED_FIELDS:
+                missing.append(field)
+            continue
+        max_length = getattr(Order.__table__.c[field].type, 'length', None)
+        if max_length and len(value) > max_length:
+            return None, f"Champ {field} trop long ({len(value)} > {max_length} caractères)"
+        values[field] = value
+    if missing:
+        return None, f"Champs obligatoires manquants : {', '.join(missing)}"
+    values.setdefault('current_location', 'En préparation')
+    return values, None
+
+
+def _insert_import_batch(batch, report):
+    """Insère un lot dans une transaction ; en cas d'échec, isole les lignes fautives une par une"""
+    tracking_numbers = tracking_allocator.allocate(len(batch))
+    created_at = datetime.utcnow()
+    rows = [dict(values, tracking_number=tn, created_at=created_at)
+            for (_, values), tn in zip(batch, tracking_numbers)]
+    try:
+        db.session.execute(insert(Order), rows)
+        apply_stats_deltas(count_order_stats(rows), db.session.connection())
+        db.session.commit()
+        report['imported'] += len(rows)
+        return
+    except Exception:
+        db.session.rollback()
+
+    for (line_number, _), values in zip(batch, rows):
+        try:
+            db.session.execute(insert(Order), [values])
+            apply_stats_deltas(count_order_stats([values]), db.session.connection())
+            db.session.commit()
+            report['imported'] += 1
+        except IntegrityError:
+            # Collision rare avec un numéro hérité : réessayer avec un nouveau numéro
+            db.session.rollback()
+            try:
+                db.session.execute(insert(Order), [dict(values, tracking_number=generate_tracking_number())])
+                apply_stats_deltas(count_order_stats([values]), db.session.connection())
+                db.session.commit()
+                report['imported'] += 1
+            except Exception as e:
+                db.session.rollback()
+                _record_import_error(report, line_number, str(e))
+        except Exception as e:
+            db.session.rollback()
+            _record_import_error(report, line_number, str(e))
+
+
+def _record_import_error(report, line_number, message):
+    report['failed'] += 1
+    if len(report['errors']) < app.config['IMPORT_MAX_REPORTED_ERRORS']:
+        report['errors'].append({"line": line_number, "error": message})
+    else:
+        report['errors_truncated'] = True
+
+
+def import_orders(stream, fmt, batch_size=None):
+    """
+    Importe des commandes depuis un flux CSV/JSONL par lots transactionnels.
+    Seul le lot courant est gardé en mémoire ; les lignes invalides sont rapportées
+    sans interrompre l'import. Retourne un rapport (importées, échouées, erreurs).
+    """
+    batch_size = max(1, batch_size or app.config['IMPORT_BATCH_SIZE'])
+    report = {"imported": 0, "failed": 0, "batches": 0, "errors": [], "errors_truncated": False}
+    batch = []
+
+    for line_number, row, error in iter_import_rows(stream, fmt):
+        if error is None:
+            values, error = validate_import_row(row)
+        if error:
+            _record_import_error(report, line_number, error)
+            continue
+        batch.append((line_number, values))
+        if len(batch) >= batch_size:
+            _insert_import_batch(batch, report)
+            report['batches'] += 1
+            batch = []
+
+    if batch:
+        _insert_import_batch(batch, report)
+        report['batches'] += 1
+    return report
+
+
+def detect_import_format(filename, explicit=None):
+    """Déduit le format d'import (csv/jsonl) depuis le paramètre explicite ou l'extension"""
+    if explicit:
+        return explicit.lower()
+    extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    return 'jsonl' if extension in ('jsonl', 'ndjson', 'json') else 'csv'
+
+# ============================
+#   EXPORT EN FLUX
+# ============================
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/jsonl',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Colonnes exportées, dans l'ordre : un champ ajouté à Order.to_dict() n'entre pas dans
+# l'export (ni ne décale les colonnes CSV) tant qu'il n'est pas listé ici
+EXPORT_COLUMNS = (
+    'id', 'tracking_number', 'shipment_name',
+    'sender_name', 'sender_phone', 'sender_email', 'sender_address',
+    'receiver_name', 'receiver_phone', 'receiver_email', 'receiver_address',
+    'origin_city', 'origin_country', 'destination_city', 'destination_country', 'current_location',
+    'pickup_date', 'pickup_time', 'delivery_date', 'delivery_time',
+    'created_at', 'updated_at'
+)
+
+
+def iter_export_orders(filters):
+    """
+    Parcourt les commandes filtrées par paquets (yield_per → curseur côté serveur sur PostgreSQL),
+    du plus récent au plus ancien, sans matérialiser la table.
+    """
+    query = apply_order_filters(Order.query, filters).order_by(Order.created_at.desc(), Order.id.desc())
+    for order in query.yield_per(app.config['EXPORT_YIELD_PER']):
+        data = order.to_dict()
+        yield {column: data[column] for column in EXPORT_COLUMNS}
+
+
+def generate_export(filters, fmt, flush_every=500):
+    """Produit l'export par morceaux : l'en-tête est envoyé immédiatement, puis un morceau toutes les `flush_every` lignes"""
+    buffer = io.StringIO()
+    writer = None
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    pending = 0
+    for row in iter_export_orders(filters):
+        if writer is not None:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row, ensure_ascii=False))
+            buffer.write('\n')
+        pending += 1
+        if pending >= flush_every:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+# ============================
+#   MÉTRIQUES
+# ============================
+
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+METRICS_QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# nom : (type, description, étiquettes, seuils des histogrammes)
+METRICS_DEFINITIONS = {
+    'http_requests_total': (
+        'counter', "Requêtes HTTP traitées", ('endpoint', 'method', 'status'), None),
+    'http_request_duration_seconds': (
+        'histogram', "Durée de traitement des requêtes HTTP", ('endpoint', 'method'), METRICS_LATENCY_BUCKETS),
+    'http_request_size_bytes': (
+        'histogram', "Taille du corps des requêtes HTTP", ('endpoint',), METRICS_SIZE_BUCKETS),
+    'http_response_size_bytes': (
+        'histogram', "Taille du corps des réponses HTTP (hors flux)", ('endpoint',), METRICS_SIZE_BUCKETS),
+    'http_request_sql_queries': (
+        'histogram', "Requêtes SQL exécutées par requête HTTP", ('endpoint',), METRICS_QUERY_BUCKETS),
+    'http_request_sql_duration_seconds': (
+        'histogram', "Temps SQL cumulé par requête HTTP", ('endpoint',), METRICS_LATENCY_BUCKETS),
+}
+
+
+class MetricsRegistry:
+    """
+    Compteurs et histogrammes en mémoire, protégés par un verrou (workers multi-thread).
+    Avec un dossier partagé, chaque processus y écrit périodiquement son instantané
+    et /metrics additionne ceux de tous les workers. L'instantané d'un worker est supprimé
+    à sa sortie, ou ignoré puis supprimé si son processus n'existe plus (arrêt brutal) :
+    ses compteurs disparaissent de la somme, ce que Prometheus traite comme une remise à zéro.
+    """
+
+    def __init__(self, definitions, directory=None, flush_interval=5):
+        self.definitions = definitions
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._series = {name: {} for name in definitions}
+        self._last_flush = 0.0
+        self._registered_exit = False
+
+    def inc(self, name, labels, value=1):
+        with self._lock:
+            series = self._series[name]
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name, labels, value):
+        buckets = self.definitions[name][3]
+        with self._lock:
+            entry = self._series[name].get(labels)
+            if entry is None:
+                entry = self._series[name][labels] = [[0] * len(buckets), 0, 0]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self):
+        """Copie sérialisable en JSON : {nom: [[étiquettes, valeur], ...]}"""
+        with self._lock:
+            return {
+                name: [[list(labels), json.loads(json.dumps(value))] for labels, value in series.items()]
+                for name, series in self._series.items()
+            }
+
+    def flush(self, force=False):
+        """Écrit l'instantané du processus dans le dossier partagé (au plus toutes les flush_interval s)"""
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        if not self._registered_exit:
+            self._registered_exit = True
+            atexit.register(self.remove_snapshot)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._snapshot_path(os.getpid())
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠ Écriture des métriques impossible : {str(e)}")
+
+    def _snapshot_path(self, pid):
+        return os.path.join(self.directory, f"metrics-{pid}.json")
+
+    def remove_snapshot(self, pid=None):
+        """Supprime l'instantané d'un worker (ce processus par défaut, à sa sortie)"""
+        try:
+            os.remove(self._snapshot_path(pid or os.getpid()))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _process_alive(pid):
+        # os.kill(pid, 0) ne fait que tester l'existence sous POSIX (sous Windows, il terminerait le processus)
+        if os.name != 'posix' or pid == os.getpid():
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True
+        return True
+
+    def collect(self):
+        """Séries agrégées sur tous les workers (ou ce seul processus sans dossier partagé)"""
+        snapshots = [self.snapshot()]
+        if self.directory:
+            self.flush(force=True)
+            snapshots = []
+            for filename in sorted(os.listdir(self.directory)):
+                if not (filename.startswith('metrics-') and filename.endswith('.json')):
+                    continue
+                pid = filename[len('metrics-'):-len('.json')]
+                if pid.isdigit() and not self._process_alive(int(pid)):
+                    # Worker arrêté sans passer par sa sortie normale : instantané orphelin
+                    self.remove_snapshot(int(pid))
+                    continue
+                try:
+                    with open(os.path.join(self.directory, filename), 'r', encoding='utf-8') as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+
+        merged = {name: {} for name in self.definitions}
+        for snapshot in snapshots:
+            for name, series in snapshot.items():
+                if name not in merged:
+                    continue
+                for labels, value in series:
+                    labels = tuple(labels)
+                    current = merged[name].get(labels)
+                    if current is None:
+                        merged[name][labels] = value
+                    elif isinstance(value, list):
+                        current[0] = [a + b for a, b in zip(current[0], value[0])]
+                        current[1] += value[1]
+                        current[2] += value[2]
+                    else:
+                        merged[name][labels] = current + value
+        return merged
+
+    @staticmethod
+    def _labels(names, values, extra=None):
+        pairs = list(zip(names, values)) + (extra or [])
+        if not pairs:
+            return ''
+        escaped = []
+        for key, value in pairs:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{key}="{value}"')
+        return '{' + ','.join(escaped) + '}'
+
+    def render(self):
+        """Format texte d'exposition Prometheus (version 0.0.4)"""
+        lines = []
+        for name, series in self.collect().items():
+            kind, description, label_names, buckets = self.definitions[name]
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(series.items()):
+                if kind == 'counter':
+                    lines.append(f"{name}{self._labels(label_names, labels)} {value}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{self._labels(label_names, labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_bucket{self._labels(label_names, labels, [('le', '+Inf')])} {count}")
+                lines.append(f"{name}_sum{self._labels(label_names, labels)} {round(total, 6)}")
+                lines.append(f"{name}_count{self._labels(label_names, labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry(
+    METRICS_DEFINITIONS,
+    directory=app.config['METRICS_DIR'],
+    flush_interval=app.config['METRICS_FLUSH_INTERVAL']
+)
+
+
+@app.before_request
+def start_request_metrics():
+    if app.config['METRICS_ENABLED']:
+        g.metrics_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Enregistre durée, statut, tailles et coût SQL de la requête, par endpoint (règle Flask)"""
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    duration = time.perf_counter() - started
+    # L'endpoint (et non l'URL) borne le nombre de séries : /order/1, /order/2... → order_detail
+    endpoint = request.endpoint or 'unmatched'
+    metrics.inc('http_requests_total', (endpoint, request.method, str(response.status_code)))
+    metrics.observe('http_request_duration_seconds', (endpoint, request.method), duration)
+    metrics.observe('http_request_size_bytes', (endpoint,), request.content_length or 0)
+    if not response.is_streamed and response.content_length is not None:
+        metrics.observe('http_response_size_bytes', (endpoint,), response.content_length)
+    metrics.observe('http_request_sql_queries', (endpoint,), g.get('sql_queries', 0))
+    metrics.observe('http_request_sql_duration_seconds', (endpoint,), g.get('sql_duration', 0.0))
+    metrics.flush()
+    return response
+
+# ============================
+#   INSTRUMENTATION SQL
+# ============================
+
+SQL_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+SQL_PLACEHOLDER_LIST_PATTERN = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+))*\s*\)")
+SQL_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    """Forme d'une requête : littéraux et listes IN réduits, pour regrouper les exécutions identiques"""
+    shape = SQL_LITERAL_PATTERN.sub('?', statement)
+    shape = SQL_PLACEHOLDER_LIST_PATTERN.sub('(?)', shape)
+    return SQL_WHITESPACE_PATTERN.sub(' ', shape).strip()
+
+
+def sql_context_label():
+    """Route (ou script) à l'origine d'une requête SQL, pour les journaux"""
+    if has_request_context():
+        return f"{request.method} {request.path} ({request.endpoint or 'unmatched'})"
+    return os.path.basename(sys.argv[0]) or 'hors requête'
+
+
+def format_sql_parameters(parameters, executemany, limit=500):
+    if executemany:
+        parameters = f"{len(parameters)} jeu(x), premier : {parameters[0] if parameters else None!r}"
+    text_value = parameters if isinstance(parameters, str) else repr(parameters)
+    return text_value if len(text_value) <= limit else text_value[:limit] + '…'
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_sql_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def stop_sql_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    slow_ms = app.config['SQL_SLOW_QUERY_MS']
+    if slow_ms and elapsed * 1000 >= slow_ms:
+        print(f"⚠ Requête SQL lente ({elapsed * 1000:.1f} ms) [{sql_context_label()}] : "
+              f"{SQL_WHITESPACE_PATTERN.sub(' ', statement).strip()} | paramètres : "
+              f"{format_sql_parameters(parameters, executemany)}")
+
+    if has_request_context() and 'sql_queries' in g:
+        g.sql_queries += 1
+        g.sql_duration += elapsed
+        g.sql_shapes[statement_shape(statement)] += 1
+
+
+@event.listens_for(Engine, 'handle_error')
+def discard_sql_timer(exception_context):
+    # Requête en échec : after_cursor_execute n'est pas appelé
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+
+@app.before_request
+def start_sql_tracking():
+    g.sql_queries = 0
+    g.sql_duration = 0.0
+    g.sql_shapes = Counter()
+
+
+@app.after_request
+def report_sql_usage(response):
+    """Signale les requêtes répétées (N+1) et, en debug, ajoute le résumé SQL de la requête"""
+    shapes = g.get('sql_shapes')
+    if shapes is None:
+        return response
+    threshold = app.config['SQL_REPEATED_QUERY_THRESHOLD']
+    repeated = [(shape, count) for shape, count in shapes.most_common() if threshold and count > threshold]
+    for shape, count in repeated:
+        print(f"⚠ N+1 probable [{sql_context_label()}] : {count} × {shape[:300]}")
+
+    if app.debug or app.config['SQL_QUERY_SUMMARY']:
+        duration_ms = g.sql_duration * 1000
+        response.headers['X-SQL-Queries'] = f"{g.sql_queries}; time={duration_ms:.1f}ms; repeated={len(repeated)}"
+        response.headers.add('Server-Timing', f'db;desc="SQL x{g.sql_queries}";dur={duration_ms:.1f}')
+        print(f"SQL [{sql_context_label()}] : {g.sql_queries} requête(s), {duration_ms:.1f} ms, "
+              f"{len(shapes)} forme(s) distincte(s), {len(repeated)} répétée(s)")
+    return response
+
+# ============================
+#   FICHIERS STATIQUES
+# ============================
+
+# Extensions texte pour lesquelles build_static.py écrit des variantes .br et .gz
+STATIC_COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.html', '.json', '.webmanifest',
+                                  '.txt', '.xml', '.ttf', '.eot', '.otf')
+# Encodages précompressés, par ordre de préférence à qualité égale
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+# Empreinte du contenu de chaque original compressé (build_static.py --steps compress), relatif au
+# dossier compressé : une variante n'est servie que si l'original n'a pas changé depuis
+STATIC_COMPRESSED_MANIFEST_FILE = 'compressed-manifest.json'
+# Manifeste des copies empreintées (build_static.py --steps fingerprint), relatif à app/static
+STATIC_MANIFEST_FILE = 'asset-manifest.json'
+# Clé du manifeste listant les copies d'un build précédent encore citées par les pages pré-rendues
+STATIC_MANIFEST_RETAINED_KEY = '_retained'
+
+# Images déclinées en largeurs et formats modernes (build_static.py --steps images)
+STATIC_IMAGE_DIRS = ('assets/img/services', 'assets/img/service')
+STATIC_IMAGE_WIDTHS = (320, 480, 640, 960, 1280)
+STATIC_IMAGE_FORMATS = ('avif', 'webp')
+STATIC_IMAGE_MANIFEST_FILE = 'image-manifest.json'
+# Absent de la table mimetypes de certaines images Python (dont celle de Vercel)
+mimetypes.add_type('image/avif', '.avif')
+
+# Bundles CSS/JS (build_static.py --steps bundle) : fichier produit → fichiers concaténés dans l'ordre
+STATIC_BUNDLES = {
+    # Feuilles des bibliothèques (base.html)
+    'assets/dist/vendor.css': [
+        'assets/css/bootstrap.min.css',
+        'assets/css/animate.min.css',
+        'assets/css/custom-animate.css',
+        'assets/css/swiper.min.css',
+        'assets/css/font-awesome-all.css',
+        'assets/css/jarallax.css',
+        'assets/css/jquery.magnific-popup.css',
+        'assets/css/odometer.min.css',
+        'assets/css/flaticon.css',
+        'assets/css/owl.carousel.min.css',
+        'assets/css/owl.theme.default.min.css',
+        'assets/css/nice-select.css',
+        'assets/css/jquery-ui.css',
+    ],
+    # Feuilles du thème (base.html)
+    'assets/dist/site.css': [
+        'assets/css/module-css/slider.css',
+        'assets/css/module-css/banner.css',
+        'assets/css/module-css/footer.css',
+        'assets/css/module-css/contact.css',
+        'assets/css/style.css',
+        'assets/css/responsive.css',
+        'assets/css/custom.css',
+    ],
+    # jQuery, plugins et script du thème (pages publiques)
+    'assets/dist/public.js': [
+        'assets/js/jquery-3.6.0.min.js',
+        'assets/js/bootstrap.bundle.min.js',
+        'assets/js/jarallax.min.js',
+        'assets/js/jquery.ajaxchimp.min.js',
+        'assets/js/jquery.appear.min.js',
+        'assets/js/swiper.min.js',
+        'assets/js/jquery.circle-progress.min.js',
+        'assets/js/jquery.magnific-popup.min.js',
+        'assets/js/jquery.validate.min.js',
+        'assets/js/odometer.min.js',
+        'assets/js/wNumb.min.js',
+        'assets/js/wow.js',
+        'assets/js/isotope.js',
+        'assets/js/owl.carousel.min.js',
+        'assets/js/jquery.circleType.js',
+        'assets/js/jquery.lettering.min.js',
+        'assets/js/jquery.nice-select.min.js',
+        'assets/js/marquee.min.js',
+        'assets/js/countdown.min.js',
+        'assets/js/jquery-sidebar-content.js',
+        'assets/js/gsap.js',
+        'assets/js/ScrollTrigger.js',
+        'assets/js/SplitText.js',
+        'assets/js/jquery-ui.js',
+        'assets/js/curved-text/jquery.circleType.js',
+        'assets/js/curved-text/jquery.fittext.js',
+        'assets/js/curved-text/jquery.lettering.min.js',
+        'assets/js/script.js',
+    ],
+}
+
+_static_etags = {}
+_static_etags_lock = threading.Lock()
+
+
+def static_etag(path, stat):
+    """ETag fort (empreinte du contenu), calculé une fois par version du fichier"""
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    etag = _static_etags.get(key)
+    if etag is None:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        etag = digest.hexdigest()[:32]
+        with _static_etags_lock:
+            if len(_static_etags) > 4096:
+                _static_etags.clear()
+            _static_etags[key] = etag
+    return etag
+
+
+def negotiate_static_variant(root, rel, path, source_stat):
+    """
+    Variante précompressée acceptée par le client, si le manifeste de compression de `root`
+    l'a produite à partir du contenu actuel de l'original (les dates de modification ne sont pas
+    fiables après un clone ou un déploiement), sinon l'original
+    """
+    if compressed_manifest(root).get(rel) != static_etag(path, source_stat):
+        return path, None, source_stat
+    accepted = [
+        (request.accept_encodings[encoding], -index, encoding, suffix)
+        for index, (encoding, suffix) in enumerate(STATIC_ENCODINGS)
+        if request.accept_encodings[encoding] > 0
+    ]
+    for _, _, encoding, suffix in sorted(accepted, reverse=True):
+        try:
+            variant_stat = os.stat(path + suffix)
+        except OSError:
+            continue
+        return path + suffix, encoding, variant_stat
+    return path, None, source_stat
+
+
+class AssetManifest:
+    """
+    Correspondance chemin logique → copie empreintée (ex. assets/css/style.css →
+    assets/css/style.3f2a1b9c0d.css), chargée en mémoire une fois par processus.
+    Sans manifeste (build non exécuté), les chemins logiques sont conservés.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+        self._fingerprinted = frozenset()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        entries = self._entries
+        if entries is None:
+            with self._lock:
+                if self._entries is None:
+                    try:
+                        with open(self.path, 'r', encoding='utf-8') as f:
+                            loaded = json.load(f)
+                    except FileNotFoundError:
+                        loaded = {}
+                    except (OSError, ValueError) as e:
+                        print(f"⚠ Manifeste des assets illisible ({self.path}) : {str(e)}")
+                        loaded = {}
+                    self._fingerprinted = frozenset(
+                        [value for value in loaded.values() if isinstance(value, str)]
+                        + list(loaded.get(STATIC_MANIFEST_RETAINED_KEY) or [])
+                    )
+                    self._entries = loaded
+                entries = self._entries
+        return entries
+
+    def resolve(self, filename):
+        return self._load().get(filename, filename)
+
+    def get(self, filename):
+        return self._load().get(filename)
+
+    def is_fingerprinted(self, filename):
+        self._load()
+        return filename in self._fingerprinted
+
+    def reload(self):
+        with self._lock:
+            self._entries = None
+
+
+asset_manifest = AssetManifest(os.path.join(static_dir, STATIC_MANIFEST_FILE))
+image_manifest = AssetManifest(os.path.join(static_dir, STATIC_IMAGE_MANIFEST_FILE))
+_compressed_manifests = {}
+
+
+def compressed_manifest(root):
+    """Manifeste de compression d'un dossier servi (app/static, pages pré-rendues)"""
+    manifest = _compressed_manifests.get(root)
+    if manifest is None:
+        manifest = _compressed_manifests.setdefault(
+            root, AssetManifest(os.path.join(root, STATIC_COMPRESSED_MANIFEST_FILE))
+        )
+    return manifest
+
+
+@app.url_defaults
+def fingerprint_static_url(endpoint, values):
+    """url_for('static', ...) (et donc le filtre static_path) pointe vers la copie empreintée"""
+    # En debug, servir les fichiers modifiés sans relancer le build
+    if endpoint == 'static' and 'filename' in values and not current_app.debug:
+        values['filename'] = asset_manifest.resolve(values['filename'])
+
+
+@app.template_global()
+def responsive_image(path, alt='', sizes='100vw', **attributes):
+    """
+    <picture> avec une source AVIF et une source WebP (srcset par largeur) et l'image d'origine
+    en repli, width/height renseignés pour réserver la place. Les autres attributs sont passés
+    tels quels (class_ → class, data_x → data-x). Sans entrée dans le manifeste des
+    images (build non exécuté), simple <img> vers l'original.
+    """
+    entry = image_manifest.get(path)
+    attributes.setdefault('loading', 'lazy')
+    attributes.setdefault('decoding', 'async')
+    extra = Markup('').join(
+        Markup(' {}="{}"').format(name.rstrip('_').replace('_', '-'), value)
+        for name, value in attributes.items()
+    )
+    if entry is None:
+        return Markup('<img src="{}" alt="{}"{}>').format(url_for('static', filename=path), alt, extra)
+
+    sources = Markup('').join(
+        Markup('<source type="image/{}" srcset="{}" sizes="{}">').format(
+            image_format,
+            ', '.join(f"{url_for('static', filename=variant['src'])} {variant['width']}w" for variant in variants),
+            sizes
+        )
+        for image_format, variants in entry['variants'].items()
+    )
+    image = Markup('<img src="{}" alt="{}" width="{}" height="{}"{}>').format(
+        url_for('static', filename=path), alt, entry['width'], entry['height'], extra
+    )
+    return Markup('<picture>{}{}</picture>').format(sources, image)
+
+
+_built_bundles = {}
+
+
+@app.template_global()
+def asset_bundle(name):
+    """
+    Balises <link>/<script> d'un bundle de STATIC_BUNDLES : le bundle en production,
+    les fichiers d'origine en debug ou tant que le build n'a pas produit le bundle
+    """
+    built = _built_bundles.get(name)
+    if built is None:
+        built = _built_bundles[name] = os.path.isfile(os.path.join(static_dir, name))
+    files = [name] if built and not current_app.debug else STATIC_BUNDLES[name]
+    if name.endswith('.css'):
+        tag = Markup('<link rel="stylesheet" href="{}">')
+    else:
+        tag = Markup('<script src="{}"></script>')
+    return Markup('\n').join(tag.format(url_for('static', filename=filename)) for filename in files)
+
+
+def send_static_asset(root, filename):
+    """
+    Envoie un fichier statique (filename relatif à root) : variante br/gzip selon Accept-Encoding,
+    ETag fort par représentation et réponse 304 si If-None-Match correspond.
+    Retourne None si le fichier n'existe pas.
+    """
+    path = safe_join(root, filename)
+    if path is None or not os.path.isfile(path):
+        return None
+    source_stat = os.stat(path)
+    compressible = filename.lower().endswith(STATIC_COMPRESSIBLE_EXTENSIONS)
+    if compressible:
+        variant, encoding, variant_stat = negotiate_static_variant(root, filename, path, source_stat)
+    else:
+        variant, encoding, variant_stat = path, None, source_stat
+
+    response = send_file(
+        variant,
+        mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        etag=static_etag(variant, variant_stat),
+        conditional=True,
+        last_modified=source_stat.st_mtime
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if compressible:
+        response.vary.add('Accept-Encoding')
+    return response
+
 # ============================
-#   CONFIGURATION DE L'APPLICATION
+#   CACHE DES RÉPONSES
 # ============================
 
-# Configuration des chemins pour les templates et statiques
-# Flask cherchera dans app/templates et app/static
-# Sur Vercel, le système de fichiers est en lecture seule, donc on ne peut pas utiliser instance_path
-# On configure instance_path vers /tmp qui est accessible en écriture
-is_vercel = os.environ.get('VERCEL') == '1'
+# Pages publiques (accueil, suivi, présentation) rendues une fois puis resservies aux visiteurs
+# anonymes sans passer par Jinja. Cache par processus : chaque worker a le sien.
 
-# Déterminer le répertoire de base (où se trouve app.py)
-base_dir = os.path.dirname(os.path.abspath(__file__))
-template_dir = os.path.join(base_dir, 'app', 'templates')
-static_dir = os.path.join(base_dir, 'app', 'static')
+# En-têtes propres à une réponse donnée, jamais resservis depuis le cache
+UNCACHED_RESPONSE_HEADERS = ('Content-Length', 'Content-Encoding', 'Set-Cookie', 'ETag', 'Server-Timing',
+                             'X-SQL-Queries', 'X-Cache')
 
-# Vérifier que les dossiers existent (pour le débogage)
-if not os.path.exists(template_dir):
-    print(f"⚠️  ATTENTION: Le dossier templates n'existe pas : {template_dir}")
-else:
-    print(f"✓ Dossier templates trouvé : {template_dir}")
-if not os.path.exists(static_dir):
-    print(f"⚠️  ATTENTION: Le dossier static n'existe pas : {static_dir}")
-else:
-    print(f"✓ Dossier static trouvé : {static_dir}")
-
-if is_vercel:
-    # Créer le dossier /tmp/instance si nécessaire (accessible en écriture sur Vercel)
-    instance_path = '/tmp/instance'
-    try:
-        os.makedirs(instance_path, exist_ok=True)
-    except Exception:
-        # Si on ne peut pas créer le dossier, ne pas utiliser instance_path
-        instance_path = None
-else:
-    instance_path = None
-
-# Configuration Flask pour les templates et fichiers statiques
-# Sur Vercel, on doit servir les fichiers statiques via Flask car ils ne sont pas dans public/
-app = Flask(__name__, 
-            template_folder=template_dir,
-            static_folder=static_dir,
-            static_url_path='/static')
 
-# Ajouter un filtre Jinja2 pour convertir les chemins relatifs en chemins statiques
-@app.template_filter('static_path')
-def static_path_filter(path):
-    """Convertit un chemin relatif en chemin statique Flask"""
-    if path.startswith('assets/'):
-        return url_for('static', filename=path)
-    elif path.startswith('/assets/'):
-        return url_for('static', filename=path[1:])  # Enlever le / initial
-    elif path.startswith('static/'):
-        return url_for('static', filename=path[7:])  # Enlever 'static/'
-    elif path.startswith('/static/'):
-        return url_for('static', filename=path[8:])  # Enlever '/static/'
-    else:
-        return url_for('static', filename=path)
+_brotli = None
 
-# Configuration de la base de données
-# Utilise Neon PostgreSQL hébergé sur Vercel
-# La chaîne de connexion doit être définie dans DATABASE_URL (variables d'environnement)
-database_url = os.environ.get('DATABASE_URL')
-# Si vous voulez forcer l'utilisation de la base distante (Neon) en local,
-# exportez USE_REMOTE_DB=1 dans votre environnement. Dans ce cas,
-# DATABASE_URL est obligatoire et l'application s'arrêtera si elle est absente.
-use_remote_db = os.environ.get('USE_REMOTE_DB') == '1'
-
-if not database_url:
-    if use_remote_db:
-        # L'utilisateur a demandé explicitement d'utiliser la DB distante mais
-        # DATABASE_URL n'est pas défini : échouer rapidement pour éviter des comportements inattendus.
-        print("⚠️  USE_REMOTE_DB=1 défini mais DATABASE_URL est manquant. Arrêt.")
-        raise RuntimeError('DATABASE_URL is required when USE_REMOTE_DB=1')
-
-    # Valeur par défaut pour le développement local uniquement (fallback SQLite)
-    instance_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
-    try:
-        os.makedirs(instance_dir, exist_ok=True)
-    except Exception as e:
-        print(f"⚠️  Erreur lors de la création du dossier instance : {str(e)}")
-    database_url = f'sqlite:///{os.path.join(instance_dir, "dev.db")}'
-    print("⚠️  DATABASE_URL non configuré → Utilisation de SQLite (dev local uniquement)")
-    print(f"✓ Chemin SQLite : {database_url}")
-else:
-    # Nettoyer l'URL et assurer que SSL est configuré
-    database_url = database_url.strip()
-    # Si l'URL Neon/PostgreSQL n'a pas de sslmode, l'ajouter
-    if 'postgresql' in database_url and '?sslmode=' not in database_url:
-        separator = '&' if '?' in database_url else '?'
-        database_url = f"{database_url}{separator}sslmode=require"
-    print("✓ PostgreSQL (Neon) configuré avec SSL")
-
-app.config['SQLALCHEMY_DATABASE_URI'] = database_url
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-
-# Configuration des options du moteur SQLAlchemy
-# Adapter les options selon le type de base de données
-database_url_lower = database_url.lower()
-
-if 'postgresql' in database_url_lower or 'postgres' in database_url_lower:
-    # Configuration pour PostgreSQL (Neon)
-    print("✓ PostgreSQL (Neon) détecté")
-    engine_options = {
-        'pool_pre_ping': True,        # Vérifier les connexions avant utilisation
-        'pool_recycle': 300,          # Recycler les connexions après 5 minutes
-        'connect_args': {
-            'connect_timeout': 10,    # Timeout de connexion
-            'sslmode': 'require'      # SSL obligatoire pour Neon
-        }
-    }
-    
-    # Sur Vercel (serverless), utiliser NullPool pour éviter les problèmes de persistence du pool
-    if os.environ.get('VERCEL') == '1':
-        from sqlalchemy.pool import NullPool
-        engine_options['poolclass'] = NullPool
-        engine_options.pop('pool_pre_ping', None)  # NullPool n'utilise pas pool_pre_ping
-        print("✓ Vercel détecté → Utilisation de NullPool (serverless)")
-        
-elif 'sqlite' in database_url_lower:
-    # Configuration pour SQLite (dev local)
-    print("✓ SQLite détecté (développement local)")
-    engine_options = {
-        'connect_args': {
-            'check_same_thread': False  # Permettre l'utilisation dans plusieurs threads
+
+def optional_brotli():
+    """Module brotli s'il est installé (importé au premier besoin), sinon None"""
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = False
+    return _brotli or None
+
+
+class ResponseCache:
+    """
+    Cache en mémoire des réponses GET aux visiteurs anonymes : corps rendus et déjà compressés
+    pour l'encodage négocié, LRU borné en octets, durée de vie fixée par endpoint.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # clé → (expiration, taille, entrée)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def count(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, size, entry = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self._bytes -= size
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        size = len(entry['body']) + len(key)
+        if size > self.max_bytes // 4:
+            return  # Une seule page ne doit pas vider le cache
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._data[key] = (entry['expires_at'], size, entry)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def purge(self, path_prefix=None):
+        """Supprime toutes les entrées, ou celles dont le chemin commence par path_prefix. Retourne leur nombre"""
+        with self._lock:
+            if path_prefix is None:
+                removed = len(self._data)
+                self._data.clear()
+                self._bytes = 0
+                return removed
+            keys = [key for key in self._data if key.split('|', 1)[1].startswith(path_prefix)]
+            for key in keys:
+                self._bytes -= self._data.pop(key)[1]
+            return len(keys)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "enabled": app.config['RESPONSE_CACHE_ENABLED'],
+            "ttls": app.config['RESPONSE_CACHE_TTLS'],
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_ratio": round(self.hits / total, 4) if total else None
         }
-    }
-else:
-    # Fallback pour autres BDs
-    print(f"⚠ Type de BD non reconnu : {database_url_lower}")
-    engine_options = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300
+
+
+response_cache = ResponseCache(max_bytes=app.config['RESPONSE_CACHE_MAX_BYTES'])
+
+
+def negotiate_response_encoding():
+    """Encodage du corps mis en cache : br si accepté et disponible, sinon gzip, sinon identity"""
+    if request.accept_encodings['br'] and optional_brotli():
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return 'identity'
+
+
+def response_cache_entry(response, ttl):
+    """Entrée non compressée (identity) construite à partir de la réponse rendue par la vue"""
+    body = response.get_data()
+    return {
+        'status': response.status_code,
+        'headers': [(name, value) for name, value in response.headers.items()
+                    if name not in UNCACHED_RESPONSE_HEADERS],
+        'body': body,
+        'etag': hashlib.sha256(body).hexdigest()[:32],
+        'expires_at': time.monotonic() + ttl
     }
 
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
-print(f"✓ Options du moteur SQLAlchemy configurées : {engine_options}")
-
-# SECRET_KEY pour les sessions Flask
-secret_key = os.environ.get('SECRET_KEY')
-if not secret_key:
-    # Valeur par défaut (non sécurisée pour la production)
-    secret_key = 'OPENSECRETKEY'
-    print("⚠️  ATTENTION: SECRET_KEY non configuré. Utilisation d'une clé par défaut (non sécurisée)")
-    print("⚠️  Pour la production, configurez SECRET_KEY avec une clé aléatoire sécurisée")
-
-app.config['SECRET_KEY'] = secret_key
-
-# Initialiser les extensions
-# Gérer les erreurs d'initialisation de SQLAlchemy pour ne pas bloquer l'application
-try:
-    db.init_app(app)
-    print("✓ SQLAlchemy initialisé avec succès")
-except Exception as e:
-    print(f"⚠ Erreur lors de l'initialisation de SQLAlchemy : {str(e)}")
-    print(f"⚠ Les fonctionnalités de base de données peuvent ne pas fonctionner correctement")
-    # Ne pas bloquer l'application, mais les routes qui utilisent la DB échoueront
-login_manager.init_app(app)
-login_manager.login_view = 'login'
-login_manager.login_message = 'Veuillez vous connecter pour accéder à cette page.'
-login_manager.login_message_category = 'warning'
 
-# User loader pour Flask-Login
-@login_manager.user_loader
-def load_user(user_id):
-    """Charger un utilisateur par son ID"""
-    try:
-        return User.query.get(int(user_id))
-    except Exception as e:
-        # Si la base de données n'est pas disponible, retourner None
-        # Cela permet au rendu des templates de continuer même sans DB
-        print(f"⚠ Erreur lors du chargement de l'utilisateur {user_id}: {str(e)}")
-        return None
+def encode_response_cache_entry(entry, encoding):
+    """Variante compressée d'une entrée identity (même statut, mêmes en-têtes, même expiration)"""
+    if encoding == 'br':
+        body = optional_brotli().compress(entry['body'], quality=5)
+    else:
+        body = gzip.compress(entry['body'], compresslevel=6)
+    return dict(entry, body=body, etag=f"{entry['etag']}-{encoding}",
+                headers=entry['headers'] + [('Content-Encoding', encoding)])
 
-# ============================
-#   FONCTIONS UTILITAIRES
-# ============================
 
-def generate_tracking_number():
+def is_cacheable_response(response):
+    """Page complète, identique pour tous les visiteurs anonymes"""
+    cache_control = response.headers.get('Cache-Control', '')
+    return (response.status_code == 200
+            and not response.direct_passthrough  # Fichier servi tel quel (page pré-rendue)
+            and 'Set-Cookie' not in response.headers
+            and 'private' not in cache_control and 'no-store' not in cache_control)
+
+
+def is_anonymous_visitor():
     """
-    Génère un numéro de colis unique au format XXXXXYY (5 chiffres + 2 lettres majuscules)
-    Exemple: 26382TU
-    Cette fonction doit être appelée depuis une route Flask pour avoir le contexte d'application.
+    Visiteur sans session d'administrateur, sans cookie « se souvenir de moi » et sans message
+    flash, sans charger l'utilisateur : un administrateur reconnu par son seul cookie de connexion
+    (session expirée) voit la navigation d'administration et ne doit pas partager la page anonyme.
     """
-    max_attempts = 100  # Limite de tentatives pour éviter une boucle infinie
-    
-    for _ in range(max_attempts):
-        # Générer 5 chiffres aléatoires
-        digits = ''.join([str(random.randint(0, 9)) for _ in range(5)])
-        
-        # Générer 2 lettres majuscules aléatoires
-        letters = ''.join([random.choice(string.ascii_uppercase) for _ in range(2)])
-        
-        # Combiner pour former le numéro de suivi
-        tracking_number = f"{digits}{letters}"
-        
-        # Vérifier l'unicité dans la base de données
-        # Le contexte d'application Flask est déjà actif car appelé depuis une route
-        existing_order = Order.query.filter_by(tracking_number=tracking_number).first()
-        if not existing_order:
-            return tracking_number
-    
-    # Si on n'a pas trouvé de numéro unique après max_attempts tentatives,
-    # utiliser un UUID court comme fallback (très rare)
-    fallback = f"{random.randint(10000, 99999)}{''.join([random.choice(string.ascii_uppercase) for _ in range(2)])}"
-    return fallback
+    remember_cookie = app.config.get('REMEMBER_COOKIE_NAME', REMEMBER_COOKIE_DEFAULT_NAME)
+    return '_user_id' not in session and '_flashes' not in session and remember_cookie not in request.cookies
+
+
+def cache_anonymous(*query_args):
+    """
+    Sert la vue depuis ResponseCache pour les visiteurs anonymes (is_anonymous_visitor).
+    La clé comprend le chemin, les seuls paramètres query_args et l'encodage négocié.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            ttl = app.config['RESPONSE_CACHE_TTLS'].get(request.endpoint, 0)
+            if not app.config['RESPONSE_CACHE_ENABLED'] or not ttl or request.method not in ('GET', 'HEAD') \
+                    or not is_anonymous_visitor():
+                response_cache.count('bypasses')
+                return view(*args, **kwargs)
+
+            encoding = negotiate_response_encoding()
+            query = '&'.join(f"{name}={value}" for name in sorted(query_args)
+                             for value in request.args.getlist(name))
+            base_key = f"{request.path}?{query}"
+            entry = response_cache.get(f"{encoding}|{base_key}")
+            state = 'HIT'
+            if entry is None:
+                # La page n'est rendue qu'une fois ; les variantes gzip/br dérivent du corps identity
+                source = response_cache.get(f"identity|{base_key}")
+                if source is None:
+                    response = app.make_response(view(*args, **kwargs))
+                    if not is_cacheable_response(response):
+                        return response
+                    source = response_cache_entry(response, ttl)
+                    response_cache.set(f"identity|{base_key}", source)
+                    state = 'MISS'
+                entry = source
+                if encoding != 'identity':
+                    entry = encode_response_cache_entry(source, encoding)
+                    response_cache.set(f"{encoding}|{base_key}", entry)
+            response_cache.count('hits' if state == 'HIT' else 'misses')
+
+            response = Response(entry['body'], status=entry['status'], headers=entry['headers'])
+            response.set_etag(entry['etag'])
+            response.vary.add('Accept-Encoding')
+            response.headers['X-Cache'] = state
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
 
 # ============================
 #   ROUTES - AUTHENTIFICATION
@@ -390,6 +2894,7 @@ def login():
 @login_required
 def logout():
     """Déconnexion"""
+    user_cache.invalidate(current_user.id)
     logout_user()
     flash('Vous avez été déconnecté avec succès', 'info')
     return redirect(url_for('home'))
@@ -398,11 +2903,104 @@ def logout():
 #   ROUTES - PAGES PUBLIQUES
 # ============================
 
+# Pages publiques sans base de données : template → titre passé au template (None : titre du
+# template). freeze_pages.py les pré-rend ; index.html et tracking.html ont leurs propres routes,
+# les autres sont servies sous leur nom de fichier, comme dans les liens des templates
+PUBLIC_PAGES = {
+    'index.html': "Accueil",
+    'tracking.html': "Suivi de colis",
+    'careers.html': None,
+    'cargo_freight.html': None,
+    'cargo_safety': None,
+    'company.html': None,
+    'compliance.html': None,
+    'contact_us.html': None,
+    'customs.html': None,
+    'customs_policy.html': None,
+    'domestic_shipping.html': None,
+    'e_commerce': None,
+    'faqs.html': None,
+    'fleet.html': None,
+    'future_of_ecommerce_logistics.html': None,
+    'insurance_policy.html': None,
+    'international_shipping.html': None,
+    'network': None,
+    'partnerships.html': None,
+    'payment_policy.html': None,
+    'pet_delivery.html': None,
+    'privacy_policy.html': None,
+    'returns_policy.html': None,
+    'reviews': None,
+    'services.html': None,
+    'shipping_policy.html': None,
+    'special_cargo.html': None,
+    'supply_chain.html': None,
+    'terms.html': None,
+    'warehouse.html': None,
+    'ways_to_speedup_international_shipping.html': None,
+    'why_reliable_logistics_is_key.html': None,
+}
+
+
+# Manifeste écrit par freeze_pages.py dans FROZEN_PAGES_DIR : empreinte du build, pages et fichiers produits
+FROZEN_PAGES_MANIFEST_FILE = '.frozen.json'
+frozen_pages_manifest = AssetManifest(os.path.join(app.config['FROZEN_PAGES_DIR'], FROZEN_PAGES_MANIFEST_FILE))
+_frozen_pages_stamp = None
+
+
+def frozen_pages_stamp():
+    """
+    Empreinte de tout ce dont dépend le HTML pré-rendu : contenu des templates et des manifestes
+    d'assets et d'images (les dates de modification ne survivent pas à un clone ou un déploiement).
+    Calculée une fois par processus ; freeze_pages.py l'enregistre dans FROZEN_PAGES_MANIFEST_FILE.
+    """
+    global _frozen_pages_stamp
+    if _frozen_pages_stamp is None:
+        paths = sorted(os.path.join(directory, name)
+                       for directory, _, files in os.walk(template_dir) for name in files)
+        paths += [os.path.join(static_dir, STATIC_MANIFEST_FILE), os.path.join(static_dir, STATIC_IMAGE_MANIFEST_FILE)]
+        digest = hashlib.sha256()
+        for path in paths:
+            digest.update(os.path.relpath(path, base_dir).replace(os.sep, '/').encode('utf-8') + b'\0')
+            try:
+                with open(path, 'rb') as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+            except FileNotFoundError:
+                digest.update(b'-')
+        _frozen_pages_stamp = digest.hexdigest()[:32]
+    return _frozen_pages_stamp
+
+
+def frozen_page_name(template):
+    """Nom du fichier pré-rendu d'une page publique (toujours en .html)"""
+    return template if template.endswith('.html') else f"{template}.html"
+
+
+def render_public_page(template):
+    """
+    Page publique : le fichier pré-rendu par freeze_pages.py pour un visiteur anonyme
+    (is_anonymous_visitor), si l'empreinte de son rendu correspond toujours aux templates et
+    manifestes actuels (pas de Jinja ni de load_user) ; sinon, et toujours en debug, rendu Jinja
+    """
+    if not app.debug and is_anonymous_visitor():
+        frozen_dir = app.config['FROZEN_PAGES_DIR']
+        name = frozen_page_name(template)
+        stamp = frozen_pages_manifest.get('stamp')
+        if stamp and name in (frozen_pages_manifest.get('pages') or {}) and stamp == frozen_pages_stamp():
+            response = send_static_asset(frozen_dir, name)
+            if response is not None:
+                response.headers['Cache-Control'] = 'no-cache'  # Revalidation par ETag à chaque visite
+                return response
+    title = PUBLIC_PAGES.get(template)
+    return render_template(template, **({'title': title} if title else {}))
+
+
 @app.route('/')
+@cache_anonymous()
 def home():
     """Page d'accueil"""
     try:
-        return render_template('index.html', title="Accueil")
+        return render_public_page('index.html')
     except Exception as e:
         # Si le template ne peut pas être chargé, retourner une réponse JSON avec plus de détails
         import traceback
@@ -418,34 +3016,50 @@ def home():
 
 
 @app.route('/tracking')
+@cache_anonymous()
 def tracking():
     """Page de suivi de colis"""
-    return render_template('tracking.html', title="Suivi de colis")
+    return render_public_page('tracking.html')
+
+
+@app.route('/<page>')
+@cache_anonymous()
+def public_page(page):
+    """Pages de présentation (company.html, faqs.html, ...) liées depuis les templates publics"""
+    if page not in PUBLIC_PAGES or page in ('index.html', 'tracking.html'):
+        abort(404)
+    return render_public_page(page)
 
 # Route pour servir les fichiers statiques (nécessaire pour Vercel)
 @app.route('/static/<path:filename>')
 def serve_static(filename):
-    """Servir les fichiers statiques avec les bons en-têtes"""
-    try:
-        response = send_from_directory(app.static_folder, filename)
-        # Ajouter des en-têtes de cache pour améliorer les performances
-        if filename.endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico')):
-            response.headers['Cache-Control'] = 'public, max-age=31536000'  # 1 an
-        elif filename.endswith(('.css', '.js')):
-            response.headers['Cache-Control'] = 'public, max-age=86400'  # 1 jour
-        return response
-    except FileNotFoundError:
+    """Servir les fichiers statiques (variantes précompressées, ETag) avec les bons en-têtes"""
+    response = send_static_asset(app.static_folder, filename)
+    if response is None:
         # Si le fichier n'est pas trouvé, retourner une 404
         return jsonify({"error": "File not found", "filename": filename}), 404
+    # Ajouter des en-têtes de cache pour améliorer les performances
+    if asset_manifest.is_fingerprinted(filename):
+        # Le nom change avec le contenu : le navigateur n'a jamais besoin de revalider
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    elif filename.endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.avif', '.ico')):
+        response.headers['Cache-Control'] = 'public, max-age=31536000'  # 1 an
+    elif filename.endswith(('.css', '.js')):
+        response.headers['Cache-Control'] = 'public, max-age=86400'  # 1 jour
+    return response
+
+# Flask déclare sa propre route /static (même règle, enregistrée en premier) :
+# la faire pointer vers serve_static pour que url_for('static', ...) en bénéficie
+app.view_functions['static'] = serve_static
 
 # Route pour servir les assets avec chemins relatifs (compatibilité)
 @app.route('/assets/<path:filename>')
 def serve_assets(filename):
     """Servir les assets depuis app/static/assets pour compatibilité avec les chemins relatifs"""
-    try:
-        return send_from_directory(os.path.join(app.static_folder, 'assets'), filename)
-    except FileNotFoundError:
+    response = send_static_asset(app.static_folder, f"assets/{filename}")
+    if response is None:
         return jsonify({"error": "Asset not found", "filename": filename}), 404
+    return response
 
 
 # ============================
@@ -461,27 +3075,18 @@ def add_order():
         tracking_number = generate_tracking_number()
         
         # Champs obligatoires
-        required_fields = {
-            'sender_name': request.form.get('sender_name'),
-            'sender_phone': request.form.get('sender_phone'),
-            'sender_email': request.form.get('sender_email'),
-            'sender_address': request.form.get('sender_address'),
-            'receiver_name': request.form.get('receiver_name'),
-            'receiver_phone': request.form.get('receiver_phone'),
-            'receiver_email': request.form.get('receiver_email'),
-            'receiver_address': request.form.get('receiver_address'),
-            'shipment_name': request.form.get('shipment_name'),
-            'tracking_number': tracking_number,
-            'origin_city': request.form.get('origin_city'),
-            'origin_country': request.form.get('origin_country'),
-            'destination_city': request.form.get('destination_city'),
-            'destination_country': request.form.get('destination_country')
-        }
+        required_fields = {field: request.form.get(field) for field in ORDER_REQUIRED_FIELDS}
+        required_fields['tracking_number'] = tracking_number
 
         if not all(required_fields.values()):
             flash('Veuillez remplir tous les champs obligatoires ⚠️', 'warning')
             return redirect(url_for('add_order'))
 
+        schedule, error = parse_schedule_fields(request.form)
+        if error:
+            flash(f'{error} ⚠️', 'warning')
+            return redirect(url_for('add_order'))
+
         try:
             # Créer une nouvelle commande
             new_order = Order(
@@ -499,17 +3104,17 @@ def add_order():
                 origin_country=required_fields['origin_country'],
                 destination_city=required_fields['destination_city'],
                 destination_country=required_fields['destination_country'],
-                pickup_date=request.form.get('pickup_date') or None,
-                pickup_time=request.form.get('pickup_time') or None,
-                delivery_date=request.form.get('delivery_date') or None,
-                delivery_time=request.form.get('delivery_time') or None,
+                pickup_date=schedule['pickup_date'],
+                pickup_time=schedule['pickup_time'],
+                delivery_date=schedule['delivery_date'],
+                delivery_time=schedule['delivery_time'],
                 current_location=request.form.get('current_location') or 'En préparation'
             )
             
-            db.session.add(new_order)
-            db.session.commit()
+            commit_new_order(new_order)
+            tracking_cache.invalidate(new_order.id, new_order.tracking_number)
             
-            flash(f'Commande ajoutée avec succès ✅ - Numéro de colis: {tracking_number}', 'success')
+            flash(f'Commande ajoutée avec succès ✅ - Numéro de colis: {new_order.tracking_number}', 'success')
             return redirect(url_for('order_detail', order_id=new_order.id))
         
         except Exception as e:
@@ -528,27 +3133,18 @@ def edit_order(order_id):
 
     if request.method == 'POST':
         # Champs obligatoires
-        required_fields = {
-            'sender_name': request.form.get('sender_name'),
-            'sender_phone': request.form.get('sender_phone'),
-            'sender_email': request.form.get('sender_email'),
-            'sender_address': request.form.get('sender_address'),
-            'receiver_name': request.form.get('receiver_name'),
-            'receiver_phone': request.form.get('receiver_phone'),
-            'receiver_email': request.form.get('receiver_email'),
-            'receiver_address': request.form.get('receiver_address'),
-            'shipment_name': request.form.get('shipment_name'),
-            'tracking_number': request.form.get('tracking_number'),
-            'origin_city': request.form.get('origin_city'),
-            'origin_country': request.form.get('origin_country'),
-            'destination_city': request.form.get('destination_city'),
-            'destination_country': request.form.get('destination_country')
-        }
+        required_fields = {field: request.form.get(field) for field in ORDER_REQUIRED_FIELDS}
+        required_fields['tracking_number'] = request.form.get('tracking_number')
 
         if not all(required_fields.values()):
             flash('Veuillez remplir tous les champs obligatoires ⚠️', 'warning')
             return redirect(url_for('edit_order', order_id=order_id))
 
+        schedule, error = parse_schedule_fields(request.form)
+        if error:
+            flash(f'{error} ⚠️', 'warning')
+            return redirect(url_for('edit_order', order_id=order_id))
+
         # Vérifier si le numéro de suivi existe déjà pour une autre commande
         tracking_number = request.form.get('tracking_number')
         existing_order = Order.query.filter(
@@ -560,6 +3156,9 @@ def edit_order(order_id):
             flash('Ce numéro de suivi est déjà utilisé par une autre commande ⚠️', 'warning')
             return redirect(url_for('edit_order', order_id=order_id))
 
+        previous_tracking_number = order.tracking_number
+        previous_location = order.current_location
+
         try:
             # Mettre à jour la commande
             order.sender_name = required_fields['sender_name']
@@ -576,13 +3175,18 @@ def edit_order(order_id):
             order.origin_country = required_fields['origin_country']
             order.destination_city = required_fields['destination_city']
             order.destination_country = required_fields['destination_country']
-            order.pickup_date = request.form.get('pickup_date') or None
-            order.pickup_time = request.form.get('pickup_time') or None
-            order.delivery_date = request.form.get('delivery_date') or None
-            order.delivery_time = request.form.get('delivery_time') or None
+            order.pickup_date = schedule['pickup_date']
+            order.pickup_time = schedule['pickup_time']
+            order.delivery_date = schedule['delivery_date']
+            order.delivery_time = schedule['delivery_time']
             order.current_location = request.form.get('current_location') or 'En préparation'
             
+            # Conserver l'historique : un changement de position devient un événement de suivi
+            if order.current_location != previous_location:
+                db.session.add(TrackingEvent(order_id=order_id, status=order.current_location))
+            
             db.session.commit()
+            tracking_cache.invalidate(order_id, previous_tracking_number, tracking_number)
             flash('Commande modifiée avec succès ✅', 'success')
             return redirect(url_for('order_detail', order_id=order_id))
         
@@ -594,32 +3198,282 @@ def edit_order(order_id):
     return render_template('edit_order.html', order=order, order_id=order_id, title="Modifier la commande")
 
 
+def render_order_detail(order):
+    """Rend la page de détail avec le statut courant et la chronologie de suivi"""
+    timeline = tracking_cache.get_timeline(order['id'], app.config['TRACKING_TIMELINE_LIMIT'])
+    current_status = timeline[0]['status'] if timeline else order['current_location']
+    return render_template('order_detail.html',
+                           order=order,
+                           timeline=timeline,
+                           current_status=current_status,
+                           title="Détail de la commande")
+
+
+# GET conditionnel de la page de détail (ETag / Last-Modified → 304)
+# Templates et manifestes dont dépend le HTML de la page de détail (un déploiement change l'ETag)
+ORDER_PAGE_DEPENDENCIES = (
+    os.path.join(template_dir, 'order_detail.html'),
+    os.path.join(template_dir, 'base.html'),
+    os.path.join(static_dir, STATIC_MANIFEST_FILE),
+)
+_order_page_version = None
+
+
+def order_page_version():
+    """Version du rendu de la page de détail, relue à chaque requête en debug seulement"""
+    global _order_page_version
+    if _order_page_version is None or app.debug:
+        mtimes = []
+        for path in ORDER_PAGE_DEPENDENCIES:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(0)
+        _order_page_version = '-'.join(str(mtime) for mtime in mtimes)
+    return _order_page_version
+
+
+def order_validators(order_id=None, tracking_number=None):
+    """
+    ETag et Last-Modified de la page de détail, en une requête sans charger la commande ni sa
+    chronologie : updated_at et numéro de suivi de la commande, nombre d'événements de suivi et
+    date du dernier (record_tracking_event ne réécrit pas la ligne de la commande).
+    Retourne un dict, ou None si la commande n'existe pas.
+    """
+    event_count = (select(func.count()).select_from(TrackingEvent)
+                   .where(TrackingEvent.order_id == Order.id).scalar_subquery())
+    last_event_at = (select(func.max(TrackingEvent.created_at))
+                     .where(TrackingEvent.order_id == Order.id).scalar_subquery())
+    query = select(Order.id, Order.tracking_number, Order.updated_at,
+                   event_count.label('event_count'), last_event_at.label('last_event_at'))
+    if tracking_number is not None:
+        query = query.where(Order.tracking_number == tracking_number)
+    else:
+        query = query.where(Order.id == order_id)
+    row = db.session.execute(query).first()
+    if row is None:
+        return None
+
+    updated_at = row.updated_at.isoformat() if row.updated_at else None
+    fingerprint = '|'.join(str(part) for part in (
+        row.id, row.tracking_number, updated_at, row.event_count, row.last_event_at,
+        app.config['TRACKING_TIMELINE_LIMIT'], order_page_version()
+    ))
+    modified = [value for value in (row.updated_at, row.last_event_at) if value is not None]
+    return {
+        'id': row.id,
+        'tracking_number': row.tracking_number,
+        'updated_at': updated_at,
+        'event_count': row.event_count,
+        'etag': hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:32],
+        'last_modified': max(modified) if modified else None
+    }
+
+
+def order_not_modified(validators):
+    """True si le navigateur a déjà cette version de la page (If-None-Match / If-Modified-Since)"""
+    return not is_resource_modified(request.environ, etag=validators['etag'],
+                                    last_modified=validators['last_modified'])
+
+
+def conditional_order_response(validators, body=None):
+    """Réponse 304 (body=None) ou page rendue, avec ETag, Last-Modified et revalidation à chaque visite"""
+    response = app.make_response(body if body is not None else ('', 304))
+    response.set_etag(validators['etag'])
+    if validators['last_modified'] is not None:
+        response.last_modified = validators['last_modified']
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def fresh_order_detail(validators, order):
+    """
+    Commande (dict) cohérente avec les validateurs : si le cache de suivi d'un autre processus
+    est en retard sur la base, ses entrées sont invalidées et relues, pour ne jamais associer
+    un ETag récent à une page périmée. None si la commande a été supprimée entre-temps.
+    """
+    if order is None or order.get('updated_at') != validators['updated_at']:
+        tracking_cache.invalidate(validators['id'], validators['tracking_number'])
+        order = tracking_cache.get_by_id(validators['id'])
+        if order is None:
+            return None  # Supprimée entre-temps
+    timeline = tracking_cache.get_timeline(order['id'], app.config['TRACKING_TIMELINE_LIMIT'])
+    if len(timeline) != min(validators['event_count'], app.config['TRACKING_TIMELINE_LIMIT']):
+        tracking_cache.invalidate_timeline(order['id'])
+    return order
+
+
+def order_detail_response(order_id=None, tracking_number=None):
+    """
+    Page de détail d'une commande. Pour les visiteurs anonymes (is_anonymous_visitor), les validateurs
+    sont vérifiés avant de charger la commande : un rafraîchissement répond 304 après une seule
+    requête légère, sans rendu. Retourne None si la commande n'existe pas.
+    """
+    def load():
+        if tracking_number is not None:
+            return tracking_cache.get_by_tracking_number(tracking_number)
+        return tracking_cache.get_by_id(order_id)
+
+    if not is_anonymous_visitor():
+        order = load()
+        return render_order_detail(order) if order is not None else None
+
+    validators = order_validators(order_id=order_id, tracking_number=tracking_number)
+    if validators is None:
+        return None
+    if order_not_modified(validators):
+        return conditional_order_response(validators)
+    order = fresh_order_detail(validators, load())
+    if order is None:
+        return None
+    return conditional_order_response(validators, render_order_detail(order))
+
+
 @app.route('/order/<int:order_id>')
 def order_detail(order_id):
     """Détail d'une commande par ID"""
-    order = Order.query.get_or_404(order_id)
-    return render_template('order_detail.html', order=order, title="Détail de la commande")
+    response = order_detail_response(order_id=order_id)
+    if response is None:
+        abort(404)
+    return response
 
 
 @app.route('/order/tracking/<tracking_number>')
 def order_detail_by_tracking(tracking_number):
     """Détail d'une commande par numéro de suivi"""
-    order = Order.query.filter_by(tracking_number=tracking_number).first()
+    response = order_detail_response(tracking_number=tracking_number)
     
-    if not order:
+    if response is None:
         return render_template('order_not_found.html', 
                              tracking_number=tracking_number, 
                              title="Commande introuvable")
     
-    return render_template('order_detail.html', order=order, title="Détail de la commande")
+    return response
 
 
 @app.route('/orders')
 @login_required
 def orders_list():
-    """Liste de toutes les commandes"""
-    orders = Order.query.order_by(Order.created_at.desc()).all()
-    return render_template('orders_list.html', orders=orders, title="Liste des commandes")
+    """Liste des commandes, paginée par curseur et filtrable"""
+    page_size = request.args.get('per_page', type=int) or app.config['ORDERS_PAGE_SIZE']
+    page_size = max(1, min(page_size, app.config['ORDERS_PAGE_SIZE_MAX']))
+    error = order_args_error(request.args)
+    if error:
+        abort(400, description=error)
+    filters = parse_order_filters(request.args)
+
+    query = apply_order_filters(Order.query, filters)
+    orders, next_cursor, prev_cursor = paginate_orders(
+        query,
+        page_size,
+        after=request.args.get('after'),
+        before=request.args.get('before')
+    )
+
+    # Paramètres conservés dans les liens de pagination
+    link_args = {key: value for key, value in filters.items() if value}
+    if request.args.get('per_page'):
+        link_args['per_page'] = page_size
+
+    return render_template('orders_list.html',
+                           orders=orders,
+                           filters=filters,
+                           link_args=link_args,
+                           next_cursor=next_cursor,
+                           prev_cursor=prev_cursor,
+                           title="Liste des commandes")
+
+
+@app.route('/orders/schedule/<view>')
+@login_required
+def orders_schedule(view):
+    """Vues de planification : livraisons du jour, retards, enlèvements à venir (HTML ou ?format=json)"""
+    if view not in SCHEDULE_VIEWS:
+        abort(404)
+    per_page = app.config['ORDERS_PAGE_SIZE']
+    days = max(1, min(request.args.get('days', type=int) or 7, 90))
+    today = datetime.utcnow().date()
+    positions = {}
+    for name in ('after', 'before'):
+        if request.args.get(name):
+            positions[name] = decode_key_cursor(request.args[name], SCHEDULE_CURSOR_TYPES)
+            if positions[name] is None:
+                abort(400, description=f"Curseur de pagination invalide : {name}")
+
+    orders, next_position, prev_position = paginate_keyset(
+        schedule_query(view, today, days=days), schedule_columns(view), per_page, **positions
+    )
+    next_cursor = encode_key_cursor(next_position) if next_position else None
+    prev_cursor = encode_key_cursor(prev_position) if prev_position else None
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            "view": view,
+            "date": today.isoformat(),
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+            "orders": [order.to_dict() for order in orders]
+        }), 200
+
+    cursor_args = {'view': view}
+    if view == 'upcoming-pickups' and request.args.get('days'):
+        cursor_args['days'] = days
+    return render_template('orders_list.html',
+                           orders=orders,
+                           filters=parse_order_filters({}),
+                           link_args={},
+                           heading=SCHEDULE_VIEWS[view],
+                           next_cursor=next_cursor,
+                           prev_cursor=prev_cursor,
+                           cursor_endpoint='orders_schedule',
+                           cursor_args=cursor_args,
+                           title=SCHEDULE_VIEWS[view])
+
+
+@app.route('/dashboard')
+@login_required
+def dashboard():
+    """Tableau de bord : volumes par pays, ligne, statut et jour"""
+    return render_template('dashboard.html', stats=load_dashboard_stats(), title="Tableau de bord")
+
+
+@app.route('/api/stats')
+@login_required
+def stats_api():
+    """Agrégats du tableau de bord au format JSON"""
+    limit = max(1, min(request.args.get('limit', type=int) or 20, 500))
+    days = max(1, min(request.args.get('days', type=int) or 30, 366))
+    return jsonify(load_dashboard_stats(limit=limit, days=days)), 200
+
+
+@app.route('/orders/search')
+@login_required
+def search_orders_route():
+    """Recherche plein texte (noms, e-mails, téléphones, envoi, villes, numéro de suivi)"""
+    query = (request.args.get('q') or '').strip()
+    per_page = app.config['ORDERS_PAGE_SIZE']
+    positions = {}
+    for name in ('after', 'before'):
+        if request.args.get(name):
+            positions[name] = decode_key_cursor(request.args[name], SEARCH_CURSOR_TYPES)
+            if positions[name] is None:
+                abort(400, description=f"Curseur de pagination invalide : {name}")
+
+    orders, next_position, prev_position = [], None, None
+    if query and not search_index_ready():
+        flash("Index de recherche absent : lancez python init_db.py (ou /init-db) pour le créer.", 'warning')
+    elif query:
+        orders, next_position, prev_position = search_orders(query, per_page=per_page, **positions)
+    return render_template('orders_list.html',
+                           orders=orders,
+                           filters=parse_order_filters({}),
+                           link_args={},
+                           search_query=query,
+                           next_cursor=encode_key_cursor(next_position) if next_position else None,
+                           prev_cursor=encode_key_cursor(prev_position) if prev_position else None,
+                           cursor_endpoint='search_orders_route',
+                           cursor_args={'q': query},
+                           title="Recherche de commandes")
 
 
 @app.route('/track-order', methods=['GET'])
@@ -631,10 +3485,10 @@ def track_order():
         flash('Veuillez entrer un numéro de suivi', 'warning')
         return redirect(url_for('tracking'))
 
-    order = Order.query.filter_by(tracking_number=tracking_num).first()
+    order = tracking_cache.get_by_tracking_number(tracking_num)
     
     if order:
-        return redirect(url_for('order_detail', order_id=order.id))
+        return redirect(url_for('order_detail', order_id=order['id']))
     
     # Rediriger vers la page d'erreur personnalisée
     return render_template('order_not_found.html', 
@@ -651,6 +3505,7 @@ def delete_order(order_id):
     try:
         db.session.delete(order)
         db.session.commit()
+        tracking_cache.invalidate(order_id, order.tracking_number)
         flash('Commande supprimée avec succès ✅', 'success')
     except Exception as e:
         db.session.rollback()
@@ -658,6 +3513,269 @@ def delete_order(order_id):
     
     return redirect(url_for('orders_list'))
 
+
+def parse_event_payload():
+    """Lit un événement de suivi depuis un corps JSON ou un formulaire"""
+    payload = request.get_json(silent=True) or request.form
+    status = (payload.get('status') or '').strip()
+    if not status:
+        return None, "Le champ 'status' est obligatoire"
+    if len(status) > 200:
+        return None, "Le champ 'status' est trop long (200 caractères max)"
+    occurred_at = None
+    if payload.get('occurred_at'):
+        try:
+            occurred_at = to_naive_utc(datetime.fromisoformat(str(payload['occurred_at'])))
+        except ValueError:
+            return None, "Le champ 'occurred_at' doit être une date ISO 8601"
+    return {
+        'status': status,
+        'location': (payload.get('location') or '').strip()[:200],
+        'note': (payload.get('note') or '').strip(),
+        'occurred_at': occurred_at
+    }, None
+
+
+def add_tracking_event(order_id):
+    event, error = parse_event_payload()
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+    values = record_tracking_event(order_id, **event)
+    values['occurred_at'] = values['occurred_at'].isoformat()
+    return jsonify({"status": "success", "event": values}), 201
+
+
+@app.route('/orders/<int:order_id>/events', methods=['POST'])
+@login_required
+def add_order_event(order_id):
+    """Enregistrer un scan / changement de statut pour une commande (par id)"""
+    exists = db.session.execute(select(Order.id).where(Order.id == order_id)).scalar()
+    if exists is None:
+        return jsonify({"status": "error", "message": "Commande introuvable"}), 404
+    return add_tracking_event(order_id)
+
+
+@app.route('/order/tracking/<tracking_number>/events', methods=['POST'])
+@login_required
+def add_order_event_by_tracking(tracking_number):
+    """Enregistrer un scan d'entrepôt à partir du numéro de suivi"""
+    order_id = db.session.execute(
+        select(Order.id).where(Order.tracking_number == tracking_number)
+    ).scalar()
+    if order_id is None:
+        return jsonify({"status": "error", "message": "Commande introuvable"}), 404
+    return add_tracking_event(order_id)
+
+
+# Champs publiables par l'API de suivi groupé. Les coordonnées (téléphones, e-mails,
+# adresses) sont exclues : l'API facilite l'interrogation massive de numéros.
+TRACKING_API_FIELDS = (
+    'tracking_number', 'status', 'last_event_at', 'shipment_name', 'current_location',
+    'origin_city', 'origin_country', 'destination_city', 'destination_country',
+    'pickup_date', 'pickup_time', 'delivery_date', 'delivery_time',
+    'sender_name', 'receiver_name', 'created_at', 'updated_at'
+)
+# Sans connexion, seuls le statut, les lieux et les dates d'acheminement sont publiés
+# (ni noms, ni contenu de l'envoi)
+TRACKING_API_PUBLIC_FIELDS = (
+    'tracking_number', 'status', 'last_event_at', 'current_location',
+    'origin_city', 'origin_country', 'destination_city', 'destination_country',
+    'pickup_date', 'pickup_time', 'delivery_date', 'delivery_time', 'updated_at'
+)
+TRACKING_API_DEFAULT_FIELDS = (
+    'tracking_number', 'status', 'last_event_at',
+    'origin_city', 'origin_country', 'destination_city', 'destination_country',
+    'delivery_date', 'updated_at'
+)
+
+
+class RateLimiter:
+    """
+    Limite à fenêtre fixe : au plus `limit` unités (ex. numéros de suivi interrogés) par client
+    et par fenêtre de `window` secondes. Les compteurs vivent dans le backend du cache de suivi
+    (partagés entre workers avec Redis, par processus en mémoire), créé à la première utilisation.
+    """
+
+    def __init__(self, limit, window=60, backend_factory=None):
+        self.limit = limit
+        self.window = window
+        self._backend_factory = backend_factory
+        self._backend = None
+        self._lock = threading.Lock()
+
+    def _get_backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._backend_factory()
+        return self._backend
+
+    def hit(self, client, cost=1):
+        """Compte `cost` unités pour client ; retourne 0 si accepté, sinon les secondes avant la prochaine fenêtre"""
+        if self.limit <= 0:
+            return 0
+        window_index = int(time.time() // self.window)
+        used = self._get_backend().incr(f"rate:{client}:{window_index}", cost, self.window)
+        if used > self.limit:
+            return int(self.window - time.time() % self.window) + 1
+        return 0
+
+
+tracking_api_limiter = RateLimiter(
+    app.config['TRACKING_API_RATE_LIMIT'],
+    backend_factory=lambda: create_tracking_cache_backend(app.config, prefix='meridian:ratelimit:')
+)
+
+
+def client_address():
+    """Adresse du client ; sur Vercel, le proxy remplace X-Forwarded-For par l'adresse réelle"""
+    if os.environ.get('VERCEL') == '1' and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or 'unknown'
+
+
+def parse_list_arg(payload, name):
+    """Lit une liste depuis un corps JSON (liste) ou un paramètre de requête séparé par des virgules"""
+    value = payload.get(name) if payload else None
+    if value is None:
+        value = request.args.get(name)
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+@app.route('/api/tracking', methods=['GET', 'POST'])
+def tracking_batch_api():
+    """
+    Suivi groupé : numéros résolus depuis le cache ou en une requête IN, les numéros inconnus
+    étant listés dans 'missing'. Un administrateur connecté a accès à tous les champs
+    (TRACKING_API_FIELDS, TRACKING_BATCH_MAX numéros par appel) ; un appel anonyme est limité aux
+    champs de statut et de lieu, à TRACKING_BATCH_ANONYMOUS_MAX numéros par appel et à
+    TRACKING_API_RATE_LIMIT numéros par minute et par adresse.
+    """
+    payload = request.get_json(silent=True) if request.method == 'POST' else None
+    if payload is not None and not isinstance(payload, dict):
+        return jsonify({"status": "error", "message": "Le corps JSON doit être un objet"}), 400
+
+    anonymous = not current_user.is_authenticated
+    batch_max = app.config['TRACKING_BATCH_ANONYMOUS_MAX' if anonymous else 'TRACKING_BATCH_MAX']
+    allowed_fields = TRACKING_API_PUBLIC_FIELDS if anonymous else TRACKING_API_FIELDS
+
+    # Dédupliquer en conservant l'ordre de la demande
+    tracking_numbers = list(dict.fromkeys(parse_list_arg(payload, 'tracking_numbers')))
+    if not tracking_numbers:
+        return jsonify({"status": "error", "message": "Paramètre 'tracking_numbers' manquant"}), 400
+    if len(tracking_numbers) > batch_max:
+        return jsonify({
+            "status": "error",
+            "message": f"{batch_max} numéros maximum par appel"
+        }), 400
+
+    fields = parse_list_arg(payload, 'fields') or list(TRACKING_API_DEFAULT_FIELDS)
+    unknown = [field for field in fields if field not in allowed_fields]
+    if unknown:
+        return jsonify({
+            "status": "error",
+            "message": f"Champs inconnus ou réservés aux administrateurs : {', '.join(unknown)}",
+            "allowed_fields": list(allowed_fields)
+        }), 400
+
+    if anonymous:
+        retry_after = tracking_api_limiter.hit(client_address(), len(tracking_numbers))
+        if retry_after:
+            response = jsonify({
+                "status": "error",
+                "message": f"{app.config['TRACKING_API_RATE_LIMIT']} numéros par minute maximum, réessayez plus tard"
+            })
+            response.headers['Retry-After'] = str(retry_after)
+            return response, 429
+
+    found = tracking_cache.get_many_by_tracking_number(tracking_numbers)
+    latest_events = {}
+    if 'status' in fields or 'last_event_at' in fields:
+        latest_events = load_latest_events([data['id'] for data in found.values()])
+
+    parcels = []
+    for tracking_number in tracking_numbers:
+        data = found.get(tracking_number)
+        if data is None:
+            continue
+        event = latest_events.get(data['id'])
+        data = dict(data,
+                    status=event.status if event else data['current_location'],
+                    last_event_at=event.occurred_at.isoformat() if event else None)
+        parcels.append({field: data[field] for field in fields})
+
+    return jsonify({
+        "count": len(parcels),
+        "parcels": parcels,
+        "missing": [tn for tn in tracking_numbers if tn not in found]
+    }), 200
+
+
+@app.route('/orders/export')
+@login_required
+def export_orders():
+    """Export en flux des commandes (CSV, JSONL ou NDJSON) avec les mêmes filtres que la liste"""
+    fmt = (request.args.get('format') or 'csv').lower()
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"status": "error", "message": f"Format d'export non supporté : {fmt}"}), 400
+    error = order_args_error(request.args)
+    if error:
+        # Avant le début du flux : une fois l'export commencé, le statut ne peut plus changer
+        return jsonify({"status": "error", "message": error}), 400
+
+    filters = parse_order_filters(request.args)
+    filename = f"orders-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    response = Response(stream_with_context(generate_export(filters, fmt)), mimetype=EXPORT_MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/orders/import', methods=['POST'])
+@login_required
+def import_orders_route():
+    """Import en masse de commandes depuis un fichier CSV ou JSONL (champ 'file')"""
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({"status": "error", "message": "Aucun fichier fourni (champ 'file')"}), 400
+
+    fmt = detect_import_format(upload.filename, request.form.get('format') or request.args.get('format'))
+    if fmt not in ('csv', 'jsonl', 'ndjson'):
+        return jsonify({"status": "error", "message": f"Format d'import non supporté : {fmt}"}), 400
+    batch_size = request.form.get('batch_size', type=int) or request.args.get('batch_size', type=int)
+
+    # Le fichier téléversé est lu en flux (Werkzeug le stocke sur disque au-delà de 500 Ko)
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+    report = import_orders(stream, fmt, batch_size=batch_size)
+    return jsonify(dict(report, status="success")), 200
+
+
+@app.route('/tracking-cache/stats')
+@login_required
+def tracking_cache_stats():
+    """Compteurs du cache de suivi (hits/misses)"""
+    return jsonify(tracking_cache.stats()), 200
+
+
+@app.route('/response-cache/stats')
+@login_required
+def response_cache_stats():
+    """Compteurs et taille du cache des pages publiques"""
+    return jsonify(response_cache.stats()), 200
+
+
+@app.route('/response-cache/purge', methods=['POST'])
+@login_required
+def response_cache_purge():
+    """Vide le cache des pages publiques de ce processus (tout, ou les chemins commençant par ?prefix=)"""
+    prefix = request.values.get('prefix') or None
+    removed = response_cache.purge(prefix)
+    return jsonify({"purged": removed, "prefix": prefix}), 200
+
 # ============================
 #   ROUTES - INITIALISATION BASE DE DONNÉES
 # ============================
@@ -669,6 +3787,8 @@ def init_database():
         with app.app_context():
             # Créer toutes les tables si elles n'existent pas
             db.create_all()
+            # Ajouter les index manquants sur les tables existantes
+            ensure_indexes()
             return jsonify({
                 "status": "success",
                 "message": "Base de données initialisée avec succès. Les tables ont été créées."
@@ -734,14 +3854,18 @@ def clear_database():
             orders_count = Order.query.count()
             users_count = User.query.count()
             
-            # Supprimer toutes les commandes
+            # Supprimer l'historique de suivi puis toutes les commandes
+            TrackingEvent.query.delete()
             Order.query.delete()
+            OrderStat.query.delete()
             
             # Supprimer tous les utilisateurs
             User.query.delete()
             
             # Valider les suppressions
             db.session.commit()
+            tracking_cache.clear()
+            user_cache.clear()
             
             return jsonify({
                 "status": "success",
@@ -774,6 +3898,7 @@ def initialize_database():
             
             # Créer les tables si elles n'existent pas
             db.create_all()
+            ensure_indexes()
             print("✓ Base de données initialisée - Tables créées/vérifiées")
             
             # Vérifier si l'admin existe, sinon le créer
@@ -864,6 +3989,19 @@ def health_check():
         }), 500
 
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    Métriques de l'application au format texte Prometheus, réservées au jeton METRICS_TOKEN
+    (Authorization: Bearer <jeton>) ou à un administrateur connecté
+    """
+    token = app.config['METRICS_TOKEN']
+    authorized = bool(token) and hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}")
+    if not authorized and not current_user.is_authenticated:
+        return jsonify({"error": "Jeton de métriques requis"}), 401
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.route('/test-db-full')
 def test_db_full():
     """Test complet CRUD de la base de données"""
@@ -903,8 +4041,8 @@ def test_db_full():
             destination_city="Lyon",
             destination_country="France",
             current_location="Entrepôt Paris",
-            pickup_date=datetime.utcnow().strftime("%Y-%m-%d"),
-            pickup_time=datetime.utcnow().strftime("%H:%M")
+            pickup_date=datetime.utcnow().date(),
+            pickup_time=datetime.utcnow().time().replace(second=0, microsecond=0)
         )
         db.session.add(new_order)
         db.session.commit()
@@ -957,6 +4095,14 @@ def internal_error(error):
         "hint": "Vérifiez les logs pour plus de détails" if not app.debug else None
     }), 500
 
+@app.errorhandler(400)
+def bad_request(error):
+    """Gestionnaire d'erreur 400 (paramètre de requête invalide)"""
+    return jsonify({
+        "error": "Requête invalide",
+        "message": error.description
+    }), 400
+
 @app.errorhandler(404)
 def not_found(error):
     """Gestionnaire d'erreur 404"""
@@ -0,0 +1,262 @@
+"""
+Benchmark HTTP des routes chaudes
+
+Mesure le débit et la latence (p50/p95/p99) de /track-order, /order/tracking/<n>,
+/order/<id>, /orders et /static/... sur une base SQLite locale remplie par seed_orders.py,
+à la fois via le client de test Flask (coût applicatif seul) et via un vrai serveur WSGI
+local (wsgiref, multi-thread) interrogé en HTTP. Les résultats sont enregistrés en JSON ;
+--compare signale les routes dont le p95 ou le débit s'est dégradé par rapport à une
+exécution de référence.
+
+Usage :
+    python benchmark_http.py [--orders 20000] [--requests 500] [--concurrency 4]
+                             [--modes client wsgi] [--output bench_http.json]
+                             [--compare bench_reference.json --tolerance 0.15]
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+
+BENCH_EMAIL = 'bench@example.com'
+BENCH_PASSWORD = 'bench-password'
+STATIC_PATH = '/static/assets/css/custom.css'
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(mode, route, timings, statuses, elapsed):
+    return {
+        "mode": mode,
+        "route": route,
+        "requests": len(timings),
+        "errors": sum(1 for status in statuses if status >= 400),
+        "throughput_rps": round(len(timings) / elapsed, 1) if elapsed else None,
+        "latency_ms_mean": round(statistics.mean(timings), 3),
+        "latency_ms_p50": round(percentile(timings, 50), 3),
+        "latency_ms_p95": round(percentile(timings, 95), 3),
+        "latency_ms_p99": round(percentile(timings, 99), 3),
+    }
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def prepare_database(orders, seed):
+    """Remplit la base de benchmark et crée le compte utilisé pour les routes authentifiées"""
+    from app import app, db, User, Order
+    from seed_orders import seed as seed_orders
+
+    with app.app_context():
+        db.create_all()
+        existing = db.session.query(Order.id).count()
+        if existing < orders:
+            seed_orders(orders - existing, seed, batch_size=5000, days=365, drop=False)
+        if User.query.filter_by(email=BENCH_EMAIL).first() is None:
+            user = User(email=BENCH_EMAIL, is_admin=True)
+            user.set_password(BENCH_PASSWORD)
+            db.session.add(user)
+            db.session.commit()
+        rows = db.session.query(Order.id, Order.tracking_number).all()
+    return rows
+
+
+def build_targets(rows, requests, seed):
+    """URL tirées aléatoirement (graine fixe) pour chaque route mesurée"""
+    rng = random.Random(seed)
+    sample = [rng.choice(rows) for _ in range(requests)]
+    return {
+        'track_order': [f"/track-order?noor={tn}" for _, tn in sample],
+        'order_detail_by_tracking': [f"/order/tracking/{tn}" for _, tn in sample],
+        'order_detail': [f"/order/{order_id}" for order_id, _ in sample],
+        'orders_list': ['/orders'] * requests,
+        'static': [STATIC_PATH] * requests,
+    }
+
+
+def run_client(app, targets, warmup):
+    """Client de test Flask : un seul thread, pas de réseau"""
+    client = app.test_client()
+    client.post('/login', data={'email': BENCH_EMAIL, 'password': BENCH_PASSWORD})
+    results = []
+    for route, urls in targets.items():
+        for url in urls[:warmup]:
+            client.get(url)
+        timings, statuses = [], []
+        started = time.perf_counter()
+        for url in urls:
+            start = time.perf_counter()
+            response = client.get(url)
+            response.get_data()
+            timings.append((time.perf_counter() - start) * 1000)
+            statuses.append(response.status_code)
+        results.append(summarize('client', route, timings, statuses, time.perf_counter() - started))
+    return results
+
+
+def http_get(port, url, cookie):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        connection.request('GET', url, headers={'Cookie': cookie} if cookie else {})
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def login_cookie(port):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    body = f"email={BENCH_EMAIL}&password={BENCH_PASSWORD}"
+    connection.request('POST', '/login', body=body,
+                       headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = connection.getresponse()
+    response.read()
+    cookies = [header.split(';', 1)[0] for name, header in response.getheaders() if name.lower() == 'set-cookie']
+    connection.close()
+    return '; '.join(cookies)
+
+
+def run_wsgi(app, targets, warmup, concurrency):
+    """Serveur WSGI local réel, interrogé en HTTP par `concurrency` threads"""
+    server = make_server('127.0.0.1', 0, app, server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    port = server.server_port
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    results = []
+    try:
+        cookie = login_cookie(port)
+        for route, urls in targets.items():
+            for url in urls[:warmup]:
+                http_get(port, url, cookie)
+            timings, statuses = [], []
+            lock = threading.Lock()
+            chunks = [urls[index::concurrency] for index in range(concurrency)]
+
+            def worker(chunk):
+                for url in chunk:
+                    start = time.perf_counter()
+                    status = http_get(port, url, cookie)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    with lock:
+                        timings.append(elapsed)
+                        statuses.append(status)
+
+            workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+            started = time.perf_counter()
+            for item in workers:
+                item.start()
+            for item in workers:
+                item.join()
+            results.append(summarize('wsgi', route, timings, statuses, time.perf_counter() - started))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, reference_path, tolerance):
+    """Compare aux résultats de référence. Retourne la liste des régressions"""
+    with open(reference_path, 'r', encoding='utf-8') as f:
+        reference = {(item['mode'], item['route']): item for item in json.load(f)['results']}
+    regressions = []
+    print(f"\nComparaison avec {reference_path} (tolérance {tolerance:.0%}) :")
+    for item in results:
+        base = reference.get((item['mode'], item['route']))
+        if base is None:
+            continue
+        p95_change = item['latency_ms_p95'] / base['latency_ms_p95'] - 1 if base['latency_ms_p95'] else 0
+        rps_change = item['throughput_rps'] / base['throughput_rps'] - 1 if base['throughput_rps'] else 0
+        regressed = p95_change > tolerance or rps_change < -tolerance
+        flag = '⚠ REGRESSION' if regressed else 'ok'
+        print(f"  {item['mode']:<6} {item['route']:<26} p95 {p95_change:+.1%}  débit {rps_change:+.1%}  {flag}")
+        if regressed:
+            regressions.append(item)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTTP des routes chaudes")
+    parser.add_argument('--orders', type=int, default=20000, help="Commandes dans la base de benchmark")
+    parser.add_argument('--requests', type=int, default=500, help="Requêtes mesurées par route et par mode")
+    parser.add_argument('--warmup', type=int, default=20, help="Requêtes de chauffe non mesurées par route")
+    parser.add_argument('--concurrency', type=int, default=4, help="Clients simultanés en mode wsgi")
+    parser.add_argument('--modes', nargs='+', choices=['client', 'wsgi'], default=['client', 'wsgi'])
+    parser.add_argument('--seed', type=int, default=42, help="Graine du jeu de données et des URL tirées")
+    parser.add_argument('--database-url', default=None,
+                        help="Base à utiliser (défaut : SQLite temporaire)")
+    parser.add_argument('--output', default=None, help="Fichier JSON de résultats")
+    parser.add_argument('--compare', default=None, help="Fichier JSON de référence à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="Dégradation tolérée avant alerte")
+    args = parser.parse_args()
+
+    # Base SQLite temporaire par défaut : ne jamais toucher la base configurée dans .env
+    os.environ['DATABASE_URL'] = args.database_url or \
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_http.db')}"
+    from app import app
+
+    rows = prepare_database(args.orders, args.seed)
+    targets = build_targets(rows, args.requests, args.seed)
+
+    results = []
+    if 'client' in args.modes:
+        results.extend(run_client(app, targets, args.warmup))
+    if 'wsgi' in args.modes:
+        results.extend(run_wsgi(app, targets, args.warmup, args.concurrency))
+
+    print(f"\n{'mode':<6} {'route':<26} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err':>5}")
+    for item in results:
+        print(f"{item['mode']:<6} {item['route']:<26} {item['throughput_rps']:>9.1f} {item['latency_ms_p50']:>9.3f} "
+              f"{item['latency_ms_p95']:>9.3f} {item['latency_ms_p99']:>9.3f} {item['errors']:>5}")
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "orders": len(rows),
+        "requests_per_route": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Résultats enregistrés dans {args.output}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
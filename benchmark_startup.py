@@ -0,0 +1,131 @@
+"""
+Benchmark du démarrage à froid
+
+Lance N interpréteurs neufs (comme un cold start serverless) et mesure dans chacun :
+le temps d'import de app.py, puis la latence de la première requête sur chaque chemin
+(la première de la liste paie l'initialisation paresseuse restante), ainsi que la durée
+totale du processus. Avec --importtime, affiche les modules les plus coûteux à importer.
+
+Usage :
+    python benchmark_startup.py [--runs 10] [--paths /static/assets/css/custom.css /tracking /health]
+                                [--database-url sqlite:///...] [--output startup.json] [--importtime]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CHILD_SCRIPT = r"""
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {base_dir!r})
+import app as module
+imported = time.perf_counter()
+client = module.app.test_client()
+result = {{"import_ms": (imported - started) * 1000, "requests": []}}
+for path in {paths!r}:
+    start = time.perf_counter()
+    response = client.get(path)
+    response.get_data()
+    result["requests"].append({{"path": path, "status": response.status_code,
+                                "ms": (time.perf_counter() - start) * 1000}})
+print("BENCH_RESULT " + json.dumps(result))
+"""
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def describe(values):
+    return {
+        "mean": round(statistics.mean(values), 2),
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "min": round(min(values), 2),
+        "max": round(max(values), 2),
+    }
+
+
+def run_once(paths, env):
+    script = CHILD_SCRIPT.format(base_dir=BASE_DIR, paths=paths)
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, env=env, cwd=BASE_DIR)
+    wall_ms = (time.perf_counter() - started) * 1000
+    for line in completed.stdout.splitlines():
+        if line.startswith('BENCH_RESULT '):
+            result = json.loads(line[len('BENCH_RESULT '):])
+            result['process_ms'] = wall_ms
+            result['stdout_lines'] = len(completed.stdout.splitlines()) - 1
+            return result
+    raise RuntimeError(f"Exécution en échec :\n{completed.stdout}\n{completed.stderr}")
+
+
+def import_profile(env, top):
+    """Modules les plus coûteux (temps propre) selon python -X importtime"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import sys; sys.path.insert(0, {BASE_DIR!r}); import app"],
+        capture_output=True, text=True, env=env, cwd=BASE_DIR
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = [part.strip() for part in line[len('import time:'):].split('|')]
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage à froid (import + première requête)")
+    parser.add_argument('--runs', type=int, default=10, help="Nombre de processus neufs")
+    parser.add_argument('--paths', nargs='+', default=['/static/assets/css/custom.css', '/tracking', '/health'],
+                        help="Chemins demandés dans l'ordre après l'import")
+    parser.add_argument('--database-url', default=None, help="Base à utiliser (défaut : SQLite temporaire)")
+    parser.add_argument('--output', default=None, help="Fichier JSON de résultats")
+    parser.add_argument('--importtime', action='store_true', help="Afficher les imports les plus coûteux")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}"
+    env.setdefault('SECRET_KEY', 'benchmark-startup')
+
+    runs = [run_once(args.paths, env) for _ in range(args.runs)]
+    summary = {
+        "runs": args.runs,
+        "import_ms": describe([run['import_ms'] for run in runs]),
+        "process_ms": describe([run['process_ms'] for run in runs]),
+        "startup_log_lines": runs[0]['stdout_lines'],
+        "first_request_ms": {},
+    }
+    for index, path in enumerate(args.paths):
+        summary["first_request_ms"][path] = describe([run['requests'][index]['ms'] for run in runs])
+        summary["first_request_ms"][path]["status"] = runs[0]['requests'][index]['status']
+
+    print(f"Import de app.py      : p50 {summary['import_ms']['p50']:.1f} ms (moyenne {summary['import_ms']['mean']:.1f} ms)")
+    for path, stats in summary["first_request_ms"].items():
+        print(f"Première requête {path:<32} : p50 {stats['p50']:.1f} ms ({stats['status']})")
+    print(f"Processus complet     : p50 {summary['process_ms']['p50']:.1f} ms, "
+          f"{summary['startup_log_lines']} ligne(s) de log au démarrage")
+
+    if args.importtime:
+        print("\nImports les plus coûteux (temps propre) :")
+        for self_us, cumulative_us, module in import_profile(env, 15):
+            print(f"  {self_us / 1000:>7.1f} ms  (cumulé {cumulative_us / 1000:>7.1f} ms)  {module}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"summary": summary, "runs": runs}, f, indent=2)
+        print(f"Résultats enregistrés dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark de l'allocation des numéros de suivi
+
+Mesure la latence d'insertion d'une commande (allocation + INSERT + COMMIT) lorsque
+10 %, 50 % et 90 % de l'espace des 67,6 M numéros est déjà consommé.
+Le remplissage est simulé en positionnant le compteur partagé : l'allocateur ne fait
+aucune requête d'existence, son coût ne dépend donc que de la position dans la séquence.
+À titre de comparaison, l'ancien générateur aléatoire faisait en moyenne 1 / (1 - taux)
+requêtes d'existence par insertion (et renvoyait un numéro non vérifié après 100 échecs).
+
+Usage :
+    python benchmark_tracking_numbers.py [--samples 500] [--levels 0.1 0.5 0.9] [--output bench.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(samples, levels, database_url):
+    # Base SQLite temporaire par défaut : ne jamais toucher la base configurée dans .env
+    os.environ['DATABASE_URL'] = database_url
+    from app import app, db, Order, SequenceCounter, TRACKING_NUMBER_SPACE, tracking_allocator, commit_new_order
+
+    results = []
+    with app.app_context():
+        db.create_all()
+        for level in levels:
+            # Simuler l'occupation de l'espace en avançant le compteur partagé
+            position = int(level * TRACKING_NUMBER_SPACE)
+            counter = db.session.get(SequenceCounter, tracking_allocator.sequence_name)
+            if counter is None:
+                counter = SequenceCounter(name=tracking_allocator.sequence_name)
+                db.session.add(counter)
+            counter.value = position
+            db.session.commit()
+            tracking_allocator._next = tracking_allocator._end = 0
+
+            allocate_timings = []
+            insert_timings = []
+            for i in range(samples):
+                start = time.perf_counter()
+                tracking_number = tracking_allocator.next()
+                allocated = time.perf_counter()
+                commit_new_order(Order(
+                    sender_name="Bench Sender",
+                    sender_phone="+33100000000",
+                    sender_email="bench.sender@example.com",
+                    sender_address="1 rue du Benchmark, Paris",
+                    receiver_name="Bench Receiver",
+                    receiver_phone="+33100000001",
+                    receiver_email="bench.receiver@example.com",
+                    receiver_address="2 avenue du Benchmark, Lyon",
+                    shipment_name=f"Colis {i}",
+                    tracking_number=tracking_number,
+                    origin_city="Paris",
+                    origin_country="France",
+                    destination_city="Lyon",
+                    destination_country="France"
+                ))
+                end = time.perf_counter()
+                allocate_timings.append((allocated - start) * 1000)
+                insert_timings.append((end - start) * 1000)
+
+            result = {
+                "fill_level": level,
+                "samples": samples,
+                "allocate_ms_mean": round(statistics.mean(allocate_timings), 4),
+                "insert_ms_p50": round(percentile(insert_timings, 50), 4),
+                "insert_ms_p95": round(percentile(insert_timings, 95), 4),
+                "insert_ms_p99": round(percentile(insert_timings, 99), 4),
+                "legacy_expected_queries": round(1 / (1 - level), 2)
+            }
+            results.append(result)
+            print(f"Remplissage {level:>4.0%} : allocation {result['allocate_ms_mean']:.4f} ms, "
+                  f"insertion p50 {result['insert_ms_p50']:.3f} ms / p95 {result['insert_ms_p95']:.3f} ms "
+                  f"(ancien générateur : ~{result['legacy_expected_queries']} requêtes d'existence)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'allocateur de numéros de suivi")
+    parser.add_argument('--samples', type=int, default=500, help="Insertions mesurées par niveau")
+    parser.add_argument('--levels', type=float, nargs='+', default=[0.1, 0.5, 0.9],
+                        help="Taux d'occupation simulés de l'espace des numéros")
+    parser.add_argument('--database-url', default=None,
+                        help="Base à utiliser (défaut : SQLite temporaire)")
+    parser.add_argument('--output', default=None, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    results = run(args.samples, args.levels, database_url)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Résultats enregistrés dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,647 @@
+"""
+Build des fichiers statiques
+
+Étape "bundle" : concatène les CSS/JS listés dans STATIC_BUNDLES (app.py) en quelques fichiers
+sous app/static/assets/dist, chacun avec sa source map (.map). Le helper de template
+asset_bundle() les référence en production et garde les fichiers d'origine en debug. Les JS sont
+minifiés fichier par fichier avec rjsmin (optionnel, pip install rjsmin ; les commentaires /*! */
+de licence sont gardés) puis concaténés : la source map renvoie chaque ligne minifiée au début
+de son fichier d'origine. Sans rjsmin, un avertissement ⚠ est affiché et les JS sont concaténés
+tels quels, une ligne de sortie par ligne de la source. Les CSS sont découpés en jetons
+(commentaires, chaînes, url()) : seuls les commentaires et les espaces entre jetons sont retirés,
+et les url() relatives sont réécrites pour le dossier du bundle ; le nombre de lignes est conservé
+et la source map reste exacte à la ligne près.
+
+Étape "images" : décline les photos des dossiers STATIC_IMAGE_DIRS (app.py) en plusieurs largeurs
+(STATIC_IMAGE_WIDTHS, jamais au-delà de l'original) aux formats AVIF et WebP, dans
+app/static/assets/dist/img, et écrit app/static/image-manifest.json (dimensions d'origine et
+variantes). Le helper de template responsive_image() en tire un <picture> avec srcset. Requiert
+Pillow (pip install Pillow, utile seulement pour le build) ; l'AVIF requiert Pillow >= 11.3.
+
+Étape "fingerprint" : copie chaque fichier de app/static référencé par les templates, app.py, les
+bundles ou le manifeste des images sous un nom contenant l'empreinte de son contenu
+(style.css → style.3f2a1b9c0d.css, dans le même dossier pour que les url() relatives des CSS
+restent valides) et écrit app/static/asset-manifest.json. Les fichiers chargés seulement depuis
+les CSS ou le JS (polices, fonds...) gardent leur nom : aucune copie inutile. url_for('static', ...) et le
+filtre static_path pointent alors vers ces copies, servies avec Cache-Control immutable (1 an).
+Les copies des versions précédentes sont supprimées, sauf celles encore citées par les pages
+pré-rendues (freeze_pages.py) : elles restent servies jusqu'au prochain pré-rendu.
+
+Étape "compress" : écrit à côté de chaque fichier texte de app/static (css, js, svg, polices
+ttf/eot, ...) une variante gzip (.gz) et brotli (.br) compressées au niveau maximal. Les routes
+/static et /assets de app.py servent la meilleure variante acceptée par le navigateur
+(Accept-Encoding) avec un ETag fort. Une variante n'est écrite que si elle est plus petite que
+l'original, et n'est régénérée que si l'original a changé. L'empreinte de chaque original est
+écrite dans compressed-manifest.json : l'application ne sert une variante que si l'original a
+toujours ce contenu (les dates de modification ne survivent pas à un clone ou un déploiement).
+
+Étape "templates" : compile chaque template de app/templates en bytecode Jinja dans
+app/template_bytecode (TEMPLATE_BYTECODE_DIR), livré avec le déploiement : le premier rendu de
+chaque page après un démarrage à froid recharge ce bytecode au lieu de reparser le template. Le
+bytecode dépend de la version de Python : lancer le build avec la même version mineure que le
+runtime Vercel (sinon les templates sont recompilés au premier rendu, comme sans cette étape).
+
+Le module brotli est optionnel (pip install brotli) : sans lui, seules les variantes .gz sont écrites.
+Le module rjsmin est optionnel (pip install rjsmin) : sans lui, les bundles JS ne sont pas minifiés.
+
+Usage :
+    python build_static.py [--steps bundle images fingerprint compress templates] [--force] [--clean]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+
+from app import (
+    app, static_dir, TEMPLATE_BYTECODE_DIR, TemplateBytecodeCache, FROZEN_PAGES_MANIFEST_FILE,
+    STATIC_BUNDLES, STATIC_COMPRESSIBLE_EXTENSIONS, STATIC_COMPRESSED_MANIFEST_FILE, STATIC_ENCODINGS,
+    STATIC_MANIFEST_FILE, STATIC_MANIFEST_RETAINED_KEY, STATIC_IMAGE_DIRS, STATIC_IMAGE_FORMATS, STATIC_IMAGE_MANIFEST_FILE, STATIC_IMAGE_WIDTHS
+)
+
+MIN_SIZE = 1024  # En dessous, l'en-tête Content-Encoding coûte plus qu'il ne rapporte
+HASH_LENGTH = 10
+FINGERPRINTED_NAME = re.compile(r'\.[0-9a-f]{%d}(\.[^./]+)$' % HASH_LENGTH)
+GENERATED_SUFFIXES = tuple(suffix for _, suffix in STATIC_ENCODINGS) + ('.tmp',)
+IMAGE_OUTPUT_DIR = 'assets/dist/img'
+IMAGE_SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+IMAGE_QUALITY = {'avif': 50, 'webp': 75}
+# Chemins d'assets cités dans les templates et app.py (src/href, url_for, static_path, responsive_image...)
+ASSET_REFERENCE = re.compile(r'assets/[A-Za-z0-9_./@%+-]+\.[A-Za-z0-9]+')
+APP_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+BUILD_MANIFESTS = (STATIC_MANIFEST_FILE, STATIC_IMAGE_MANIFEST_FILE, STATIC_COMPRESSED_MANIFEST_FILE)
+
+
+BASE64_DIGITS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+# Jetons CSS jamais retouchés par la minification : commentaires (retirés), url() avec ou sans
+# guillemets (réécrites) et chaînes, qui peuvent contenir /*, //, ; ou des espaces significatifs
+CSS_TOKEN = re.compile(
+    r'(?P<comment>/\*.*?(?:\*/|\Z))'
+    r'|(?P<url>url\(\s*(?:"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|[^\'"\s)]*)\s*\))'
+    r'|(?P<string>"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\')',
+    re.S | re.I
+)
+CSS_URL = re.compile(r'url\(\s*([\'"]?)(.*?)\1\s*\)', re.S | re.I)
+# @charset n'est valide qu'en tout début de fichier : un seul, en tête du bundle
+CSS_CHARSET = re.compile(r'^\ufeff?@charset\s+"[^"]*"\s*;', re.I)
+ABSOLUTE_URL = re.compile(r'^(?:[a-z][a-z0-9+.-]*:|/|#)', re.I)
+
+
+def vlq(value):
+    """Encodage base64 VLQ d'un entier (format des source maps v3)"""
+    value = (-value << 1) | 1 if value < 0 else value << 1
+    encoded = ''
+    while True:
+        digit = value & 31
+        value >>= 5
+        if value:
+            digit |= 32
+        encoded += BASE64_DIGITS[digit]
+        if not value:
+            return encoded
+
+
+def source_map_mappings(origins):
+    """Champ mappings : chaque ligne produite pointe vers (fichier, ligne) d'origine, colonne 0"""
+    groups = []
+    previous_source = previous_line = 0
+    started = False
+    for origin in origins:
+        if origin is None:
+            groups.append('')
+            continue
+        source, line = origin
+        if not started:
+            groups.append('A' + vlq(source) + vlq(line) + 'A')
+            started = True
+        else:
+            groups.append('A' + vlq(source - previous_source) + vlq(line - previous_line) + 'A')
+        previous_source, previous_line = source, line
+    return ';'.join(groups)
+
+
+def rebase_css_url(token, source_rel, bundle_rel):
+    """Réécrit une url() relative de source_rel pour qu'elle reste valide depuis bundle_rel"""
+    quote, ref = CSS_URL.match(token).groups()
+    if not ref or ABSOLUTE_URL.match(ref):
+        return token
+    target = posixpath.normpath(posixpath.join(posixpath.dirname(source_rel), ref))
+    return f"url({quote}{posixpath.relpath(target, posixpath.dirname(bundle_rel))}{quote})"
+
+
+def compact_css(segment):
+    """Espaces superflus d'un segment hors jetons (jamais de saut de ligne retiré)"""
+    segment = re.sub(r'[ \t\f]+', ' ', segment)
+    segment = re.sub(r' ?\n ?', '\n', segment)
+    segment = re.sub(r' ?([{};,]) ?', r'\1', segment)
+    return segment.replace(': ', ':')
+
+
+def minify_css(css, source_rel, bundle_rel):
+    """
+    Retire les commentaires et les espaces superflus hors chaînes et url(), réécrit les url()
+    relatives. Le nombre de lignes est conservé (source map exacte à la ligne près).
+    """
+    output, position = [], 0
+    for match in CSS_TOKEN.finditer(css):
+        output.append(compact_css(css[position:match.start()]))
+        token = match.group(0)
+        if match.group('comment'):
+            output.append('\n' * token.count('\n'))
+        elif match.group('url'):
+            output.append(rebase_css_url(token, source_rel, bundle_rel))
+        else:
+            output.append(token)
+        position = match.end()
+    output.append(compact_css(css[position:]))
+    return ''.join(output)
+
+
+def js_minifier():
+    """Minifieur JS (rjsmin) ou None s'il n'est pas installé"""
+    try:
+        import rjsmin
+    except ImportError:
+        print("⚠ Module rjsmin non installé (pip install rjsmin) → bundles JS concaténés sans minification")
+        return None
+    return lambda script: rjsmin.jsmin(script, keep_bang_comments=True)
+
+
+def build_bundle(root, bundle_rel, sources, minify_js=None):
+    is_css = bundle_rel.endswith('.css')
+    lines, origins = [], []
+    if is_css:
+        lines.append('@charset "UTF-8";')
+        origins.append(None)
+    for index, source_rel in enumerate(sources):
+        with open(os.path.join(root, source_rel), 'r', encoding='utf-8', errors='surrogateescape') as f:
+            text = f.read().replace('\r\n', '\n').replace('\r', '\n')
+        if is_css:
+            # Les lignes vidées par la minification sont sautées, les autres gardent leur numéro
+            text = minify_css(CSS_CHARSET.sub('', text), source_rel, bundle_rel)
+            numbered = [(number, line) for number, line in enumerate(text.split('\n')) if line.strip()]
+        elif minify_js:
+            # Les lignes minifiées ne correspondent plus à la source : toutes pointent vers son début
+            numbered = [(0, line) for line in minify_js(text).split('\n') if line.strip()]
+        else:
+            numbered = enumerate(text.split('\n'))
+        for number, line in numbered:
+            lines.append(line)
+            origins.append((index, number))
+        if not is_css:
+            # Un fichier sans point-virgule final ne doit pas se fondre dans le suivant
+            lines.append(';')
+            origins.append(None)
+
+    name = posixpath.basename(bundle_rel)
+    source_map = {
+        'version': 3,
+        'file': name,
+        'sources': [posixpath.relpath(source_rel, posixpath.dirname(bundle_rel)) for source_rel in sources],
+        'names': [],
+        'mappings': source_map_mappings(origins),
+    }
+    lines.append(f"/*# sourceMappingURL={name}.map */" if is_css else f"//# sourceMappingURL={name}.map")
+
+    target = os.path.join(root, bundle_rel)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target + '.map.tmp', 'w', encoding='utf-8') as f:
+        json.dump(source_map, f, separators=(',', ':'))
+    os.replace(target + '.map.tmp', target + '.map')
+    with open(target + '.tmp', 'w', encoding='utf-8', errors='surrogateescape') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(target + '.tmp', target)
+
+
+def bundle(root, force=False):
+    built = 0
+    minify_js = js_minifier()
+    for bundle_rel, sources in STATIC_BUNDLES.items():
+        target = os.path.join(root, bundle_rel)
+        paths = [os.path.join(root, source_rel) for source_rel in sources]
+        missing = [source_rel for source_rel, path in zip(sources, paths) if not os.path.isfile(path)]
+        if missing:
+            print(f"⚠ Bundle {bundle_rel} ignoré, fichiers absents : {', '.join(missing)}")
+            continue
+        if not force and os.path.exists(target) and \
+                os.stat(target).st_mtime_ns >= max(os.stat(path).st_mtime_ns for path in paths):
+            continue
+        build_bundle(root, bundle_rel, sources, minify_js)
+        built += 1
+        original = sum(os.path.getsize(path) for path in paths)
+        print(f"  {bundle_rel:<26} {len(sources):>3} fichier(s), {original / 1024:>8.1f} Ko → "
+              f"{os.path.getsize(target) / 1024:>8.1f} Ko")
+    print(f"✓ {built} bundle(s) écrit(s), {len(STATIC_BUNDLES) - built} déjà à jour ou ignoré(s)")
+
+
+def clean_bundle(root):
+    removed = 0
+    for bundle_rel in STATIC_BUNDLES:
+        target = os.path.join(root, bundle_rel)
+        for path in (target, target + '.map'):
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+    print(f"✓ {removed} fichier(s) de bundle supprimé(s)")
+
+
+def image_slug(name):
+    """'Warehousing & Distribution' → 'warehousing-distribution'"""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def image_widths(width):
+    """Largeurs à produire : celles de STATIC_IMAGE_WIDTHS nettement plus petites que l'original, plus l'original (plafonné)"""
+    widths = [candidate for candidate in STATIC_IMAGE_WIDTHS if candidate < width * 0.9]
+    widths.append(min(width, max(STATIC_IMAGE_WIDTHS)))
+    return sorted(set(widths))
+
+
+def images(root, force=False):
+    try:
+        from PIL import Image, ImageOps, features
+    except ImportError:
+        print("⚠ Module Pillow non installé (pip install Pillow) → étape images ignorée")
+        return
+    formats = [image_format for image_format in STATIC_IMAGE_FORMATS if features.check(image_format)]
+    for image_format in set(STATIC_IMAGE_FORMATS) - set(formats):
+        print(f"⚠ Format {image_format} non pris en charge par cette version de Pillow → ignoré")
+
+    manifest = {}
+    written = 0
+    original_bytes = 0
+    thumbnail_bytes = {image_format: 0 for image_format in formats}
+    for source_dir in STATIC_IMAGE_DIRS:
+        directory = os.path.join(root, source_dir)
+        if not os.path.isdir(directory):
+            print(f"⚠ Dossier d'images introuvable : {source_dir}")
+            continue
+        output_dir = f"{IMAGE_OUTPUT_DIR}/{image_slug(posixpath.basename(source_dir))}"
+        os.makedirs(os.path.join(root, output_dir), exist_ok=True)
+        for name in sorted(os.listdir(directory)):
+            if not name.lower().endswith(IMAGE_SOURCE_EXTENSIONS) or FINGERPRINTED_NAME.search(name):
+                continue
+            path = os.path.join(directory, name)
+            source_mtime = os.stat(path).st_mtime_ns
+            with Image.open(path) as opened:
+                image = ImageOps.exif_transpose(opened)
+                image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+            width, height = image.size
+            widths = image_widths(width)
+            stem = image_slug(os.path.splitext(name)[0])
+            variants = {}
+            for image_format in formats:
+                variants[image_format] = []
+                for target_width in widths:
+                    target_rel = f"{output_dir}/{stem}-{target_width}.{image_format}"
+                    target = os.path.join(root, target_rel)
+                    if force or not os.path.exists(target) or os.stat(target).st_mtime_ns < source_mtime:
+                        target_height = max(1, round(height * target_width / width))
+                        resized = image if target_width == width else \
+                            image.resize((target_width, target_height), Image.Resampling.LANCZOS)
+                        resized.save(target + '.tmp', format=image_format.upper(), quality=IMAGE_QUALITY[image_format])
+                        os.replace(target + '.tmp', target)
+                        written += 1
+                    variants[image_format].append({'width': target_width, 'src': target_rel})
+                # Taille typique d'une vignette (~480 px de large)
+                thumbnail = next((variant for variant in variants[image_format] if variant['width'] >= 480),
+                                 variants[image_format][-1])
+                thumbnail_bytes[image_format] += os.path.getsize(os.path.join(root, thumbnail['src']))
+            original_bytes += os.path.getsize(path)
+            manifest[f"{source_dir}/{name}"] = {'width': width, 'height': height, 'variants': variants}
+
+    # Variantes d'images retirées ou renommées (les copies empreintées relèvent de l'étape fingerprint)
+    expected = {variant['src'] for entry in manifest.values()
+                for variants in entry['variants'].values() for variant in variants}
+    stale = 0
+    for directory, _, files in os.walk(os.path.join(root, IMAGE_OUTPUT_DIR)):
+        for name in files:
+            path = os.path.join(directory, name)
+            if name.endswith(GENERATED_SUFFIXES) or FINGERPRINTED_NAME.search(name):
+                continue
+            if relative(root, path) not in expected:
+                os.remove(path)
+                stale += 1
+
+    path = os.path.join(root, STATIC_IMAGE_MANIFEST_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+    print(f"✓ {len(manifest)} image(s), {written} variante(s) écrite(s), {stale} obsolète(s) supprimée(s)")
+    for image_format, total in thumbnail_bytes.items():
+        if original_bytes:
+            print(f"  originaux {original_bytes / 1024:>8.1f} Ko → {image_format} ~480 px {total / 1024:>8.1f} Ko "
+                  f"({1 - total / original_bytes:.0%} économisés)")
+
+
+def clean_images(root):
+    output = os.path.join(root, IMAGE_OUTPUT_DIR)
+    if os.path.isdir(output):
+        shutil.rmtree(output)
+    path = os.path.join(root, STATIC_IMAGE_MANIFEST_FILE)
+    if os.path.exists(path):
+        os.remove(path)
+    print("✓ Variantes d'images et manifeste des images supprimés")
+
+
+def manifest_path(root):
+    return os.path.join(root, STATIC_MANIFEST_FILE)
+
+
+def load_manifest(root):
+    try:
+        with open(manifest_path(root), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_manifest(root, manifest):
+    path = manifest_path(root)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def relative(root, path):
+    return os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def iter_sources(root, generated):
+    """Fichiers d'origine : ni copies empreintées, ni variantes compressées, ni manifeste"""
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            path = os.path.join(directory, name)
+            rel = relative(root, path)
+            if name.endswith(GENERATED_SUFFIXES) or rel in BUILD_MANIFESTS \
+                    or rel in generated:
+                continue
+            if FINGERPRINTED_NAME.search(name):
+                # Copie d'un build dont le manifeste a disparu : le nom trahit l'empreinte
+                base = FINGERPRINTED_NAME.sub(r'\1', path)
+                if os.path.exists(base):
+                    continue
+            yield path, rel
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def remove_with_variants(path):
+    for candidate in [path] + variant_paths(path):
+        if os.path.exists(candidate):
+            os.remove(candidate)
+
+
+def referenced_assets(root):
+    """Fichiers de root dont l'URL est produite par url_for('static', ...) : seuls ceux-là ont besoin d'une copie"""
+    referenced = set(STATIC_BUNDLES)
+    for sources in STATIC_BUNDLES.values():
+        referenced.update(sources)
+    sources = [APP_MODULE] + [os.path.join(directory, name)
+                              for directory, _, files in os.walk(app.template_folder) for name in files]
+    for path in sources:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            referenced.update(ASSET_REFERENCE.findall(f.read()))
+    try:
+        with open(os.path.join(root, STATIC_IMAGE_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            for entry in json.load(f).values():
+                for variants in entry['variants'].values():
+                    referenced.update(variant['src'] for variant in variants)
+    except FileNotFoundError:
+        pass
+    return referenced
+
+
+def manifest_copies(manifest):
+    """Toutes les copies empreintées d'un manifeste, y compris celles retenues pour les pages pré-rendues"""
+    copies = {value for value in manifest.values() if isinstance(value, str)}
+    return copies | set(manifest.get(STATIC_MANIFEST_RETAINED_KEY) or [])
+
+
+def frozen_assets():
+    """Copies empreintées citées par les pages pré-rendues actuelles (voir freeze_pages.py)"""
+    try:
+        with open(os.path.join(app.config['FROZEN_PAGES_DIR'], FROZEN_PAGES_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return set(json.load(f).get('assets') or [])
+    except (FileNotFoundError, ValueError):
+        return set()
+
+
+def fingerprint(root, force=False):
+    previous = load_manifest(root)
+    generated = manifest_copies(previous)
+    referenced = referenced_assets(root)
+    manifest = {}
+    copied = 0
+    for path, rel in iter_sources(root, generated):
+        if rel not in referenced:
+            continue
+        stem, extension = os.path.splitext(rel)
+        target_rel = f"{stem}.{file_digest(path)}{extension}"
+        target = os.path.join(root, target_rel)
+        if force or not os.path.exists(target):
+            shutil.copy2(path, target)
+            copied += 1
+        manifest[rel] = target_rel
+
+    # Les pages pré-rendues avec un build précédent gardent leurs CSS/JS jusqu'à leur prochain rendu
+    retained = sorted((generated & frozen_assets()) - set(manifest.values()))
+    stale = generated - set(manifest.values()) - set(retained)
+    for rel in stale:
+        remove_with_variants(os.path.join(root, rel))
+    if retained:
+        manifest[STATIC_MANIFEST_RETAINED_KEY] = retained
+    write_manifest(root, manifest)
+    print(f"✓ {len(manifest) - bool(retained)} fichier(s) dans le manifeste, {copied} copie(s) écrite(s), "
+          f"{len(stale)} copie(s) obsolète(s) supprimée(s), {len(retained)} conservée(s) pour les pages pré-rendues")
+
+
+def clean_fingerprint(root):
+    generated = manifest_copies(load_manifest(root))
+    for rel in generated:
+        remove_with_variants(os.path.join(root, rel))
+    if os.path.exists(manifest_path(root)):
+        os.remove(manifest_path(root))
+    print(f"✓ {len(generated)} copie(s) empreintée(s) et le manifeste supprimés")
+
+
+def compress_gzip(data):
+    # mtime=0 : sortie identique d'un build à l'autre
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compressors():
+    """Compresseurs disponibles par suffixe de variante"""
+    available = {'.gz': compress_gzip}
+    try:
+        import brotli
+        available['.br'] = lambda data: brotli.compress(data, quality=11)
+    except ImportError:
+        print("⚠ Module brotli non installé (pip install brotli) → variantes .br non générées")
+    return available
+
+
+def iter_compressible(root):
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            path = os.path.join(directory, name)
+            if name.lower().endswith(STATIC_COMPRESSIBLE_EXTENSIONS) and relative(root, path) not in BUILD_MANIFESTS:
+                yield path
+
+
+def content_hash(path):
+    """Même empreinte que l'ETag servi par app.py (static_etag) : le serveur la compare au manifeste"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def load_compressed_manifest(root):
+    try:
+        with open(os.path.join(root, STATIC_COMPRESSED_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def variant_paths(path):
+    return [path + suffix for _, suffix in STATIC_ENCODINGS]
+
+
+def clean_compress(root):
+    removed = 0
+    for path in iter_compressible(root):
+        for variant in variant_paths(path):
+            if os.path.exists(variant):
+                os.remove(variant)
+                removed += 1
+    manifest = os.path.join(root, STATIC_COMPRESSED_MANIFEST_FILE)
+    if os.path.exists(manifest):
+        os.remove(manifest)
+    print(f"✓ {removed} variante(s) compressée(s) supprimée(s)")
+
+
+def compress(root, force=False, paths=None):
+    """Variantes .gz/.br des fichiers texte de root (ou des seuls `paths`) et manifeste de compression"""
+    available = compressors()
+    previous = load_compressed_manifest(root)
+    manifest = {}
+    written = up_to_date = 0
+    original_bytes = {suffix: 0 for suffix in available}
+    compressed_bytes = {suffix: 0 for suffix in available}
+
+    for path in paths if paths is not None else iter_compressible(root):
+        source_stat = os.stat(path)
+        if source_stat.st_size < MIN_SIZE:
+            continue
+        rel = relative(root, path)
+        manifest[rel] = content_hash(path)
+        data = None
+        for suffix, compress_data in available.items():
+            variant = path + suffix
+            if not force and os.path.exists(variant) and previous.get(rel) == manifest[rel]:
+                up_to_date += 1
+                original_bytes[suffix] += source_stat.st_size
+                compressed_bytes[suffix] += os.path.getsize(variant)
+                continue
+            if data is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            output = compress_data(data)
+            if len(output) >= len(data):
+                # Variante inutile : ne pas la servir
+                if os.path.exists(variant):
+                    os.remove(variant)
+                continue
+            with open(variant + '.tmp', 'wb') as f:
+                f.write(output)
+            os.replace(variant + '.tmp', variant)
+            written += 1
+            original_bytes[suffix] += len(data)
+            compressed_bytes[suffix] += len(output)
+
+    path = os.path.join(root, STATIC_COMPRESSED_MANIFEST_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+    print(f"✓ {written} variante(s) écrite(s), {up_to_date} déjà à jour")
+    for suffix in available:
+        if original_bytes[suffix]:
+            saved = 1 - compressed_bytes[suffix] / original_bytes[suffix]
+            print(f"  {suffix:<4} {original_bytes[suffix] / 1024:>9.1f} Ko → "
+                  f"{compressed_bytes[suffix] / 1024:>8.1f} Ko ({saved:.0%} économisés)")
+
+
+def templates(root, force=False):
+    """Précompile tous les templates dans TEMPLATE_BYTECODE_DIR (root, le dossier static, n'est pas utilisé)"""
+    if force:
+        clean_templates(root)
+    # Environnement dédié, sans cache de templates en mémoire : chaque template passe par le cache de bytecode
+    bytecode_cache = TemplateBytecodeCache(TEMPLATE_BYTECODE_DIR)
+    environment = app.jinja_env.overlay(bytecode_cache=bytecode_cache, cache_size=0)
+    compiled, failed = 0, []
+    for name in environment.list_templates():
+        try:
+            environment.get_template(name)
+        except Exception as e:
+            print(f"⚠ {name} : {type(e).__name__} : {str(e)}")
+            failed.append(name)
+            continue
+        compiled += 1
+    size = sum(entry.stat().st_size for entry in os.scandir(TEMPLATE_BYTECODE_DIR) if entry.is_file())
+    print(f"✓ {compiled} template(s) compilé(s) dans {TEMPLATE_BYTECODE_DIR} ({size / 1024:.1f} Ko)")
+    if failed:
+        print(f"⚠ {len(failed)} template(s) en échec : {', '.join(failed)}")
+        sys.exit(1)
+
+
+def clean_templates(root):
+    if os.path.isdir(TEMPLATE_BYTECODE_DIR):
+        shutil.rmtree(TEMPLATE_BYTECODE_DIR)
+        print(f"✓ Bytecode des templates supprimé : {TEMPLATE_BYTECODE_DIR}")
+
+
+# Étape → (build, nettoyage). Bundles et images sont empreintés, puis tout est compressé
+STEPS = {
+    'bundle': (bundle, clean_bundle),
+    'images': (images, clean_images),
+    'fingerprint': (fingerprint, clean_fingerprint),
+    'compress': (compress, clean_compress),
+    'templates': (templates, clean_templates),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build des fichiers statiques (bundles, images, empreintes, variantes compressées) et des templates")
+    parser.add_argument('--steps', nargs='+', choices=list(STEPS), default=list(STEPS),
+                        help="Étapes à exécuter, dans l'ordre")
+    parser.add_argument('--force', action='store_true', help="Régénérer même les fichiers à jour")
+    parser.add_argument('--clean', action='store_true', help="Supprimer les fichiers générés et quitter")
+    args = parser.parse_args()
+
+    if not os.path.isdir(static_dir):
+        print(f"⚠ Dossier static introuvable : {static_dir}")
+        sys.exit(1)
+    if args.clean:
+        for step in reversed(args.steps):
+            STEPS[step][1](static_dir)
+        return
+    for step in args.steps:
+        print(f"→ Étape {step}")
+        STEPS[step][0](static_dir, force=args.force)
+
+
+if __name__ == '__main__':
+    main()
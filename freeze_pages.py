@@ -0,0 +1,175 @@
+"""
+Pré-rendu des pages publiques
+
+Rend chaque page de PUBLIC_PAGES (app.py : accueil, suivi, présentation, politiques...) en HTML
+statique dans public/ (ou FROZEN_PAGES_DIR), tel que le verrait un visiteur anonyme en
+production : bundles, images responsives et URL empreintées résolus, et les chemins relatifs
+"assets/..." hérités du miroir HTTrack réécrits en URL /static/... Les pages sont ensuite
+précompressées (gzip/brotli) comme les fichiers statiques.
+
+Le rendu est décrit dans public/.frozen.json (FROZEN_PAGES_MANIFEST_FILE) : empreinte des
+templates et des manifestes d'assets au moment du rendu, pages et fichiers écrits, copies
+empreintées citées. L'application ne sert une page pré-rendue aux visiteurs anonymes que si
+cette empreinte correspond toujours (sinon rendu Jinja), et build_static.py conserve les copies
+citées tant que les pages n'ont pas été rendues à nouveau.
+
+Seuls les fichiers listés dans ce manifeste sont supprimés (pages retirées, --clean) : le reste
+du dossier (miroir HTTrack de public/assets, autres fichiers) n'est jamais touché, et --clean
+refuse un dossier sans manifeste.
+
+À lancer après build_static.py, avant chaque déploiement.
+
+Usage :
+    python freeze_pages.py [--output public] [--pages index.html faqs.html] [--clean]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from urllib.parse import unquote
+
+from flask import render_template
+
+from app import (
+    app, asset_manifest, frozen_page_name, frozen_pages_stamp,
+    FROZEN_PAGES_MANIFEST_FILE, PUBLIC_PAGES, STATIC_COMPRESSED_MANIFEST_FILE, STATIC_ENCODINGS
+)
+from build_static import compress
+
+# Chemins relatifs vers les assets (attributs HTML et url() des styles en ligne)
+RELATIVE_ASSET = re.compile(
+    r'''(?P<prefix>\b(?:src|href|data-src|data-bg|data-background)=(?P<quote>["'])|url\((?P<url_quote>["']?))'''
+    r'''(?P<path>assets/[^"')?#\s]+)(?P<suffix>[?#][^"')\s]*)?'''
+)
+# URL /static/... présentes dans le HTML rendu
+STATIC_URL = re.compile(r'''/static/([^"'\s)?#,]+)''')
+
+
+def resolve_asset_urls(html):
+    """Réécrit assets/... en URL /static/... (empreintée si le manifeste existe)"""
+    def replace(match):
+        path = unquote(match.group('path'))
+        if not os.path.isfile(os.path.join(app.static_folder, path)):
+            return match.group(0)
+        url = app.url_for('static', filename=path)
+        return f"{match.group('prefix')}{url}{match.group('suffix') or ''}"
+    return RELATIVE_ASSET.sub(replace, html)
+
+
+def cited_assets(html):
+    """Copies empreintées citées par la page : build_static.py les garde jusqu'au prochain rendu"""
+    return {path for path in STATIC_URL.findall(html) if asset_manifest.is_fingerprinted(path)}
+
+
+def render_page(template):
+    title = PUBLIC_PAGES[template]
+    with app.test_request_context('/'):
+        html = render_template(template, **({'title': title} if title else {}))
+        return resolve_asset_urls(html)
+
+
+def write_page(output, name, html):
+    path = os.path.join(output, name)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(html)
+    os.replace(path + '.tmp', path)
+
+
+def load_frozen_manifest(output):
+    try:
+        with open(os.path.join(output, FROZEN_PAGES_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_frozen_manifest(output, manifest):
+    path = os.path.join(output, FROZEN_PAGES_MANIFEST_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def page_files(output, name):
+    """La page et ses variantes compressées présentes"""
+    candidates = [name] + [name + suffix for _, suffix in STATIC_ENCODINGS]
+    return [candidate for candidate in candidates if os.path.exists(os.path.join(output, candidate))]
+
+
+def remove_files(output, names):
+    removed = 0
+    for name in names:
+        path = os.path.join(output, name)
+        if os.path.isfile(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-rendu des pages publiques en HTML statique")
+    parser.add_argument('--output', default=None, help="Dossier de sortie (défaut : FROZEN_PAGES_DIR, soit public/)")
+    parser.add_argument('--pages', nargs='+', choices=list(PUBLIC_PAGES), default=None,
+                        help="Templates à rendre (défaut : toutes les pages publiques)")
+    parser.add_argument('--clean', action='store_true',
+                        help="Supprimer les fichiers du pré-rendu précédent (listés dans son manifeste) et quitter")
+    args = parser.parse_args()
+
+    output = args.output or app.config['FROZEN_PAGES_DIR']
+    previous = load_frozen_manifest(output)
+    if args.clean:
+        if previous is None:
+            print(f"⚠ Aucun manifeste {FROZEN_PAGES_MANIFEST_FILE} dans {output} : rien n'a été pré-rendu ici, "
+                  f"aucun fichier supprimé")
+            sys.exit(1)
+        removed = remove_files(output, previous.get('files', []) + [FROZEN_PAGES_MANIFEST_FILE])
+        print(f"✓ {removed} fichier(s) pré-rendu(s) supprimé(s) de {output}")
+        return
+    os.makedirs(output, exist_ok=True)
+
+    # Rendu « production » : bundles et URL empreintées, même si FLASK_DEBUG est défini
+    app.debug = False
+    stamp = frozen_pages_stamp()
+    pages, assets, failed = {}, set(), []
+    if previous and args.pages and previous.get('stamp') == stamp:
+        # Rendu partiel : les autres pages du rendu précédent restent valides (même empreinte)
+        pages = {name: template for name, template in previous.get('pages', {}).items() if template in PUBLIC_PAGES}
+        assets = set(previous.get('assets', []))
+    for template in args.pages or PUBLIC_PAGES:
+        name = frozen_page_name(template)
+        pages.pop(name, None)
+        try:
+            html = render_page(template)
+        except Exception as e:
+            print(f"⚠ {template} : {type(e).__name__} : {str(e)}")
+            failed.append(template)
+            continue
+        write_page(output, name, html)
+        pages[name] = template
+        assets |= cited_assets(html)
+        print(f"  {name:<48} {len(html.encode('utf-8')) / 1024:>8.1f} Ko")
+    print(f"✓ {len(pages)} page(s) pré-rendue(s) dans {output}")
+
+    compress(output, paths=[os.path.join(output, name) for name in sorted(pages)])
+    files = {STATIC_COMPRESSED_MANIFEST_FILE}
+    for name in pages:
+        files.update(page_files(output, name))
+    # Fichiers du rendu précédent qui ne sont plus produits (page retirée, en échec ou d'une autre empreinte)
+    stale = set(previous.get('files', [])) - files if previous else set()
+    removed = remove_files(output, stale)
+    if removed:
+        print(f"✓ {removed} fichier(s) obsolète(s) du rendu précédent supprimé(s)")
+    write_frozen_manifest(output, {
+        'stamp': stamp,
+        'pages': pages,
+        'files': sorted(files),
+        'assets': sorted(assets),
+    })
+    if failed:
+        print(f"⚠ {len(failed)} page(s) en échec : {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
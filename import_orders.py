@@ -0,0 +1,45 @@
+"""
+Script d'import en masse de commandes depuis un fichier CSV ou JSONL (manifestes d'entrepôt)
+
+Usage :
+    python import_orders.py manifeste.csv [--format csv|jsonl] [--batch-size 500]
+
+Les colonnes attendues sont celles du formulaire add_order (sender_name, sender_phone, ...,
+destination_country) plus, optionnellement, pickup_date, pickup_time, delivery_date,
+delivery_time et current_location. Les numéros de suivi sont attribués automatiquement.
+"""
+import argparse
+import json
+import time
+
+from app import app, db, import_orders, detect_import_format
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import en masse de commandes (CSV/JSONL)")
+    parser.add_argument('path', help="Fichier à importer")
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'ndjson'], default=None,
+                        help="Format du fichier (défaut : déduit de l'extension)")
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help="Nombre de lignes par transaction (défaut : IMPORT_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    fmt = detect_import_format(args.path, args.format)
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        with open(args.path, 'r', encoding='utf-8-sig', newline='') as stream:
+            report = import_orders(stream, fmt, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+
+    print(f"OK - {report['imported']} commande(s) importee(s), {report['failed']} ligne(s) en erreur "
+          f"({report['batches']} lot(s), {elapsed:.1f} s)")
+    for error in report['errors']:
+        print(f"   - ligne {error['line']} : {error['error']}")
+    if report['errors_truncated']:
+        print("   ... (liste des erreurs tronquee)")
+    return report
+
+
+if __name__ == '__main__':
+    main()
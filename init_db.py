@@ -1,7 +1,8 @@
 """
 Script pour initialiser la base de données avec des données de test
 """
-from app import app, db, Order
+from datetime import date, time
+from app import app, db, Order, ensure_indexes
 
 def init_database():
     """Initialise la base de données et ajoute des données de test"""
@@ -14,6 +15,7 @@ def init_database():
         # Créer toutes les tables
         print("Creation des tables...")
         db.create_all()
+        ensure_indexes()
         
         # Ajouter des commandes de test
         print("Ajout des commandes de test...")
@@ -34,10 +36,10 @@ def init_database():
                 origin_country="France",
                 destination_city="Lyon",
                 destination_country="France",
-                pickup_date="2025-09-12",
-                pickup_time="10:30",
-                delivery_date="2025-09-15",
-                delivery_time="14:00",
+                pickup_date=date(2025, 9, 12),
+                pickup_time=time(10, 30),
+                delivery_date=date(2025, 9, 15),
+                delivery_time=time(14, 0),
                 current_location="En transit - Lyon"
             ),
             Order(
@@ -55,10 +57,10 @@ def init_database():
                 origin_country="France",
                 destination_city="Lyon",
                 destination_country="France",
-                pickup_date="2025-10-01",
-                pickup_time="09:00",
-                delivery_date="2025-10-03",
-                delivery_time="16:30",
+                pickup_date=date(2025, 10, 1),
+                pickup_time=time(9, 0),
+                delivery_date=date(2025, 10, 3),
+                delivery_time=time(16, 30),
                 current_location="Livré"
             ),
             Order(
@@ -76,10 +78,10 @@ def init_database():
                 origin_country="USA",
                 destination_city="Los Angeles",
                 destination_country="USA",
-                pickup_date="2025-09-12",
-                pickup_time="10:30",
-                delivery_date="2025-09-15",
-                delivery_time="14:00",
+                pickup_date=date(2025, 9, 12),
+                pickup_time=time(10, 30),
+                delivery_date=date(2025, 9, 15),
+                delivery_time=time(14, 0),
                 current_location="En transit - Chicago"
             )
         ]
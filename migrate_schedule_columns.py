@@ -0,0 +1,131 @@
+"""
+Script de migration des colonnes de planification vers des types DATE / TIME
+
+Les anciennes bases stockent pickup_date, pickup_time, delivery_date et delivery_time
+sous forme de texte libre. Ce script :
+  1. renomme chaque colonne texte en <colonne>_legacy et crée la colonne typée ;
+  2. convertit les valeurs par lots (parcours par id, une transaction par lot) ;
+  3. crée les index de planification ;
+  4. supprime les colonnes _legacy si --drop-legacy est passé.
+Il peut être relancé sans risque : les étapes déjà faites sont ignorées et la conversion
+repart de --start-id.
+
+Usage :
+    python migrate_schedule_columns.py [--batch-size 1000] [--start-id 0] [--drop-legacy]
+"""
+import argparse
+import time
+
+from sqlalchemy import inspect, text, update, bindparam
+
+from app import app, db, Order, SCHEDULE_FIELDS, parse_schedule_date, parse_schedule_time, ensure_indexes
+
+LEGACY_SUFFIX = '_legacy'
+
+
+def is_text_type(column_type):
+    name = str(column_type).upper()
+    return any(kind in name for kind in ('CHAR', 'TEXT', 'STRING'))
+
+
+def prepare_columns():
+    """Renomme les colonnes texte en _legacy et crée les colonnes typées. Retourne les colonnes à convertir"""
+    columns = {column['name']: column for column in inspect(db.engine).get_columns('orders')}
+    legacy = []
+    with db.engine.begin() as conn:
+        for field in SCHEDULE_FIELDS:
+            legacy_name = field + LEGACY_SUFFIX
+            if legacy_name in columns:
+                legacy.append(field)
+                continue
+            if field in columns and is_text_type(columns[field]['type']):
+                typed = Order.__table__.c[field].type.compile(dialect=db.engine.dialect)
+                print(f"- {field} : {columns[field]['type']} -> {typed}")
+                conn.execute(text(f"ALTER TABLE orders RENAME COLUMN {field} TO {legacy_name}"))
+                conn.execute(text(f"ALTER TABLE orders ADD COLUMN {field} {typed}"))
+                legacy.append(field)
+    return legacy
+
+
+def convert(fields, batch_size, start_id):
+    """Convertit les valeurs _legacy vers les colonnes typées, lot par lot"""
+    table = Order.__table__
+    legacy_columns = ', '.join(field + LEGACY_SUFFIX for field in fields)
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam('_id'))
+        .values({field: bindparam(field) for field in fields})
+    )
+    last_id = start_id
+    converted = 0
+    unreadable = 0
+    started = time.perf_counter()
+
+    while True:
+        rows = db.session.execute(
+            text(f"SELECT id, {legacy_columns} FROM orders WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {'last_id': last_id, 'limit': batch_size}
+        ).fetchall()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            values = {'_id': row[0]}
+            for index, field in enumerate(fields, start=1):
+                raw = row[index]
+                if SCHEDULE_FIELDS[field] == 'date':
+                    parsed = parse_schedule_date(raw)
+                else:
+                    parsed = parse_schedule_time(raw)
+                if raw not in (None, '') and parsed is None:
+                    unreadable += 1
+                values[field] = parsed
+            params.append(values)
+
+        db.session.execute(statement, params)
+        db.session.commit()
+        converted += len(rows)
+        last_id = rows[-1][0]
+        elapsed = time.perf_counter() - started
+        print(f"  {converted} commande(s) convertie(s) (dernier id {last_id}, {converted / elapsed:.0f} lignes/s)")
+
+    return converted, unreadable
+
+
+def drop_legacy(fields):
+    with db.engine.begin() as conn:
+        for field in fields:
+            conn.execute(text(f"ALTER TABLE orders DROP COLUMN {field}{LEGACY_SUFFIX}"))
+            print(f"- colonne {field}{LEGACY_SUFFIX} supprimee")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migration des colonnes de planification vers DATE/TIME")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Lignes converties par transaction")
+    parser.add_argument('--start-id', type=int, default=0, help="Reprendre après cet id")
+    parser.add_argument('--drop-legacy', action='store_true', help="Supprimer les colonnes _legacy à la fin")
+    args = parser.parse_args()
+
+    with app.app_context():
+        # Créer les tables manquantes (la table orders existante n'est pas modifiée par create_all)
+        db.create_all()
+        print("Preparation des colonnes...")
+        fields = prepare_columns()
+        if not fields:
+            print("Colonnes deja typees, rien a convertir.")
+        else:
+            print(f"Conversion de {', '.join(fields)} par lots de {args.batch_size}...")
+            converted, unreadable = convert(fields, args.batch_size, args.start_id)
+            print(f"OK - {converted} commande(s) convertie(s), {unreadable} valeur(s) illisible(s) mise(s) a NULL")
+
+        print("Creation des index...")
+        ensure_indexes()
+
+        if args.drop_legacy and fields:
+            drop_legacy(fields)
+        print("Migration terminee.")
+
+
+if __name__ == '__main__':
+    main()
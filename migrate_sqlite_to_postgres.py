@@ -1,64 +1,281 @@
+"""
+Script de migration SQLite → PostgreSQL (base configurée dans DATABASE_URL)
+
+La source est lue par lots dans l'ordre des id, les clés déjà présentes dans la cible
+(e-mails, numéros de suivi) sont vérifiées en une requête par lot, et chaque lot est
+inséré puis validé dans sa propre transaction. Un fichier de reprise enregistre le
+dernier id migré : une exécution interrompue reprend là où elle s'était arrêtée.
+Un lot en échec est rejoué ligne par ligne pour isoler les lignes fautives.
+
+Une ligne dont l'id source est déjà pris dans la cible reçoit un nouvel id, toujours supérieur à
+tous les id source et cible (séquence PostgreSQL avancée avant la première insertion) : il ne
+peut pas entrer en collision avec l'id explicite d'une ligne source d'un lot suivant.
+
+Usage :
+    python migrate_sqlite_to_postgres.py [--source orders.db] [--batch-size 1000]
+                                         [--checkpoint migrate_checkpoint.json] [--reset]
+"""
+import argparse
+import itertools
+import json
+import os
 import sqlite3
-from app import app, db, User, Order
-from sqlalchemy.exc import IntegrityError
-from werkzeug.security import generate_password_hash
+import time
 from datetime import datetime
 
+from sqlalchemy import func, insert, select, text
+from werkzeug.security import generate_password_hash
+
+from app import (app, db, User, Order, SCHEDULE_FIELDS, parse_schedule_date, parse_schedule_time,
+                 apply_stats_deltas, count_order_stats)
+
 SQLITE_FILE = 'orders.db'
+CHECKPOINT_FILE = 'migrate_checkpoint.json'
 
-def migrate():
-    with app.app_context():
-        conn = sqlite3.connect(SQLITE_FILE)
-        c = conn.cursor()
-        # ----- USERS -----
-        print('\n--- Migration des admins/Users ---')
+ORDER_COLUMNS = set(Order.__table__.c.keys())
+USER_COLUMNS = set(User.__table__.c.keys())
+
+
+def load_checkpoint(path, source, reset):
+    if not reset and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('source') == os.path.abspath(source):
+            print(f"Reprise depuis {path} : users > {checkpoint['users_last_id']}, "
+                  f"orders > {checkpoint['orders_last_id']}")
+            return checkpoint
+    return {
+        'source': os.path.abspath(source),
+        'users_last_id': 0,
+        'orders_last_id': 0,
+        'imported': {'users': 0, 'orders': 0},
+        'skipped': {'users': 0, 'orders': 0},
+        'failed': {'users': 0, 'orders': 0},
+        'renumbered': {'users': 0, 'orders': 0},
+    }
+
+
+def save_checkpoint(path, checkpoint):
+    # Écriture atomique : le fichier de reprise n'est jamais à moitié écrit
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def parse_datetime(value):
+    if value in (None, ''):
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def iter_batches(conn, table, batch_size, last_id):
+    """Lit la table source par lots (keyset sur id) : la mémoire reste constante"""
+    while True:
         try:
-            users = c.execute('SELECT id, email, password_hash, is_admin, created_at, last_login FROM users').fetchall()
-        except Exception as e:
-            print('Table users non trouvée ou vide:', e)
-            users = []
-        imported_users = 0
-        for (id, email, password_hash, is_admin, created_at, last_login) in users:
-            if User.query.filter_by(email=email).first():
-                print(f'- [User] {email} existe déjà, skip.')
-                continue
-            user = User(
-                email=email,
-                password_hash=password_hash or generate_password_hash('changeme123'),
-                is_admin=bool(is_admin),
-                created_at=datetime.fromisoformat(created_at) if created_at else None,
-                last_login=datetime.fromisoformat(last_login) if last_login else None
+            cursor = conn.execute(
+                f"SELECT * FROM {table} WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
             )
-            db.session.add(user)
-            imported_users += 1
-        # ----- ORDERS -----
-        print('\n--- Migration des commandes (Order) ---')
+        except sqlite3.OperationalError as e:
+            print(f"Table {table} non trouvée : {e}")
+            return
+        columns = [desc[0] for desc in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1]['id']
+
+
+def prepare_user(row):
+    values = {key: value for key, value in row.items() if key in USER_COLUMNS}
+    values['password_hash'] = values.get('password_hash') or generate_password_hash('changeme123')
+    values['is_admin'] = bool(values.get('is_admin'))
+    for field in ('created_at', 'last_login'):
+        values[field] = parse_datetime(values.get(field))
+    return values
+
+
+def prepare_order(row):
+    values = {key: value for key, value in row.items() if key in ORDER_COLUMNS}
+    for field in ('created_at', 'updated_at'):
+        values[field] = parse_datetime(values.get(field)) or datetime.utcnow()
+    for field, kind in SCHEDULE_FIELDS.items():
+        parser = parse_schedule_date if kind == 'date' else parse_schedule_time
+        values[field] = parser(values.get(field))
+    return values
+
+
+def existing_values(column, values):
+    """Valeurs déjà présentes dans la cible, en une requête pour tout le lot"""
+    if not values:
+        return set()
+    return set(db.session.execute(select(column).where(column.in_(values))).scalars())
+
+
+def reserve_ids(conn, table, model):
+    """
+    Prépare la renumérotation des lignes dont l'id source est déjà pris dans la cible : les id
+    attribués doivent dépasser tous les id source et cible, sinon l'un d'eux pourrait prendre
+    l'id explicite d'une ligne source d'un lot suivant (ou du même lot), rejetée ensuite comme
+    doublon. PostgreSQL : la séquence est avancée avant la première insertion et attribue les id
+    (retourne None) ; autres bases : retourne un générateur d'id à imposer.
+    """
+    try:
+        source_max = conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        source_max = 0
+    target_max = db.session.execute(select(func.max(model.id))).scalar() or 0
+    start = max(source_max, target_max)
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), :value, :is_called)"),
+            {'value': max(start, 1), 'is_called': start > 0}
+        )
+        db.session.commit()
+        return None
+    counter = itertools.count(start + 1)
+    return lambda: next(counter)
+
+
+def renumber(value, next_id):
+    """Retire l'id source déjà pris : id imposé par next_id, ou attribué par la séquence"""
+    if next_id is None:
+        value.pop('id')
+    else:
+        value['id'] = next_id()
+
+
+def insert_batch(model, rows, label):
+    """Insère un lot dans une transaction ; en cas d'échec, rejoue ligne par ligne"""
+    def execute(batch):
+        db.session.execute(insert(model), batch)
+        if model is Order:
+            apply_stats_deltas(count_order_stats(batch), db.session.connection())
+        db.session.commit()
+
+    try:
+        execute(rows)
+        return len(rows), 0
+    except Exception as e:
+        db.session.rollback()
+        print(f"  Lot en échec ({str(e).splitlines()[0]}), reprise ligne par ligne...")
+
+    imported = failed = 0
+    for row in rows:
         try:
-            orders = c.execute('SELECT * FROM orders').fetchall()
-            cols = [desc[0] for desc in c.description]
+            execute([row])
+            imported += 1
         except Exception as e:
-            print('Table orders non trouvée ou vide:', e)
-            orders = []
-        imported_orders = 0
-        for row in orders:
-            order_data = dict(zip(cols, row))
-            if Order.query.filter_by(tracking_number=order_data['tracking_number']).first():
-                print(f'- [Order] {order_data["tracking_number"]} déjà existante, skip.')
+            db.session.rollback()
+            failed += 1
+            print(f"  - [{label}] id {row.get('id')} rejeté : {str(e).splitlines()[0]}")
+    return imported, failed
+
+
+def migrate_users(conn, checkpoint, args):
+    print('\n--- Migration des admins/Users ---')
+    next_id = reserve_ids(conn, 'users', User)
+    for rows in iter_batches(conn, 'users', args.batch_size, checkpoint['users_last_id']):
+        values = [prepare_user(row) for row in rows]
+        known = existing_values(User.email, [value['email'] for value in values])
+        known_ids = existing_values(User.id, [value['id'] for value in values])
+        batch = []
+        for value in values:
+            if value['email'] in known:
+                print(f"- [User] {value['email']} existe déjà, skip.")
+                checkpoint['skipped']['users'] += 1
+                continue
+            if value['id'] in known_ids:
+                renumber(value, next_id)
+                checkpoint['renumbered']['users'] += 1
+            batch.append(value)
+        if batch:
+            imported, failed = insert_batch(User, batch, 'User')
+            checkpoint['imported']['users'] += imported
+            checkpoint['failed']['users'] += failed
+        checkpoint['users_last_id'] = rows[-1]['id']
+        save_checkpoint(args.checkpoint, checkpoint)
+
+
+def migrate_orders(conn, checkpoint, args):
+    print('\n--- Migration des commandes (Order) ---')
+    next_id = reserve_ids(conn, 'orders', Order)
+    started = time.perf_counter()
+    processed = 0
+    for rows in iter_batches(conn, 'orders', args.batch_size, checkpoint['orders_last_id']):
+        values = [prepare_order(row) for row in rows]
+        known = existing_values(Order.tracking_number, [value['tracking_number'] for value in values])
+        known_ids = existing_values(Order.id, [value['id'] for value in values])
+        batch = []
+        for value in values:
+            if value['tracking_number'] in known:
+                checkpoint['skipped']['orders'] += 1
                 continue
-            order = Order(**order_data)
-            db.session.add(order)
-            imported_orders += 1
+            if value['id'] in known_ids:
+                # Conserver l'id source quand il est libre, sinon un id au-delà de tous les id source
+                renumber(value, next_id)
+                checkpoint['renumbered']['orders'] += 1
+            batch.append(value)
+        if batch:
+            imported, failed = insert_batch(Order, batch, 'Order')
+            checkpoint['imported']['orders'] += imported
+            checkpoint['failed']['orders'] += failed
+        checkpoint['orders_last_id'] = rows[-1]['id']
+        save_checkpoint(args.checkpoint, checkpoint)
+
+        processed += len(rows)
+        elapsed = time.perf_counter() - started
+        print(f"  {processed} ligne(s) traitée(s) (id {checkpoint['orders_last_id']}), "
+              f"{processed / elapsed:.0f} lignes/s")
+
+
+def reset_sequences():
+    """Réaligne les séquences PostgreSQL après l'insertion d'id explicites"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    with db.engine.begin() as conn:
+        for table in ('users', 'orders'):
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+            ))
+
+
+def migrate(args):
+    with app.app_context():
+        db.create_all()
+        checkpoint = load_checkpoint(args.checkpoint, args.source, args.reset)
+        checkpoint.setdefault('renumbered', {'users': 0, 'orders': 0})
+        conn = sqlite3.connect(args.source)
         try:
-            db.session.commit()
-            print(f"Migration terminée : {imported_users} user(s), {imported_orders} commande(s).")
-        except IntegrityError as e:
-            db.session.rollback()
-            print('Erreur d\'unicité, rollback!', e)
-        except Exception as e:
-            db.session.rollback()
-            print('Erreur inconnue lors de la migration!', e)
-        conn.close()
+            migrate_users(conn, checkpoint, args)
+            migrate_orders(conn, checkpoint, args)
+        finally:
+            conn.close()
+        reset_sequences()
+
+        print(f"Migration terminée : {checkpoint['imported']['users']} user(s), "
+              f"{checkpoint['imported']['orders']} commande(s) importée(s) ; "
+              f"{checkpoint['skipped']['orders']} commande(s) déjà présente(s), "
+              f"{checkpoint['failed']['orders']} rejetée(s), "
+              f"{checkpoint['renumbered']['orders']} renumérotée(s) (id source déjà pris).")
         print('Fin, vous pouvez tester l\'application sur PostgreSQL !')
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Migration SQLite → PostgreSQL par lots, avec reprise")
+    parser.add_argument('--source', default=SQLITE_FILE, help="Base SQLite source")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Lignes par lot/transaction")
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE, help="Fichier de reprise")
+    parser.add_argument('--reset', action='store_true', help="Ignorer le fichier de reprise existant")
+    migrate(parser.parse_args())
+
+
 if __name__ == '__main__':
-    migrate()
+    main()
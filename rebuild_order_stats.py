@@ -0,0 +1,25 @@
+"""
+Script de reconstruction des agrégats du tableau de bord (table order_stats)
+
+Les agrégats sont maintenus incrémentalement à chaque écriture ; ce script les recalcule
+entièrement depuis les tables orders et tracking_events, en cas de dérive ou après un
+chargement de données qui ne passe pas par l'application.
+
+Usage :
+    python rebuild_order_stats.py
+"""
+import time
+
+from app import app, db, rebuild_order_stats
+
+
+def main():
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        groups = rebuild_order_stats()
+        print(f"OK - {groups} groupe(s) recalcule(s) en {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
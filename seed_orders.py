@@ -0,0 +1,232 @@
+"""
+Génère un jeu de commandes synthétiques à grande échelle (tests de charge et de volumétrie)
+
+Les pays, villes, lignes, statuts, dates et longueurs de texte suivent des distributions
+réalistes (quelques lignes très chargées, longue traîne, pic en semaine, colis livrés
+majoritaires sur les commandes anciennes). Les commandes sont insérées par lots avec
+leurs événements de suivi ; les agrégats du tableau de bord et l'index de recherche
+restent cohérents. Les tables existantes ne sont supprimées qu'avec --drop.
+
+Usage :
+    python seed_orders.py --count 100000 [--seed 42] [--batch-size 5000] [--days 365] [--drop]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import (app, db, Order, TrackingEvent, ensure_indexes, tracking_allocator,
+                 apply_stats_deltas, count_order_stats)
+
+# (pays, poids, villes par ordre de taille, indicatif, domaine e-mail local)
+COUNTRIES = [
+    ('France', 38, ['Paris', 'Lyon', 'Marseille', 'Toulouse', 'Lille', 'Bordeaux', 'Nantes', 'Strasbourg'], '+33'),
+    ('USA', 20, ['New York', 'Los Angeles', 'Chicago', 'Houston', 'Miami', 'Seattle', 'Albuquerque'], '+1'),
+    ('Allemagne', 10, ['Berlin', 'Hambourg', 'Munich', 'Cologne', 'Francfort'], '+49'),
+    ('Belgique', 7, ['Bruxelles', 'Anvers', 'Liège', 'Gand'], '+32'),
+    ('Espagne', 6, ['Madrid', 'Barcelone', 'Valence', 'Séville'], '+34'),
+    ('Royaume-Uni', 5, ['Londres', 'Manchester', 'Birmingham'], '+44'),
+    ('Italie', 4, ['Rome', 'Milan', 'Naples', 'Turin'], '+39'),
+    ('Canada', 3, ['Montréal', 'Toronto', 'Vancouver'], '+1'),
+    ('Suisse', 3, ['Genève', 'Zurich', 'Lausanne'], '+41'),
+    ('Maroc', 2, ['Casablanca', 'Rabat', 'Marrakech'], '+212'),
+    ('Sénégal', 1, ['Dakar', 'Saint-Louis'], '+221'),
+    ('Japon', 1, ['Tokyo', 'Osaka'], '+81'),
+]
+
+FIRST_NAMES = ['Alice', 'Bob', 'Charlie', 'David', 'Emma', 'Louis', 'Léa', 'Hugo', 'Chloé', 'Lucas',
+               'Manon', 'Jules', 'Camille', 'Nathan', 'Sarah', 'Ethan', 'Inès', 'Gabriel', 'Jade', 'Mohamed',
+               'Fatou', 'Yuki', 'John', 'Mary', 'Hans', 'Sofia', 'Giulia', 'Pablo', 'Olivia', 'Noah']
+LAST_NAMES = ['Martin', 'Bernard', 'Dupont', 'Petit', 'Durand', 'Leroy', 'Moreau', 'Simon', 'Laurent',
+              'Lefebvre', 'Michel', 'Garcia', 'Smith', 'Johnson', 'Müller', 'Schmidt', 'Rossi', 'Diallo',
+              'Ndiaye', 'Tanaka', 'Harper', 'Cooper', 'Fernández', 'Benali', 'Van den Berg']
+STREETS = ['Rue de la Paix', 'Avenue des Champs', 'Boulevard Saint-Germain', 'Rue de la République',
+           'Main Street', 'Menaul Blvd NE', 'Hauptstraße', 'Calle Mayor', 'Via Roma', 'Chemin des Vignes',
+           'Impasse du Moulin', 'Route Nationale']
+EMAIL_DOMAINS = ['gmail.com', 'outlook.com', 'yahoo.fr', 'orange.fr', 'example.com', 'proton.me']
+SHIPMENTS = ['Ordinateur Portable', 'Smartphone', 'Documents', 'Vêtements', 'Electronic bike', 'Livres',
+             'Pièces détachées', 'Colis alimentaire', 'Meuble en kit', 'Équipement médical', 'Cosmétiques',
+             'Tablette', 'Chaussures', 'Jouets', 'Matériel photo']
+
+# Étapes de suivi, dans l'ordre ; le statut courant est la dernière étape atteinte
+STAGES = ['Commande enregistrée', 'Pris en charge', 'En transit', 'En cours de livraison', 'Livré']
+# Poids des volumes par jour de semaine (lundi → dimanche)
+WEEKDAY_WEIGHTS = [1.25, 1.2, 1.15, 1.1, 1.05, 0.6, 0.35]
+
+
+class OrderFactory:
+    """Fabrique de commandes synthétiques déterministe pour une graine donnée"""
+
+    def __init__(self, seed, days, now=None):
+        self.rng = random.Random(seed)
+        self.days = days
+        # Référence à minuit : deux exécutions le même jour avec la même graine sont identiques
+        self.now = now or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.countries = [country for country, *_ in COUNTRIES]
+        self.country_weights = [weight for _, weight, *_ in COUNTRIES]
+        self.cities = {country: cities for country, _, cities, _ in COUNTRIES}
+        self.prefixes = {country: prefix for country, _, _, prefix in COUNTRIES}
+
+    def city(self, country):
+        # Loi de Zipf : la première ville concentre la majorité des envois
+        cities = self.cities[country]
+        return self.rng.choices(cities, weights=[1 / (rank + 1) for rank in range(len(cities))])[0]
+
+    def person(self):
+        first = self.rng.choice(FIRST_NAMES)
+        last = self.rng.choice(LAST_NAMES)
+        if self.rng.random() < 0.15:
+            last = f"{last}-{self.rng.choice(LAST_NAMES)}"
+        return first, last
+
+    def phone(self, country):
+        digits = ''.join(self.rng.choice('0123456789') for _ in range(self.rng.randint(8, 10)))
+        return f"{self.prefixes[country]} {digits}"
+
+    def email(self, first, last):
+        local = f"{first}.{last}".lower().replace(' ', '').replace('-', '')
+        if self.rng.random() < 0.4:
+            local += str(self.rng.randint(1, 9999))
+        return f"{local}@{self.rng.choice(EMAIL_DOMAINS)}"
+
+    def address(self, city):
+        address = f"{self.rng.randint(1, 250)} {self.rng.choice(STREETS)}, {self.rng.randint(10000, 99999)} {city}"
+        if self.rng.random() < 0.2:
+            address += f", Bâtiment {self.rng.choice('ABCDEF')}, étage {self.rng.randint(1, 12)}"
+        return address
+
+    def created_at(self):
+        # Volume croissant dans le temps (plus de commandes récentes) et creux le week-end
+        while True:
+            age = self.days * (1 - self.rng.random() ** 0.7)
+            moment = self.now - timedelta(days=age)
+            if self.rng.random() * max(WEEKDAY_WEIGHTS) <= WEEKDAY_WEIGHTS[moment.weekday()]:
+                return moment.replace(microsecond=0)
+
+    def stage(self, created_at, transit_days):
+        """Étape atteinte : les commandes anciennes sont presque toutes livrées"""
+        progress = (self.now - created_at).total_seconds() / 86400 / (transit_days + 1)
+        if progress >= 1:
+            return len(STAGES) - 1 if self.rng.random() < 0.97 else self.rng.randrange(1, len(STAGES) - 1)
+        return min(len(STAGES) - 1, int(progress * len(STAGES) + self.rng.random()))
+
+    def order(self):
+        origin = self.rng.choices(self.countries, weights=self.country_weights)[0]
+        # 70 % des envois restent dans le pays d'origine
+        if self.rng.random() < 0.7:
+            destination = origin
+        else:
+            destination = self.rng.choices(self.countries, weights=self.country_weights)[0]
+        origin_city = self.city(origin)
+        destination_city = self.city(destination)
+        sender = self.person()
+        receiver = self.person()
+        created_at = self.created_at()
+        transit_days = self.rng.randint(1, 3) if origin == destination else self.rng.randint(3, 12)
+        pickup_at = created_at + timedelta(days=self.rng.choice([0, 0, 1, 1, 2]))
+        pickup_at = pickup_at.replace(hour=self.rng.randint(8, 17), minute=self.rng.choice([0, 15, 30, 45]), second=0)
+        delivery_at = pickup_at + timedelta(days=transit_days)
+        delivery_at = delivery_at.replace(hour=self.rng.randint(9, 19), minute=self.rng.choice([0, 30]))
+        stage = self.stage(created_at, transit_days)
+
+        values = {
+            'sender_name': ' '.join(sender),
+            'sender_phone': self.phone(origin),
+            'sender_email': self.email(*sender),
+            'sender_address': self.address(origin_city),
+            'receiver_name': ' '.join(receiver),
+            'receiver_phone': self.phone(destination),
+            'receiver_email': self.email(*receiver),
+            'receiver_address': self.address(destination_city),
+            'shipment_name': self.rng.choice(SHIPMENTS),
+            'origin_city': origin_city,
+            'origin_country': origin,
+            'destination_city': destination_city,
+            'destination_country': destination,
+            'current_location': STAGES[stage],
+            'pickup_date': pickup_at.date(),
+            'pickup_time': pickup_at.time(),
+            'delivery_date': delivery_at.date(),
+            'delivery_time': delivery_at.time(),
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+        events = self.events(stage, created_at, pickup_at, delivery_at, origin_city, destination_city)
+        return values, events
+
+    def events(self, stage, created_at, pickup_at, delivery_at, origin_city, destination_city):
+        moments = [created_at, max(created_at, pickup_at)]
+        transit = delivery_at - pickup_at
+        moments.append(pickup_at + transit * 0.3)
+        moments.append(delivery_at - timedelta(hours=self.rng.randint(2, 6)))
+        moments.append(delivery_at)
+        # Étapes strictement ordonnées dans le temps et jamais dans le futur :
+        # le dernier événement est toujours l'étape atteinte
+        for index in range(1, len(moments)):
+            moments[index] = max(moments[index], moments[index - 1] + timedelta(minutes=1))
+        moments[stage] = min(moments[stage], self.now)
+        for index in range(stage - 1, -1, -1):
+            moments[index] = min(moments[index], moments[index + 1] - timedelta(minutes=1))
+        locations = [origin_city, origin_city, None, destination_city, destination_city]
+        return [
+            {'status': STAGES[index], 'location': locations[index], 'occurred_at': moments[index]}
+            for index in range(stage + 1)
+        ]
+
+
+def insert_batch(factory, size):
+    """Insère un lot de commandes et leurs événements dans une transaction"""
+    generated = [factory.order() for _ in range(size)]
+    tracking_numbers = tracking_allocator.allocate(size)
+    rows = [dict(values, tracking_number=tn) for (values, _), tn in zip(generated, tracking_numbers)]
+
+    order_ids = db.session.scalars(insert(Order).returning(Order.id, sort_by_parameter_order=True), rows).all()
+    events = [
+        dict(event, order_id=order_id, created_at=event['occurred_at'])
+        for order_id, (_, order_events) in zip(order_ids, generated)
+        for event in order_events
+    ]
+    if events:
+        db.session.execute(insert(TrackingEvent), events)
+    apply_stats_deltas(count_order_stats(rows), db.session.connection())
+    db.session.commit()
+    return len(events)
+
+
+def seed(count, seed_value, batch_size, days, drop):
+    with app.app_context():
+        if drop:
+            print("Suppression des tables existantes...")
+            db.drop_all()
+        db.create_all()
+        ensure_indexes()
+
+        factory = OrderFactory(seed_value, days)
+        print(f"Generation de {count} commande(s) (graine {seed_value}, lots de {batch_size})...")
+        started = time.perf_counter()
+        inserted = events = 0
+        while inserted < count:
+            size = min(batch_size, count - inserted)
+            events += insert_batch(factory, size)
+            inserted += size
+            elapsed = time.perf_counter() - started
+            print(f"  {inserted}/{count} commande(s), {events} événement(s) ({inserted / elapsed:.0f} lignes/s)")
+
+        print(f"OK - {inserted} commande(s) et {events} événement(s) en {time.perf_counter() - started:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génération de commandes synthétiques pour les tests de charge")
+    parser.add_argument('--count', type=int, default=100000, help="Nombre de commandes à générer")
+    parser.add_argument('--seed', type=int, default=42, help="Graine aléatoire (reproductibilité)")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Commandes insérées par transaction")
+    parser.add_argument('--days', type=int, default=365, help="Période couverte par les dates de création")
+    parser.add_argument('--drop', action='store_true', help="Supprimer les tables existantes avant la génération")
+    args = parser.parse_args()
+    seed(args.count, args.seed, args.batch_size, args.days, args.drop)
+
+
+if __name__ == '__main__':
+    main()
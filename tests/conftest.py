@@ -0,0 +1,89 @@
+"""
+Configuration commune des tests : base SQLite temporaire (DATABASE_URL défini avant l'import
+de app.py), tables recréées et caches vidés avant chaque test.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+_tmp_dir = tempfile.mkdtemp(prefix='meridian-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp_dir, 'test.db')
+os.environ['FROZEN_PAGES_DIR'] = os.path.join(_tmp_dir, 'public')
+os.environ['JINJA_BYTECODE_CACHE_DIR'] = 'off'
+os.environ['STARTUP_DIAGNOSTICS'] = '0'
+os.environ.pop('METRICS_DIR', None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import app as app_module
+
+ADMIN_EMAIL = 'admin@test.local'
+ADMIN_PASSWORD = 'secret'
+
+
+@pytest.fixture
+def app():
+    flask_app = app_module.app
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        app_module.db.drop_all()
+        app_module.db.create_all()
+        admin = app_module.User(email=ADMIN_EMAIL)
+        admin.set_password(ADMIN_PASSWORD)
+        app_module.db.session.add(admin)
+        app_module.db.session.commit()
+        app_module.db.session.remove()
+    app_module.tracking_cache.clear()
+    app_module.user_cache.clear()
+    app_module.response_cache.purge()
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(app):
+    admin = app.test_client()
+    # Suivre la redirection : le message flash de connexion est consommé comme dans un navigateur
+    response = admin.post('/login', data={'email': ADMIN_EMAIL, 'password': ADMIN_PASSWORD}, follow_redirects=True)
+    assert response.status_code == 200
+    with admin.session_transaction() as session:
+        assert '_user_id' in session and '_flashes' not in session
+    return admin
+
+
+@pytest.fixture
+def admin_id(app):
+    with app.app_context():
+        return app_module.User.query.filter_by(email=ADMIN_EMAIL).one().id
+
+
+@pytest.fixture
+def make_order(app):
+    """Crée une commande en base et retourne (id, numéro de suivi)"""
+    counter = iter(range(1, 10000))
+
+    def make(**values):
+        number = next(counter)
+        fields = dict(
+            sender_name=f'Expéditeur {number}', sender_phone='0100000000', sender_email='sender@test.local',
+            sender_address='1 rue A', receiver_name=f'Destinataire {number}', receiver_phone='0200000000',
+            receiver_email='receiver@test.local', receiver_address='2 rue B', shipment_name=f'Colis {number}',
+            tracking_number=f'{number:05d}TT', origin_city='Paris', origin_country='France',
+            destination_city='Lyon', destination_country='France', current_location='En préparation',
+            created_at=datetime(2025, 1, 1, 12, 0),
+        )
+        fields.update(values)
+        with app.app_context():
+            order = app_module.Order(**fields)
+            app_module.db.session.add(order)
+            app_module.db.session.commit()
+            return order.id, order.tracking_number
+
+    return make
+
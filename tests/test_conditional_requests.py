@@ -0,0 +1,76 @@
+"""Page de détail d'une commande : ETag / Last-Modified et réponses 304"""
+from app import Order, db, tracking_cache
+
+
+def test_revalidation_returns_304(app, client, make_order):
+    order_id, _ = make_order()
+    first = client.get(f'/order/{order_id}')
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'no-cache'
+    etag = first.headers['ETag']
+
+    again = client.get(f'/order/{order_id}', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == etag
+
+
+def test_if_modified_since_returns_304(app, client, make_order):
+    order_id, _ = make_order()
+    last_modified = client.get(f'/order/{order_id}').headers['Last-Modified']
+    assert client.get(f'/order/{order_id}', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+
+def test_tracking_event_changes_etag(app, client, admin_client, make_order):
+    order_id, _ = make_order()
+    etag = client.get(f'/order/{order_id}').headers['ETag']
+    admin_client.post(f'/orders/{order_id}/events', json={'status': 'Arrivé au dépôt'})
+
+    response = client.get(f'/order/{order_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert 'Arrivé au dépôt' in response.get_data(as_text=True)
+
+
+def test_order_update_changes_etag_and_page(app, client, make_order):
+    order_id, tracking_number = make_order()
+    etag = client.get(f'/order/tracking/{tracking_number}').headers['ETag']
+    # Écriture sans invalidation du cache de suivi (autre processus) : la page ne doit pas être périmée
+    with app.app_context():
+        db.session.get(Order, order_id).shipment_name = 'Piano à queue'
+        db.session.commit()
+    assert tracking_cache.backend.get(tracking_cache._tracking_key(tracking_number))['shipment_name'] != 'Piano à queue'
+
+    response = client.get(f'/order/tracking/{tracking_number}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert 'Piano à queue' in response.get_data(as_text=True)
+
+
+def test_admin_page_is_not_conditional(app, admin_client, make_order):
+    order_id, _ = make_order()
+    response = admin_client.get(f'/order/{order_id}')
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+def test_unknown_order(app, client):
+    assert client.get('/order/999999').status_code == 404
+    assert client.get('/order/999999', headers={'If-None-Match': '"abc"'}).status_code == 404
+
+
+def test_remember_cookie_login_gets_its_own_page(app, client, admin_client, make_order):
+    order_id, _ = make_order()
+    anonymous = client.get(f'/order/{order_id}')
+    etag = anonymous.headers['ETag']
+    assert 'Logout' not in anonymous.get_data(as_text=True)
+
+    # Session expirée : seul le cookie « se souvenir de moi » identifie l'administrateur
+    remember = admin_client.get_cookie('remember_token')
+    assert remember is not None
+    remembered = app.test_client()
+    remembered.set_cookie('remember_token', remember.value)
+    response = remembered.get(f'/order/{order_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers.get('ETag') != etag
+    assert 'Logout' in response.get_data(as_text=True)
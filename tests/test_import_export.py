@@ -0,0 +1,78 @@
+"""Import en masse par lots et export en flux des commandes"""
+import csv
+import io
+import json
+
+from app import EXPORT_COLUMNS, ORDER_REQUIRED_FIELDS, Order, db, generate_export
+
+
+def import_file(admin_client, rows, name='orders.csv', **form):
+    if name.endswith('.csv'):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=ORDER_REQUIRED_FIELDS + ('pickup_date',))
+        writer.writeheader()
+        writer.writerows(rows)
+        content = buffer.getvalue()
+    else:
+        content = '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+    data = dict(form, file=(io.BytesIO(content.encode('utf-8')), name))
+    return admin_client.post('/orders/import', data=data)
+
+
+def import_row(index, **overrides):
+    row = {field: f'{field}-{index}' for field in ORDER_REQUIRED_FIELDS}
+    row.update(overrides)
+    return row
+
+
+def test_multi_batch_import_with_one_bad_row(app, admin_client):
+    rows = [import_row(index) for index in range(7)]
+    rows[3]['receiver_name'] = ''
+    rows[5]['pickup_date'] = '31/12/2025'
+    response = import_file(admin_client, rows, batch_size='2')
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['status'] == 'success'
+    assert (report['imported'], report['failed'], report['batches']) == (6, 1, 3)
+    # Ligne 1 = en-tête : la 4e commande est à la ligne 5
+    assert [error['line'] for error in report['errors']] == [5]
+    assert 'receiver_name' in report['errors'][0]['error']
+
+    with app.app_context():
+        orders = {order.shipment_name: order for order in Order.query.all()}
+        assert sorted(orders) == sorted(f'shipment_name-{index}' for index in range(7) if index != 3)
+        assert len({order.tracking_number for order in orders.values()}) == 6
+        assert orders['shipment_name-5'].pickup_date.isoformat() == '2025-12-31'
+
+
+def test_jsonl_import_reports_invalid_lines(app, admin_client):
+    rows = [import_row(0), '{pas du json', import_row(1), '[1, 2]']
+    report = import_file(admin_client, rows, name='orders.jsonl', batch_size='1').get_json()
+    assert (report['imported'], report['failed'], report['batches']) == (2, 2, 2)
+    assert [error['line'] for error in report['errors']] == [2, 4]
+
+
+def test_streamed_csv_export_matches_database(app, admin_client, make_order):
+    for index in range(5):
+        make_order(shipment_name=f'Colis, "spécial" {index}', receiver_address=f'{index} rue\nB')
+    response = admin_client.get('/orders/export?format=csv')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.headers['Cache-Control'] == 'no-store'
+    exported = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+
+    with app.app_context():
+        orders = Order.query.order_by(Order.created_at.desc(), Order.id.desc()).all()
+        expected = [{column: '' if order.to_dict()[column] is None else str(order.to_dict()[column])
+                     for column in EXPORT_COLUMNS} for order in orders]
+    assert exported == expected
+
+
+def test_export_is_flushed_in_chunks(app, make_order):
+    for _ in range(5):
+        make_order()
+    with app.test_request_context():
+        chunks = list(generate_export({}, 'csv', flush_every=2))
+    # En-tête seul d'abord, puis 2 + 2 + 1 lignes
+    assert chunks[0] == ','.join(EXPORT_COLUMNS) + '\r\n'
+    assert [chunk.count('\r\n') for chunk in chunks[1:]] == [2, 2, 1]
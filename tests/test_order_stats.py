@@ -0,0 +1,113 @@
+"""Agrégats du tableau de bord : la mise à jour incrémentale doit égaler un recalcul complet"""
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import ORDER_REQUIRED_FIELDS, OrderStat, Order, db, rebuild_order_stats, record_tracking_event
+
+
+def stats_snapshot():
+    return {(row.dimension, row.key): row.count for row in OrderStat.query.all() if row.count}
+
+
+def assert_matches_rebuild(app):
+    with app.app_context():
+        incremental = stats_snapshot()
+        rebuild_order_stats()
+        rebuilt = stats_snapshot()
+    assert incremental == rebuilt
+
+
+def edit_form(app, order_id, **overrides):
+    with app.app_context():
+        order = db.session.get(Order, order_id).to_dict()
+    form = {field: order[field] for field in ORDER_REQUIRED_FIELDS}
+    form['tracking_number'] = order['tracking_number']
+    form.update(overrides)
+    return form
+
+
+def test_created_orders(app, make_order):
+    make_order(destination_country='France')
+    make_order(destination_country='Belgique', origin_country='Espagne')
+    make_order(created_at=datetime(2025, 3, 4, 23, 59))
+    with app.app_context():
+        assert stats_snapshot()[('country', 'France')] == 2
+    assert_matches_rebuild(app)
+
+
+def test_edited_country_and_status(app, admin_client, make_order):
+    order_id, _ = make_order()
+    make_order()
+    response = admin_client.post(f'/edit-order/{order_id}', data=edit_form(
+        app, order_id, destination_country='Italie', current_location='En transit'))
+    assert response.status_code == 302
+    assert_matches_rebuild(app)
+
+
+def test_tracking_events_in_and_out_of_order(app, admin_client, make_order):
+    order_id, _ = make_order()
+    assert admin_client.post(f'/orders/{order_id}/events', json={
+        'status': 'En transit', 'occurred_at': '2025-02-01T10:00:00'}).status_code == 201
+    # Événement antérieur au dernier : le statut courant ne change pas
+    assert admin_client.post(f'/orders/{order_id}/events', json={
+        'status': 'Pris en charge', 'occurred_at': '2025-01-15T10:00:00'}).status_code == 201
+    assert admin_client.post(f'/orders/{order_id}/events', json={
+        'status': 'Livré', 'occurred_at': '2025-02-03T10:00:00'}).status_code == 201
+    with app.app_context():
+        assert stats_snapshot()[('status', 'Livré')] == 1
+    assert_matches_rebuild(app)
+
+
+def test_tracking_events_with_offsets(app, admin_client, make_order):
+    order_id, _ = make_order()
+    assert admin_client.post(f'/orders/{order_id}/events', json={
+        'status': 'En transit', 'occurred_at': '2025-02-01T10:00:00'}).status_code == 201
+    # 11:00+02:00 = 09:00 UTC : antérieur au dernier événement, le statut courant ne change pas
+    assert admin_client.post(f'/orders/{order_id}/events', json={
+        'status': 'Pris en charge', 'occurred_at': '2025-02-01T11:00:00+02:00'}).status_code == 201
+    with app.app_context():
+        assert ('status', 'Pris en charge') not in stats_snapshot()
+    assert admin_client.post(f'/orders/{order_id}/events', json={
+        'status': 'En douane', 'occurred_at': '2025-02-01T10:30:00Z'}).status_code == 201
+    with app.app_context():
+        record_tracking_event(order_id, 'Livré',
+                              occurred_at=datetime(2025, 2, 1, 13, 0, tzinfo=timezone(timedelta(hours=2))))
+        assert stats_snapshot()[('status', 'Livré')] == 1
+    assert_matches_rebuild(app)
+
+
+def test_edit_after_events_keeps_event_status(app, admin_client, make_order):
+    order_id, _ = make_order()
+    admin_client.post(f'/orders/{order_id}/events', json={'status': 'En transit'})
+    admin_client.post(f'/edit-order/{order_id}', data=edit_form(app, order_id, current_location='Entrepôt'))
+    assert_matches_rebuild(app)
+
+
+def test_deleted_order(app, admin_client, make_order):
+    order_id, _ = make_order()
+    make_order()
+    admin_client.post(f'/orders/{order_id}/events', json={'status': 'En transit'})
+    assert admin_client.post(f'/delete-order/{order_id}').status_code == 302
+    assert_matches_rebuild(app)
+
+
+def test_imported_orders(app, admin_client):
+    header = ','.join(ORDER_REQUIRED_FIELDS)
+    rows = [','.join(f'{field}-{index}' for field in ORDER_REQUIRED_FIELDS) for index in range(5)]
+    data = {'file': (io.BytesIO('\n'.join([header] + rows).encode('utf-8')), 'orders.csv')}
+    response = admin_client.post('/orders/import', data=data)
+    assert response.get_json()['imported'] == 5
+    assert_matches_rebuild(app)
+
+
+@pytest.mark.parametrize('deleted', [False, True])
+def test_rebuild_is_idempotent(app, make_order, deleted):
+    order_id, _ = make_order()
+    if deleted:
+        with app.app_context():
+            db.session.delete(db.session.get(Order, order_id))
+            db.session.commit()
+    assert_matches_rebuild(app)
+    assert_matches_rebuild(app)
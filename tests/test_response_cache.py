@@ -0,0 +1,55 @@
+"""Cache des pages publiques : partagé entre visiteurs anonymes uniquement"""
+from app import response_cache
+
+
+def test_anonymous_visitors_share_one_rendering(app):
+    first = app.test_client().get('/tracking')
+    second = app.test_client().get('/tracking')
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.data == first.data
+    assert 'Set-Cookie' not in second.headers
+
+
+def test_unlisted_query_arguments_do_not_split_the_cache(app):
+    app.test_client().get('/tracking')
+    assert app.test_client().get('/tracking?utm_source=mail').headers['X-Cache'] == 'HIT'
+
+
+def test_logged_in_admin_bypasses_cache(app, admin_client):
+    response = admin_client.get('/tracking')
+    assert 'X-Cache' not in response.headers
+    # Le rendu de l'administrateur n'a pas été conservé pour les visiteurs anonymes
+    assert app.test_client().get('/tracking').headers['X-Cache'] == 'MISS'
+
+
+def test_cached_page_is_not_served_to_admin(app, admin_client):
+    app.test_client().get('/tracking')
+    assert 'X-Cache' not in admin_client.get('/tracking').headers
+
+
+def test_pending_flash_bypasses_cache(app):
+    app.test_client().get('/tracking')
+    visitor = app.test_client()
+    with visitor.session_transaction() as session:
+        session['_flashes'] = [('info', 'Message personnel')]
+    bypasses = response_cache.stats()['bypasses']
+    response = visitor.get('/tracking')
+    assert 'X-Cache' not in response.headers
+    assert response_cache.stats()['bypasses'] == bypasses + 1
+
+
+def test_compressed_variant_derives_from_cached_page(app):
+    app.test_client().get('/tracking')
+    response = app.test_client().get('/tracking', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['X-Cache'] == 'HIT'
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_cached_page_is_not_served_to_remember_cookie_admin(app, admin_client):
+    app.test_client().get('/tracking')
+    # Session expirée : seul le cookie « se souvenir de moi » identifie l'administrateur
+    remembered = app.test_client()
+    remembered.set_cookie('remember_token', admin_client.get_cookie('remember_token').value)
+    assert 'X-Cache' not in remembered.get('/tracking').headers
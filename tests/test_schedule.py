@@ -0,0 +1,104 @@
+"""Planification : migration des anciennes colonnes texte et pagination par curseur des vues"""
+import os
+import sqlite3
+import subprocess
+import sys
+from datetime import date, datetime, time
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+
+from app import Order, encode_key_cursor
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Schéma d'avant la migration : dates et heures de planification en texte libre
+LEGACY_ORDERS_TABLE = """
+CREATE TABLE orders (
+    id INTEGER PRIMARY KEY, sender_name VARCHAR(100) NOT NULL, sender_phone VARCHAR(20) NOT NULL,
+    sender_email VARCHAR(120) NOT NULL, sender_address TEXT NOT NULL, receiver_name VARCHAR(100) NOT NULL,
+    receiver_phone VARCHAR(20) NOT NULL, receiver_email VARCHAR(120) NOT NULL, receiver_address TEXT NOT NULL,
+    shipment_name VARCHAR(200) NOT NULL, tracking_number VARCHAR(50) NOT NULL UNIQUE,
+    origin_city VARCHAR(100) NOT NULL, origin_country VARCHAR(100) NOT NULL,
+    destination_city VARCHAR(100) NOT NULL, destination_country VARCHAR(100) NOT NULL,
+    current_location VARCHAR(200), pickup_date VARCHAR(20), pickup_time VARCHAR(10),
+    delivery_date VARCHAR(20), delivery_time VARCHAR(10), created_at DATETIME, updated_at DATETIME
+)
+"""
+LEGACY_VALUES = [
+    # (pickup_date, pickup_time, delivery_date, delivery_time) → valeurs converties
+    (('2025-09-12', '10:30', '12/09/2025', '14h00'), (date(2025, 9, 12), time(10, 30), date(2025, 9, 12), time(14, 0))),
+    (('2025/01/05', '9.15', '05.01.2025', '08:00:30'), (date(2025, 1, 5), time(9, 15), date(2025, 1, 5), time(8, 0, 30))),
+    (('garbage', '25:00', '', None), (None, None, None, None)),
+]
+
+
+def run_migration(database_url, *args):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    result = subprocess.run([sys.executable, 'migrate_schedule_columns.py', *args], cwd=REPO_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_migration_converts_legacy_schedule_strings(tmp_path):
+    path = tmp_path / 'legacy.db'
+    connection = sqlite3.connect(path)
+    connection.execute(LEGACY_ORDERS_TABLE)
+    for index, (legacy, _) in enumerate(LEGACY_VALUES, start=1):
+        connection.execute(
+            "INSERT INTO orders VALUES (?, 'a', '1', 'e', 'x', 'b', '2', 'f', 'y', 'z', ?, 'P', 'F', 'L', 'F',"
+            " 'En transit', ?, ?, ?, ?, '2025-01-01 00:00:00', '2025-01-01 00:00:00')",
+            (index, f'{index:05d}AA', *legacy)
+        )
+    connection.commit()
+    connection.close()
+    database_url = f'sqlite:///{path}'
+
+    output = run_migration(database_url, '--batch-size', '2')
+    assert '3 commande(s) convertie(s), 2 valeur(s) illisible(s)' in output
+    # Relances sans risque : reconversion depuis les colonnes _legacy puis suppression, puis plus rien à faire
+    assert 'colonne pickup_date_legacy supprimee' in run_migration(database_url, '--drop-legacy')
+    assert 'Colonnes deja typees' in run_migration(database_url)
+
+    engine = create_engine(database_url)
+    columns = [Order.__table__.c[name] for name in ('pickup_date', 'pickup_time', 'delivery_date', 'delivery_time')]
+    with engine.connect() as conn:
+        rows = conn.execute(select(*columns).order_by(Order.__table__.c.id)).all()
+    names = {column['name'] for column in inspect(engine).get_columns('orders')}
+    engine.dispose()
+    assert [tuple(row) for row in rows] == [expected for _, expected in LEGACY_VALUES]
+    assert not any(name.endswith('_legacy') for name in names)
+
+
+def test_schedule_pages_follow_the_cursor(app, admin_client, make_order, monkeypatch):
+    monkeypatch.setitem(app.config, 'ORDERS_PAGE_SIZE', 2)
+    today = datetime.utcnow().date()
+    expected = [make_order(delivery_date=today, delivery_time=time(hour, 0))[0] for hour in (15, 9, 12)]
+    expected.append(make_order(delivery_date=today)[0])  # Sans heure : en dernier
+    make_order(delivery_date=date(2020, 1, 1))
+
+    seen, cursor = [], None
+    while True:
+        url = '/orders/schedule/due-today?format=json' + (f'&after={cursor}' if cursor else '')
+        page = admin_client.get(url).get_json()
+        seen += [order['id'] for order in page['orders']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert seen == [expected[1], expected[2], expected[0], expected[3]]
+
+
+@pytest.mark.parametrize('cursor', [
+    'pas-un-curseur!',
+    encode_key_cursor(['2025-13-45', '10:00:00', 1]),
+    encode_key_cursor(['2025-01-01', 'midi', 1]),
+    encode_key_cursor(['2025-01-01', '10:00:00', 'un']),
+    encode_key_cursor(['2025-01-01', '10:00:00']),
+    encode_key_cursor([{'date': 1}, [], 1]),
+])
+@pytest.mark.parametrize('direction', ['after', 'before'])
+def test_malformed_schedule_cursor_is_rejected(app, admin_client, cursor, direction):
+    response = admin_client.get(f'/orders/schedule/overdue?format=json&{direction}={cursor}')
+    assert response.status_code == 400
+    assert direction in response.get_json()['message']
@@ -0,0 +1,72 @@
+"""Cache de suivi : lectures servies par le cache, invalidées par chaque écriture de la commande"""
+from app import ORDER_REQUIRED_FIELDS, tracking_cache
+
+
+def edit_form(order, **overrides):
+    form = {field: order[field] for field in ORDER_REQUIRED_FIELDS}
+    form['tracking_number'] = order['tracking_number']
+    form.update(overrides)
+    return form
+
+
+def test_second_lookup_is_a_hit(app, make_order):
+    _, tracking_number = make_order()
+    with app.app_context():
+        first = tracking_cache.get_by_tracking_number(tracking_number)
+        hits = tracking_cache.hits
+        second = tracking_cache.get_by_tracking_number(tracking_number)
+    assert second == first
+    assert tracking_cache.hits == hits + 1
+
+
+def test_edit_invalidates_old_and_new_tracking_numbers(app, admin_client, make_order):
+    order_id, tracking_number = make_order()
+    with app.app_context():
+        order = tracking_cache.get_by_tracking_number(tracking_number)
+        tracking_cache.get_by_id(order_id)
+
+    response = admin_client.post(f'/edit-order/{order_id}',
+                                 data=edit_form(order, receiver_name='Nouveau', tracking_number='99999ZZ'))
+    assert response.status_code == 302
+
+    with app.app_context():
+        assert tracking_cache.get_by_tracking_number(tracking_number) is None
+        assert tracking_cache.get_by_tracking_number('99999ZZ')['receiver_name'] == 'Nouveau'
+        assert tracking_cache.get_by_id(order_id)['receiver_name'] == 'Nouveau'
+
+
+def test_delete_invalidates_cached_order(app, admin_client, make_order):
+    order_id, tracking_number = make_order()
+    with app.app_context():
+        assert tracking_cache.get_by_id(order_id) is not None
+        assert tracking_cache.get_by_tracking_number(tracking_number) is not None
+
+    assert admin_client.post(f'/delete-order/{order_id}').status_code == 302
+
+    with app.app_context():
+        assert tracking_cache.get_by_id(order_id) is None
+        assert tracking_cache.get_by_tracking_number(tracking_number) is None
+
+
+def test_tracking_event_invalidates_timeline(app, admin_client, make_order):
+    order_id, _ = make_order()
+    limit = app.config['TRACKING_TIMELINE_LIMIT']
+    with app.app_context():
+        assert tracking_cache.get_timeline(order_id, limit) == []
+
+    response = admin_client.post(f'/orders/{order_id}/events', json={'status': 'En transit', 'location': 'Lyon'})
+    assert response.status_code == 201
+
+    with app.app_context():
+        timeline = tracking_cache.get_timeline(order_id, limit)
+    assert [event['status'] for event in timeline] == ['En transit']
+
+
+def test_batch_lookup_reads_missing_numbers_in_one_query(app, make_order):
+    numbers = [make_order()[1] for _ in range(3)]
+    with app.app_context():
+        tracking_cache.get_by_tracking_number(numbers[0])
+        misses = tracking_cache.misses
+        found = tracking_cache.get_many_by_tracking_number(numbers + ['00000XX'])
+    assert sorted(found) == sorted(numbers)
+    assert tracking_cache.misses == misses + 3
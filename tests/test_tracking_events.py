@@ -0,0 +1,40 @@
+"""API des événements de suivi : dates ISO 8601 avec ou sans fuseau"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app import TrackingEvent, db
+
+
+def stored_dates(app, order_id):
+    with app.app_context():
+        return db.session.execute(
+            select(TrackingEvent.occurred_at).where(TrackingEvent.order_id == order_id).order_by(TrackingEvent.id)
+        ).scalars().all()
+
+
+@pytest.mark.parametrize('occurred_at, expected', [
+    ('2025-02-02T10:00:00+00:00', datetime(2025, 2, 2, 10, 0)),
+    ('2025-02-02T10:00:00Z', datetime(2025, 2, 2, 10, 0)),
+    ('2025-02-02T12:00:00+02:00', datetime(2025, 2, 2, 10, 0)),
+])
+def test_offset_event_after_naive_event(app, admin_client, make_order, occurred_at, expected):
+    order_id, _ = make_order()
+    first = admin_client.post(f'/orders/{order_id}/events',
+                              json={'status': 'Pris en charge', 'occurred_at': '2025-02-01T10:00:00'})
+    assert first.status_code == 201
+
+    response = admin_client.post(f'/orders/{order_id}/events',
+                                 json={'status': 'En transit', 'occurred_at': occurred_at})
+    assert response.status_code == 201
+    dates = stored_dates(app, order_id)
+    assert dates == [datetime(2025, 2, 1, 10, 0), expected]
+    assert all(value.tzinfo is None for value in dates)
+
+
+def test_invalid_date_is_rejected(app, admin_client, make_order):
+    order_id, _ = make_order()
+    response = admin_client.post(f'/orders/{order_id}/events', json={'status': 'En transit', 'occurred_at': 'hier'})
+    assert response.status_code == 400
+    assert stored_dates(app, order_id) == []
@@ -0,0 +1,64 @@
+"""Numéros de suivi : permutation à clé, réservation de blocs et fin de l'espace"""
+import pytest
+
+from app import TRACKING_NUMBER_SPACE, TrackingNumberAllocator
+
+
+@pytest.mark.parametrize('space', [1024, 700, 37])
+def test_permutation_is_a_bijection_inside_the_space(space):
+    # 700 et 37 ne sont pas des carrés : le cycle-walking doit ramener chaque valeur dans l'espace
+    allocator = TrackingNumberAllocator('clé de test', space=space)
+    indexes = [allocator.permute(position) for position in range(space)]
+    assert sorted(indexes) == list(range(space))
+
+
+def test_permutation_depends_on_the_key():
+    first = TrackingNumberAllocator('clé A', space=1000)
+    second = TrackingNumberAllocator('clé B', space=1000)
+    assert [first.permute(p) for p in range(20)] != [second.permute(p) for p in range(20)]
+
+
+def test_format_covers_the_whole_space():
+    assert TrackingNumberAllocator.format(0) == '00000AA'
+    assert TrackingNumberAllocator.format(27) == '00000BB'
+    assert TrackingNumberAllocator.format(TRACKING_NUMBER_SPACE - 1) == '99999ZZ'
+
+
+def test_numbers_are_unique_across_workers_and_blocks(app):
+    # Deux workers partagent le même compteur, avec des blocs courts
+    workers = [TrackingNumberAllocator('clé', block_size=7, sequence_name='test', space=5000) for _ in range(2)]
+    with app.app_context():
+        numbers = []
+        for round_index in range(20):
+            numbers.append(workers[0].next())
+            numbers.extend(workers[1].allocate(round_index % 12))
+            numbers.append(workers[1].next())
+    assert len(numbers) == len(set(numbers))
+    assert all(workers[0].format(0) <= number <= workers[0].format(4999) for number in numbers)
+
+
+def test_last_partial_block_is_used_before_exhaustion(app):
+    first = TrackingNumberAllocator('clé', block_size=4, sequence_name='test', space=10)
+    second = TrackingNumberAllocator('clé', block_size=4, sequence_name='test', space=10)
+    expected = {first.format(first.permute(position)) for position in range(10)}
+    with app.app_context():
+        numbers = first.allocate(7)              # bloc [0, 7)
+        numbers.append(second.next())            # bloc [7, 10) : seulement 3 positions libres
+        numbers += second.allocate(2)
+        with pytest.raises(RuntimeError):
+            second.next()
+        with pytest.raises(RuntimeError):
+            first.allocate(1)
+    assert set(numbers) == expected
+
+
+def test_short_last_block_stays_available(app):
+    allocator = TrackingNumberAllocator('clé', block_size=4, sequence_name='test', space=10)
+    with app.app_context():
+        numbers = allocator.allocate(7)          # bloc [0, 7)
+        with pytest.raises(RuntimeError):
+            allocator.allocate(5)                # bloc [7, 10) trop court, gardé
+        numbers += allocator.allocate(2) + [allocator.next()]
+        with pytest.raises(RuntimeError):
+            allocator.next()
+    assert len(set(numbers)) == 10
@@ -0,0 +1,51 @@
+"""Cache des administrateurs connectés : invalidé à la déconnexion, à la modification et à la suppression"""
+from app import User, db, user_cache
+
+
+def cached(user_id):
+    return user_cache.backend.get(user_cache._key(user_id))
+
+
+def test_authenticated_request_fills_cache(app, admin_client, admin_id):
+    assert admin_client.get('/orders').status_code == 200
+    entry = cached(admin_id)
+    assert entry['id'] == admin_id
+    assert 'password_hash' not in entry
+
+
+def test_logout_invalidates(app, admin_client, admin_id):
+    admin_client.get('/orders')
+    assert cached(admin_id) is not None
+    admin_client.get('/logout')
+    assert cached(admin_id) is None
+
+
+def test_deleted_user_is_logged_out_immediately(app, admin_client, admin_id):
+    admin_client.get('/orders')
+    assert cached(admin_id) is not None
+
+    with app.app_context():
+        db.session.delete(db.session.get(User, admin_id))
+        db.session.commit()
+
+    assert cached(admin_id) is None
+    response = admin_client.get('/orders')
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
+
+
+def test_password_change_invalidates(app, admin_client, admin_id):
+    admin_client.get('/orders')
+    with app.app_context():
+        db.session.get(User, admin_id).set_password('changed')
+        db.session.commit()
+    assert cached(admin_id) is None
+
+
+def test_rolled_back_change_keeps_entry(app, admin_client, admin_id):
+    admin_client.get('/orders')
+    with app.app_context():
+        db.session.get(User, admin_id).set_password('changed')
+        db.session.flush()
+        db.session.rollback()
+    assert cached(admin_id) is not None